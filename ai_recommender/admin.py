@@ -9,6 +9,10 @@ admin.site.register(UserPreference)
 admin.site.register(CPUBenchmark)
 admin.site.register(DiskBenchmark)
 admin.site.register(GPUBenchmark)
+admin.site.register(BenchmarkResolution)
+admin.site.register(BenchmarkDataset)
+admin.site.register(ImportJob)
+admin.site.register(RecommendationJob)
 
 
 @admin.register(RecommendationLog)
@@ -8,16 +8,48 @@ from ..models import (
     RequirementExtractionLog,
 )
 from .ai_scraper import get_ai_response
+from .score_resolution import prepare_bulk_score_resolution, queue_score_resolution
+from .utils import find_best_benchmark_objects
 from django.db import transaction
 import json
 
 
+def _resolve_requirement_scores(applications_data: list[dict]) -> dict:
+    """
+    Resolves the benchmark scores for every CPU/GPU string in an AI response
+    with one batched match call per component type.
+
+    Returns a mapping like {"cpu": {"Intel Core i5-8400": 9226, ...}, "gpu": {...}}.
+    """
+    benchmark_scores = {}
+    for component_type in ("cpu", "gpu"):
+        names = list(
+            dict.fromkeys(
+                req.get(component_type)
+                for app_data in applications_data
+                for req in app_data.get("requirements", [])
+                if req.get(component_type)
+            )
+        )
+        matches = find_best_benchmark_objects(names, component_type)
+        benchmark_scores[component_type] = {
+            name: match.score for name, match in zip(names, matches) if match
+        }
+    return benchmark_scores
+
+
 def _save_single_enriched_app_data(
-    app_data: dict, activity: Activity, extraction_log: ApplicationExtractionLog
+    app_data: dict,
+    activity: Activity,
+    extraction_log: ApplicationExtractionLog,
+    benchmark_scores: dict | None = None,
 ) -> Application | None:
     """
     Helper function to save the data for a single application from the AI's response.
     It handles checking for existing apps and linking them correctly.
+
+    `benchmark_scores` is the output of `_resolve_requirement_scores`; it is
+    computed here for this app alone if the caller did not batch it already.
     """
     app_name = app_data.get("name")
     if not app_name:
@@ -40,6 +72,9 @@ def _save_single_enriched_app_data(
                     f"Creating new application '{application.name}' with requirements."
                 )
                 requirements_data = app_data.get("requirements", [])
+                if benchmark_scores is None:
+                    benchmark_scores = _resolve_requirement_scores([app_data])
+                requirements_to_create = []
                 for req in requirements_data:
                     # Create a log for this specific requirement extraction
                     req_log = RequirementExtractionLog.objects.create(
@@ -48,16 +83,27 @@ def _save_single_enriched_app_data(
                         extracted_cpu=req.get("cpu"),
                         extracted_gpu=req.get("gpu"),
                     )
-                    # The model's smart .save() method will handle fetching scores.
-                    ApplicationSystemRequirement.objects.create(
-                        application=application,
-                        type=req.get("type"),
-                        cpu=req.get("cpu"),
-                        gpu=req.get("gpu"),
-                        ram=req.get("ram", 0),
-                        storage_size=req.get("storage_size", 0),
-                        storage_type=req.get("storage_type", "Any"),
+                    # Scores were resolved in one batch up front, so we can
+                    # bulk-insert instead of matching row by row in .save().
+                    requirements_to_create.append(
+                        ApplicationSystemRequirement(
+                            application=application,
+                            type=req.get("type"),
+                            cpu=req.get("cpu"),
+                            gpu=req.get("gpu"),
+                            cpu_score=benchmark_scores["cpu"].get(req.get("cpu")),
+                            gpu_score=benchmark_scores["gpu"].get(req.get("gpu")),
+                            ram=req.get("ram", 0),
+                            storage_size=req.get("storage_size", 0),
+                            storage_type=req.get("storage_type", "Any"),
+                        )
                     )
+                # bulk_create skips save(), so strings that matched nothing
+                # are handed to the background resolver here.
+                pending = prepare_bulk_score_resolution(requirements_to_create)
+                ApplicationSystemRequirement.objects.bulk_create(requirements_to_create)
+                if pending:
+                    queue_score_resolution(ApplicationSystemRequirement)
             else:
                 # If the app already existed, just ensure it's linked to this new activity.
                 print(
@@ -135,10 +181,13 @@ def discover_and_enrich_apps_for_activity(
         data = json.loads(raw_response)
         applications_data = data.get("discovered_applications", [])
 
+        # Match every CPU/GPU requirement in the response in one batch per type.
+        benchmark_scores = _resolve_requirement_scores(applications_data)
+
         processed_apps = []
         for app_data in applications_data:
             app_object = _save_single_enriched_app_data(
-                app_data, activity, extraction_log
+                app_data, activity, extraction_log, benchmark_scores
             )
             if app_object:
                 processed_apps.append(app_object)
@@ -0,0 +1,125 @@
+# ai_recommender/logic/ann_index.py
+
+import os
+import numpy as np
+from django.conf import settings
+
+# Defaults for the approximate search; override any key with settings.BENCHMARK_ANN.
+ANN_DEFAULTS = {
+    "ENABLED": True,
+    "MIN_ROWS": 5000,  # Smaller tables always use exact search
+    "N_LISTS": None,  # Number of k-means partitions; None means ~sqrt(rows)
+    "N_PROBE": 8,  # Partitions scanned per query: the recall/latency knob
+}
+
+
+def get_ann_settings() -> dict:
+    return {**ANN_DEFAULTS, **getattr(settings, "BENCHMARK_ANN", {})}
+
+
+def get_index_dir() -> str:
+    return getattr(
+        settings,
+        "EMBEDDING_INDEX_DIR",
+        os.path.join(settings.BASE_DIR, "var", "embedding_index"),
+    )
+
+
+class IVFIndex:
+    """
+    An inverted-file (IVF) index over a normalized embedding matrix.
+
+    Rows are partitioned with k-means; a query only scans the rows of the
+    `n_probe` partitions whose centroids are closest to it.
+    """
+
+    def __init__(self, centroids, assignments):
+        self.centroids = centroids
+        self.assignments = assignments
+        # Row positions grouped by partition, for fast gathering at query time.
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+        self.lists = [order[bounds[i] : bounds[i + 1]] for i in range(len(centroids))]
+
+    @classmethod
+    def build(cls, matrix, n_lists=None, seed=0):
+        """Clusters the (already normalized) rows of `matrix` with spherical k-means."""
+        from sklearn.cluster import KMeans
+
+        n_lists = n_lists or max(1, int(np.sqrt(len(matrix))))
+        n_lists = min(n_lists, len(matrix))
+        kmeans = KMeans(n_clusters=n_lists, n_init=1, random_state=seed).fit(matrix)
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        return cls(centroids, kmeans.labels_.astype(np.int32))
+
+    def search(self, queries, matrix, k=1, n_probe=8):
+        """
+        Approximate top-k search for normalized `queries` (n_queries, dim).
+        Returns (positions, similarities), like `EmbeddingIndex.search`.
+        """
+        n_probe = min(n_probe, len(self.centroids))
+        probed = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :n_probe]
+
+        positions = np.zeros((len(queries), k), dtype=np.int64)
+        similarities = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for i, query in enumerate(queries):
+            rows = np.concatenate([self.lists[p] for p in probed[i]])
+            row_similarities = matrix[rows] @ query
+            top = np.argsort(-row_similarities)[:k]
+            positions[i, : len(top)] = rows[top]
+            similarities[i, : len(top)] = row_similarities[top]
+        return positions, similarities
+
+    # --- Persistence: built offline by `--build-ann` or the import embed stage ---
+
+    @staticmethod
+    def path_for(component_type, version):
+        return os.path.join(get_index_dir(), f"ivf-{component_type}-v{version}.npz")
+
+    def save(self, component_type, version, ids):
+        os.makedirs(get_index_dir(), exist_ok=True)
+        path = self.path_for(component_type, version)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path, centroids=self.centroids, assignments=self.assignments, ids=ids
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, component_type, version, ids):
+        """Loads a saved index if one exists for this version and row set."""
+        path = cls.path_for(component_type, version)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if not np.array_equal(data["ids"], ids):
+                return None
+            return cls(data["centroids"], data["assignments"])
+
+
+def recall_report(index, queries, k=10, n_probe=None):
+    """
+    Compares approximate search with exact search for a set of query vectors.
+    Returns recall@1 and recall@k (fraction of the exact top-k found by IVF).
+    """
+    n_probe = n_probe or get_ann_settings()["N_PROBE"]
+    exact_positions, _ = index.search(queries, k=k, exact=True)
+    ann_positions, _ = index.ivf.search(
+        index.normalize_queries(queries), index.matrix, k=k, n_probe=n_probe
+    )
+    k = exact_positions.shape[1]
+    recall_at_k = np.mean(
+        [
+            len(set(exact) & set(ann)) / k
+            for exact, ann in zip(exact_positions, ann_positions)
+        ]
+    )
+    return {
+        "queries": len(queries),
+        "k": k,
+        "n_probe": n_probe,
+        "recall_at_1": float(np.mean(exact_positions[:, 0] == ann_positions[:, 0])),
+        "recall_at_k": float(recall_at_k),
+    }
@@ -0,0 +1,178 @@
+# ai_recommender/logic/batching.py
+
+import os
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+
+# Every MicroBatcher that hasn't been closed. Weak, so dropping a batcher
+# doesn't leave it (and the model its batch_fn holds) pinned here.
+_live_batchers = weakref.WeakSet()
+
+
+def _restart_batchers_after_fork():
+    # Threads don't survive fork (e.g. a model loaded under gunicorn --preload),
+    # so each child process starts its own worker threads.
+    for batcher in list(_live_batchers):
+        batcher._start()
+
+
+os.register_at_fork(after_in_child=_restart_batchers_after_fork)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent calls into one batched call.
+
+    Callers `submit` a list of items and get a Future. A single worker thread
+    waits up to `max_wait_ms` (or until `max_batch` items are queued), runs
+    `batch_fn` once over everything collected, and hands each caller back the
+    slice of results for its own items. `batch_fn` must return one result per
+    item, in order.
+    """
+
+    def __init__(self, batch_fn, max_batch=64, max_wait_ms=5, name="batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self._closed = False
+        self._metrics = {
+            "requests": 0,
+            "items": 0,
+            "batches": 0,
+            "largest_batch": 0,
+            "max_queue_depth": 0,
+            "batch_seconds": 0.0,
+        }
+        self._start()
+        _live_batchers.add(self)
+
+    def _start(self):
+        if self._closed:
+            return
+        self._metrics_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def submit(self, items) -> Future:
+        future = Future()
+        items = list(items)
+        if not items:
+            future.set_result([])
+            return future
+
+        self._queue.put((items, future))
+        depth = self._queue.qsize()
+        with self._metrics_lock:
+            self._metrics["requests"] += 1
+            self._metrics["max_queue_depth"] = max(
+                self._metrics["max_queue_depth"], depth
+            )
+        return future
+
+    def stats(self) -> dict:
+        """Counters since start, plus the current queue depth and mean batch size."""
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["mean_batch_size"] = (
+            round(stats["items"] / stats["batches"], 2) if stats["batches"] else 0.0
+        )
+        return stats
+
+    def __call__(self, items, timeout=None):
+        return self.submit(items).result(timeout)
+
+    def close(self):
+        """Stops the worker thread and drops `batch_fn` (and whatever it holds)."""
+        self._closed = True
+        self.batch_fn = None
+        _live_batchers.discard(self)
+        self._queue.put(None)
+
+    def _collect(self):
+        """Blocks for the first request, then gathers more until the batch is full or the wait is over."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        requests = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # Finish this batch, then stop
+                break
+            requests.append(request)
+            size += len(request[0])
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect()
+            if requests is None:
+                return
+            items = [item for request_items, _ in requests for item in request_items]
+            started = time.perf_counter()
+            try:
+                results = self.batch_fn(items)
+            except Exception as e:
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+            finally:
+                with self._metrics_lock:
+                    self._metrics["items"] += len(items)
+                    self._metrics["batches"] += 1
+                    self._metrics["largest_batch"] = max(
+                        self._metrics["largest_batch"], len(items)
+                    )
+                    self._metrics["batch_seconds"] += time.perf_counter() - started
+
+            start = 0
+            for request_items, future in requests:
+                future.set_result(results[start : start + len(request_items)])
+                start += len(request_items)
+
+
+class BatchingEncoder:
+    """
+    Drop-in stand-in for a SentenceTransformer that routes `encode` calls from
+    concurrent threads through a `MicroBatcher`, so simultaneous requests share
+    one forward pass. A single string returns one vector, a list returns an
+    (n, dim) array, as with `SentenceTransformer.encode`.
+    """
+
+    def __init__(self, model, max_batch=32, max_wait_ms=5):
+        self.model = model
+        self.batcher = MicroBatcher(
+            lambda texts: model.encode(texts, convert_to_tensor=False),
+            max_batch=max_batch,
+            max_wait_ms=max_wait_ms,
+            name="sentence-encoder-batcher",
+        )
+
+    def encode(self, sentences, convert_to_tensor=False, **kwargs):
+        if convert_to_tensor:
+            # Tensors are only used offline; don't mix them into shared batches.
+            return self.model.encode(sentences, convert_to_tensor=True, **kwargs)
+        if isinstance(sentences, str):
+            return self.batcher([sentences])[0]
+        return self.batcher(sentences)
+
+    def stats(self) -> dict:
+        return self.batcher.stats()
+
+    def close(self):
+        self.batcher.close()
+        self.model = None
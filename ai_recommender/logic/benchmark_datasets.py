@@ -0,0 +1,253 @@
+# ai_recommender/logic/benchmark_datasets.py
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    BigIntegerField,
+    Case,
+    F,
+    Max,
+    Min,
+    Value,
+    When,
+)
+from django.utils import timezone
+
+# Defaults for blue/green benchmark imports; override any key with
+# settings.BENCHMARK_DATASETS.
+DATASET_DEFAULTS = {
+    "MIN_ROW_RATIO": 0.9,  # A new dataset needs at least 90% of the live row count
+    "MAX_MEDIAN_SHIFT": 0.25,  # ...and a median score within 25% of the live one
+    "KEEP_PREVIOUS": 1,  # Inactive datasets kept for rollback
+}
+
+REPOINT_CHUNK_SIZE = 500
+
+
+def get_dataset_settings() -> dict:
+    return {**DATASET_DEFAULTS, **getattr(settings, "BENCHMARK_DATASETS", {})}
+
+
+def _model_for(component_type):
+    from ..models import CPUBenchmark, GPUBenchmark, DiskBenchmark
+
+    return {"cpu": CPUBenchmark, "gpu": GPUBenchmark, "disk": DiskBenchmark}[
+        component_type
+    ]
+
+
+def dataset_stats(dataset) -> dict:
+    """Row count and score distribution of one dataset."""
+    rows = _model_for(dataset.component_type).all_versions.filter(dataset=dataset)
+    stats = rows.aggregate(
+        min_score=Min("score"), max_score=Max("score"), mean_score=Avg("score")
+    )
+    stats["rows"] = rows.count()
+    stats["median_score"] = (
+        rows.order_by("score")
+        .values_list("score", flat=True)[stats["rows"] // 2 : stats["rows"] // 2 + 1]
+        .first()
+    )
+    return stats
+
+
+def validate_dataset(dataset) -> list:
+    """
+    Compares a freshly imported dataset with the live one and returns a list
+    of problems (empty when it is safe to activate). The results are stored
+    on the dataset.
+    """
+    from ..models import BenchmarkDataset
+
+    config = get_dataset_settings()
+    stats = dataset_stats(dataset)
+    errors = []
+    if stats["rows"] == 0:
+        errors.append("The dataset is empty.")
+
+    live = BenchmarkDataset.objects.filter(
+        component_type=dataset.component_type, status="active"
+    ).first()
+    live_stats = dataset_stats(live) if live and live.pk != dataset.pk else None
+    if stats["rows"] and live_stats and live_stats["rows"]:
+        if stats["rows"] < live_stats["rows"] * config["MIN_ROW_RATIO"]:
+            errors.append(
+                f"Only {stats['rows']} rows, against {live_stats['rows']} in the live dataset."
+            )
+        live_median = live_stats["median_score"] or 0
+        if live_median and (
+            abs(stats["median_score"] - live_median) / live_median
+            > config["MAX_MEDIAN_SHIFT"]
+        ):
+            errors.append(
+                f"Median score moved from {live_median} to {stats['median_score']}."
+            )
+
+    dataset.rows = stats["rows"]
+    dataset.stats = {**stats, "live": live_stats, "errors": errors}
+    dataset.save(update_fields=["rows", "stats"])
+    return errors
+
+
+def _name_field(component_type):
+    from .benchmark_import import BENCHMARK_SHEETS
+
+    return BENCHMARK_SHEETS[component_type]["name_field"]
+
+
+def _foreign_keys(component_type):
+    """(queryset, field) for every other table's foreign key to benchmark rows."""
+    return [
+        (relation.related_model._base_manager.all(), relation.field.attname)
+        for relation in _model_for(component_type)._meta.related_objects
+    ]
+
+
+def _references(component_type):
+    """
+    _foreign_keys plus the admin pins in BenchmarkResolution, which store a
+    plain id.
+    """
+    from ..models import BenchmarkResolution
+
+    pins = BenchmarkResolution.objects.filter(
+        component_type=component_type, method="admin"
+    )
+    return _foreign_keys(component_type) + [(pins, "benchmark_id")]
+
+
+def _repoint(queryset, field, mapping):
+    """Rewrites `field` from old to new ids, one UPDATE ... CASE per chunk."""
+    old_ids = list(mapping)
+    for start in range(0, len(old_ids), REPOINT_CHUNK_SIZE):
+        chunk = old_ids[start : start + REPOINT_CHUNK_SIZE]
+        queryset.filter(**{f"{field}__in": chunk}).update(
+            **{
+                field: Case(
+                    *[When(**{field: old}, then=Value(mapping[old])) for old in chunk],
+                    default=F(field),
+                    output_field=BigIntegerField(),
+                )
+            }
+        )
+
+
+def _carry_over_references(component_type, new_dataset):
+    """
+    Re-points every reference to a row outside `new_dataset` at the row with
+    the same name inside it. References whose name is not in the new dataset
+    keep their old row: prune_datasets never deletes referenced rows, and the
+    matcher ignores admin pins to rows that are not live.
+    """
+    ModelClass = _model_for(component_type)
+    name_field = _name_field(component_type)
+    outside = ModelClass.all_versions.exclude(dataset=new_dataset).values("pk")
+
+    referenced = set()
+    for queryset, field in _references(component_type):
+        referenced.update(
+            queryset.filter(**{f"{field}__in": outside}).values_list(field, flat=True)
+        )
+    if not referenced:
+        return
+
+    old_names = dict(
+        ModelClass.all_versions.filter(pk__in=referenced).values_list("pk", name_field)
+    )
+    new_ids = dict(
+        ModelClass.all_versions.filter(
+            dataset=new_dataset, **{f"{name_field}__in": set(old_names.values())}
+        ).values_list(name_field, "pk")
+    )
+    mapping = {
+        old_id: new_ids[name] for old_id, name in old_names.items() if name in new_ids
+    }
+    for queryset, field in _references(component_type):
+        _repoint(queryset, field, mapping)
+
+
+def activate_dataset(dataset):
+    """
+    Makes `dataset` the live one for its type in a single transaction: the
+    current dataset becomes "previous", references to benchmark rows (admin
+    corrections, correction history, requirement matches) follow them by name,
+    and the version stamp is bumped so every process reloads its indexes.
+    Older inactive datasets beyond KEEP_PREVIOUS are then deleted.
+    """
+    from ..models import BenchmarkDataset, BenchmarkVersion
+
+    component_type = dataset.component_type
+    with transaction.atomic():
+        live = list(
+            BenchmarkDataset.objects.select_for_update().filter(
+                component_type=component_type, status="active"
+            )
+        )
+        _carry_over_references(component_type, dataset)
+        BenchmarkDataset.objects.filter(pk__in=[d.pk for d in live]).exclude(
+            pk=dataset.pk
+        ).update(status="previous")
+        dataset.status = "active"
+        dataset.activated_at = timezone.now()
+        dataset.save(update_fields=["status", "activated_at"])
+        BenchmarkVersion.bump(component_type)
+
+    prune_datasets(component_type)
+    return dataset
+
+
+def rollback_dataset(component_type):
+    """Re-activates the most recently active previous dataset, if there is one."""
+    from ..models import BenchmarkDataset
+
+    previous = (
+        BenchmarkDataset.objects.filter(
+            component_type=component_type, status="previous"
+        )
+        .order_by("-activated_at")
+        .first()
+    )
+    if previous is None:
+        return None
+    return activate_dataset(previous)
+
+
+def _referenced_ids(component_type, rows) -> set:
+    """Pks among `rows` that another table's foreign key still points at."""
+    referenced = set()
+    for queryset, field in _foreign_keys(component_type):
+        referenced.update(
+            queryset.filter(**{f"{field}__in": rows.values("pk")}).values_list(
+                field, flat=True
+            )
+        )
+    return referenced
+
+
+def prune_datasets(component_type):
+    """
+    Deletes failed datasets and inactive ones beyond KEEP_PREVIOUS. Rows that
+    other tables still reference (e.g. admin correction history) are never
+    deleted: their dataset is kept as "retired" with only those rows, and is
+    retried on the next prune.
+    """
+    from ..models import BenchmarkDataset
+
+    keep = get_dataset_settings()["KEEP_PREVIOUS"]
+    ModelClass = _model_for(component_type)
+    datasets = BenchmarkDataset.objects.filter(component_type=component_type)
+    stale = list(
+        datasets.filter(status="previous").order_by("-activated_at")[keep:]
+    ) + list(datasets.filter(status__in=["failed", "retired"]))
+
+    for dataset in stale:
+        rows = ModelClass.all_versions.filter(dataset=dataset)
+        referenced = _referenced_ids(component_type, rows)
+        if not referenced:
+            dataset.delete()
+            continue
+        rows.exclude(pk__in=referenced).delete()
+        dataset.status = "retired"
+        dataset.rows = len(referenced)
+        dataset.save(update_fields=["status", "rows"])
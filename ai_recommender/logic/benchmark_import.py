@@ -0,0 +1,595 @@
+# ai_recommender/logic/benchmark_import.py
+
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .model_tokens import CLOCK_SPEED, GPU_VENDOR_PREFIX, extract_model_token
+
+# How each PassMark sheet maps onto a benchmark model. Column names are the
+# sanitized headers (lower-case, alphanumerics only).
+BENCHMARK_SHEETS = {
+    "cpu": {
+        "model": "CPUBenchmark",
+        "name_field": "cpu",
+        "columns": {
+            "cpuname": "cpu",
+            "cpumark": "score",
+            "rank": "rank",
+            "cpuvalue": "value_score",
+            "price": "price",
+        },
+        "name_column": "cpuname",
+        "score_column": "cpumark",
+    },
+    "gpu": {
+        "model": "GPUBenchmark",
+        "name_field": "gpu",
+        "columns": {
+            "videocardname": "gpu",
+            "g3dmark": "score",
+            "rank": "rank",
+            "videocardvalue": "value_score",
+            "price": "price",
+        },
+        "name_column": "videocardname",
+        "score_column": "g3dmark",
+    },
+    "disk": {
+        "model": "DiskBenchmark",
+        "name_field": "drive_name",
+        "columns": {
+            "drivename": "drive_name",
+            "diskrating": "score",
+            "size": "size_tb",
+            "rank": "rank",
+            "drivevalue": "value_score",
+            "price": "price",
+        },
+        "name_column": "drivename",
+        "score_column": "diskrating",
+    },
+}
+
+INTEGER_FIELDS = {"score", "rank"}
+FLOAT_FIELDS = {"value_score", "size_tb"}
+
+WRITE_CHUNK_SIZE = 1000
+
+# A streamed XLSX sheet ends at the first run of this many empty rows, however
+# far its stored dimension claims to go (PassMark exports say A1:E1048576).
+EMPTY_ROW_LIMIT = 1000
+
+# Defaults for streaming imports; override any key with settings.BENCHMARK_IMPORT.
+IMPORT_DEFAULTS = {
+    "CHUNK_SIZE": 5000,  # Rows read, cleaned and committed together
+    "CHECKPOINT_DIR": None,  # None means BASE_DIR/var/import_checkpoints
+    "STAGING_DIR": None,  # None means MEDIA_ROOT/benchmark_staging
+    "EMBED_AFTER_IMPORT": True,  # Re-encode changed CPU/GPU names when an import ends
+    "PROPAGATE_SCORES": True,  # Then re-score requirements and vendor components
+    "STALE_JOB_SECONDS": 3600,  # Unfinished uploads this old stop blocking re-uploads
+}
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xls", ".ods")
+
+
+def get_import_settings() -> dict:
+    return {**IMPORT_DEFAULTS, **getattr(settings, "BENCHMARK_IMPORT", {})}
+
+
+# --- Column-wise name parsing (see model_tokens.parse_cpu_name / parse_gpu_name) ---
+
+
+def parse_cpu_names(names: pd.Series) -> pd.DataFrame:
+    """Returns model_name and clock_speed_ghz columns for a column of CPU names."""
+    names = names.str.strip()
+    # An empty column splits into a frame with no columns at all.
+    parts = (
+        names.str.split("@", n=1, expand=True).reindex(columns=[0, 1]).astype("string")
+    )
+    speeds = parts[1].str.extract(CLOCK_SPEED, expand=False)
+    return pd.DataFrame(
+        {
+            "model_name": parts[0].str.strip(),
+            "clock_speed_ghz": pd.to_numeric(speeds, errors="coerce"),
+        }
+    )
+
+
+def parse_gpu_names(names: pd.Series) -> pd.Series:
+    """Strips the vendor prefix from a column of GPU names."""
+    return names.str.strip().str.replace(GPU_VENDOR_PREFIX, "", regex=True).str.strip()
+
+
+# --- Vectorized cleaning ---
+
+
+def _clean_numeric(column: pd.Series, keep_decimal_point: bool) -> pd.Series:
+    """
+    Strips currency symbols, thousands separators, units and footnote marks
+    ('$14,813.00*', '3.6 TB') from a whole column at once. Values that are
+    already numbers (whole numeric columns from pandas, or single cells from
+    openpyxl) are used as-is.
+    """
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype(float)
+    numbers = pd.to_numeric(column.where(column.map(_is_number)), errors="coerce")
+    pattern = r"[^\d.]" if keep_decimal_point else r"[^\d]"
+    cleaned = column.astype("string").str.replace(pattern, "", regex=True)
+    parsed = pd.to_numeric(cleaned.replace("", pd.NA), errors="coerce")
+    return numbers.fillna(parsed.astype(float)).astype(float)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+
+
+def clean_benchmark_dataframe(df: pd.DataFrame, item_type: str):
+    """
+    Renames, cleans and parses a benchmark sheet column by column.
+
+    Returns (rows, skipped): a DataFrame with one column per model field and at
+    most one row per benchmark name (the last one wins), plus the number of
+    input rows dropped for a missing name or score.
+    """
+    sheet = BENCHMARK_SHEETS[item_type]
+    df.columns = (
+        df.columns.str.strip().str.lower().str.replace(r"[^a-z0-9]", "", regex=True)
+    )
+    required_cols = {sheet["name_column"], sheet["score_column"]}
+    if not required_cols.issubset(df.columns):
+        missing = required_cols - set(df.columns)
+        raise ValueError(
+            f"Missing required columns for type '{item_type}': {missing}. Found: {list(df.columns)}"
+        )
+
+    rows = pd.DataFrame(index=df.index)
+    for column, field in sheet["columns"].items():
+        if column not in df.columns:
+            rows[field] = np.nan
+        elif field == sheet["name_field"]:
+            rows[field] = df[column].astype("string").str.strip()
+        elif field in INTEGER_FIELDS:
+            rows[field] = _clean_numeric(df[column], keep_decimal_point=False)
+        else:
+            rows[field] = _clean_numeric(df[column], keep_decimal_point=True)
+
+    name_field = sheet["name_field"]
+    total = len(rows)
+    rows = rows[rows[name_field].fillna("").str.len() > 0]
+    rows = rows[rows["score"].notna()]
+    rows = rows.drop_duplicates(subset=[name_field], keep="last")
+    skipped = total - len(rows)
+
+    if item_type == "cpu":
+        rows = rows.join(parse_cpu_names(rows["cpu"]))
+        rows["model_token"] = rows["model_name"].map(
+            lambda name: extract_model_token(name, "cpu") or ""
+        )
+    elif item_type == "gpu":
+        rows["model_name"] = parse_gpu_names(rows["gpu"])
+        rows["model_token"] = rows["gpu"].map(
+            lambda name: extract_model_token(name, "gpu") or ""
+        )
+    return rows, skipped
+
+
+# --- Chunked upsert ---
+
+
+def _to_python(field, value):
+    if value is None or pd.isna(value):
+        return None
+    if field in INTEGER_FIELDS:
+        return int(value)
+    if field == "price":
+        return Decimal(str(round(float(value), 2)))
+    if field in FLOAT_FIELDS or field == "clock_speed_ghz":
+        return float(value)
+    return value
+
+
+def _active_embeddings(ModelClass, name_field, names):
+    """{name: (embedding, hash)} of the live rows, to seed a staged dataset."""
+    return {
+        name: (embedding, embedding_hash)
+        for name, embedding, embedding_hash in ModelClass.objects.filter(
+            **{f"{name_field}__in": names}
+        ).values_list(name_field, "embedding", "embedding_hash")
+    }
+
+
+def upsert_benchmark_rows(
+    rows: pd.DataFrame, item_type: str, chunk_size=None, dataset=None
+):
+    """
+    Writes cleaned rows into `dataset` (the live one by default) with one
+    INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE per chunk, plus one query per
+    chunk to tell creates from updates. Existing embeddings are left untouched;
+    new rows of a staged CPU/GPU dataset start with the live row's embedding
+    for the same name, so only genuinely new names need encoding.
+    Returns (created, updated).
+    """
+    from django.apps import apps
+    from ..models import BenchmarkDataset
+
+    sheet = BENCHMARK_SHEETS[item_type]
+    ModelClass = apps.get_model("ai_recommender", sheet["model"])
+    name_field = sheet["name_field"]
+    fields = list(rows.columns)
+    chunk_size = chunk_size or WRITE_CHUNK_SIZE
+    if dataset is None:
+        dataset = BenchmarkDataset.active(item_type)
+    copy_embeddings = item_type != "disk" and dataset.status != "active"
+
+    upsert_options = {
+        "update_conflicts": True,
+        "update_fields": [f for f in fields if f != name_field],
+    }
+    if connection.features.supports_update_conflicts_with_target:
+        upsert_options["unique_fields"] = ["dataset", name_field]
+
+    created, updated = 0, 0
+    records = rows.to_dict("records")
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start : start + chunk_size]
+        names = [record[name_field] for record in chunk]
+        existing = set(
+            ModelClass.all_versions.filter(
+                dataset=dataset, **{f"{name_field}__in": names}
+            ).values_list(name_field, flat=True)
+        )
+        embeddings = (
+            _active_embeddings(ModelClass, name_field, names) if copy_embeddings else {}
+        )
+        objects = []
+        for record in chunk:
+            obj = ModelClass(
+                dataset=dataset, **{f: _to_python(f, record[f]) for f in fields}
+            )
+            if record[name_field] in embeddings:
+                obj.embedding, obj.embedding_hash = embeddings[record[name_field]]
+            objects.append(obj)
+        ModelClass.all_versions.bulk_create(objects, **upsert_options)
+        updated += len(existing)
+        created += len(chunk) - len(existing)
+    return created, updated
+
+
+def process_benchmark_dataframe(
+    df: pd.DataFrame, item_type: str, embed=None, dataset=None
+):
+    """
+    Processes a benchmark DataFrame and inserts/updates benchmark records in
+    bulk, into the live dataset unless another `dataset` is given. Returns
+    created/updated/skipped counts and per-stage timings (seconds).
+    """
+    from ..models import BenchmarkVersion
+
+    item_type = item_type.lower()
+    if item_type not in BENCHMARK_SHEETS:
+        raise ValueError("Invalid item_type. Must be 'cpu', 'gpu', or 'disk'.")
+
+    timings = {}
+    started = time.perf_counter()
+    rows, skipped = clean_benchmark_dataframe(df, item_type)
+    timings["clean"] = round(time.perf_counter() - started, 3)
+
+    started = time.perf_counter()
+    created, updated = upsert_benchmark_rows(rows, item_type, dataset=dataset)
+    timings["write"] = round(time.perf_counter() - started, 3)
+
+    # Let every process know its cached embedding index for this type is stale.
+    if dataset is None or dataset.status == "active":
+        BenchmarkVersion.bump(item_type)
+    _embed_stage(item_type, embed, timings, dataset)
+
+    return {
+        "created": created,
+        "updated": updated,
+        "skipped": skipped,
+        "timings": timings,
+    }
+
+
+def _embed_stage(item_type, embed, timings, dataset=None):
+    """
+    Re-encodes only the rows whose names changed, unless disabled by `embed`
+    or BENCHMARK_IMPORT["EMBED_AFTER_IMPORT"], and records its duration.
+    """
+    from .embedding_refresh import refresh_after_import
+
+    if embed is None:
+        embed = get_import_settings()["EMBED_AFTER_IMPORT"]
+    if not embed:
+        return
+    summary = refresh_after_import(item_type, dataset)
+    if summary is not None:
+        timings["embed"] = summary["seconds"]
+
+
+# --- Streaming import: bounded memory, one transaction per chunk, resumable ---
+
+
+def read_benchmark_chunks(path: str, chunk_size: int, start_row: int = 0):
+    """
+    Yields DataFrames of at most `chunk_size` data rows, skipping the first
+    `start_row` data rows. CSVs are read with pandas' chunked reader and XLSX
+    sheets row by row with openpyxl's read-only mode, so neither is ever fully
+    in memory. Other spreadsheet formats have no streaming reader and come back
+    as a single chunk. Empty rows are not data rows: they are dropped, never
+    counted, and a long run of them ends an XLSX sheet.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        # `start_row` counts parsed rows; skipping that many file lines would
+        # drift on quoted newlines and blank lines, so re-read and drop them.
+        yield from _skip_parsed_rows(pd.read_csv(path, chunksize=chunk_size), start_row)
+    elif ext == ".xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [str(h) if h is not None else "" for h in next(rows, ())]
+            rows = itertools.islice(_non_empty_rows(rows), start_row, None)
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            workbook.close()
+    elif ext in (".xls", ".ods"):
+        df = pd.read_excel(path, engine="odf" if ext == ".ods" else None)
+        yield df.dropna(how="all").iloc[start_row:]
+    else:
+        raise ValueError(f"Unsupported file format: {ext}")
+
+
+def _skip_parsed_rows(chunks, start_row):
+    """Drops the first `start_row` rows from a stream of DataFrame chunks."""
+    for df in chunks:
+        if start_row >= len(df):
+            start_row -= len(df)
+            continue
+        yield df.iloc[start_row:] if start_row else df
+        start_row = 0
+
+
+def _non_empty_rows(rows, empty_row_limit=EMPTY_ROW_LIMIT):
+    """Skips rows with no values, stopping after `empty_row_limit` in a row."""
+    empty_run = 0
+    for row in rows:
+        if any(value is not None and str(value).strip() for value in row):
+            empty_run = 0
+            yield row
+        else:
+            empty_run += 1
+            if empty_run >= empty_row_limit:
+                return
+
+
+def get_checkpoint_dir() -> str:
+    return get_import_settings()["CHECKPOINT_DIR"] or os.path.join(
+        settings.BASE_DIR, "var", "import_checkpoints"
+    )
+
+
+def _checkpoint_path(path: str, item_type: str) -> str:
+    return os.path.join(
+        get_checkpoint_dir(), f"{item_type}-{os.path.basename(path)}.json"
+    )
+
+
+def _file_signature(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def load_checkpoint(path: str, item_type: str):
+    """
+    Returns the saved progress of an interrupted import of this file, or None
+    when there is none or the file has changed since.
+    """
+    checkpoint_path = _checkpoint_path(path, item_type)
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("file") != _file_signature(path):
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path: str, item_type: str, progress: dict):
+    checkpoint_path = _checkpoint_path(path, item_type)
+    os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"file": _file_signature(path), **progress}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def clear_checkpoint(path: str, item_type: str):
+    checkpoint_path = _checkpoint_path(path, item_type)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+
+def import_benchmark_file(
+    path: str,
+    item_type: str,
+    chunk_size=None,
+    resume=False,
+    on_progress=None,
+    embed=None,
+    dataset=None,
+):
+    """
+    Streams a benchmark file into `dataset` (the live one by default) chunk by
+    chunk.
+
+    Every chunk is cleaned, upserted and committed in its own transaction, and
+    a checkpoint with the next row to read is saved after each commit. With
+    `resume=True` an interrupted import continues from that row instead of
+    starting over (the checkpoint records the dataset id, so callers can
+    reopen it). `on_progress(progress)` is called after every chunk.
+    Finally, changed CPU/GPU names are re-encoded (see `_embed_stage`).
+
+    Returns the same counts and timings as `process_benchmark_dataframe`, plus
+    `rows` (data rows read, including any resumed from the checkpoint).
+    """
+    from ..models import BenchmarkDataset, BenchmarkVersion
+
+    item_type = item_type.lower()
+    if item_type not in BENCHMARK_SHEETS:
+        raise ValueError("Invalid item_type. Must be 'cpu', 'gpu', or 'disk'.")
+    chunk_size = chunk_size or get_import_settings()["CHUNK_SIZE"]
+    if dataset is None:
+        dataset = BenchmarkDataset.active(item_type)
+
+    progress = {"rows": 0, "created": 0, "updated": 0, "skipped": 0}
+    if resume:
+        progress.update(
+            {
+                key: value
+                for key, value in (load_checkpoint(path, item_type) or {}).items()
+                if key in progress
+            }
+        )
+    resumed_rows = progress["rows"]
+    timings = {"parse": 0.0, "clean": 0.0, "write": 0.0}
+
+    started = time.perf_counter()
+    try:
+        stage_started = time.perf_counter()
+        for df in read_benchmark_chunks(path, chunk_size, start_row=progress["rows"]):
+            timings["parse"] += time.perf_counter() - stage_started
+
+            stage_started = time.perf_counter()
+            rows, skipped = clean_benchmark_dataframe(df, item_type)
+            timings["clean"] += time.perf_counter() - stage_started
+
+            stage_started = time.perf_counter()
+            with transaction.atomic():
+                created, updated = upsert_benchmark_rows(
+                    rows, item_type, dataset=dataset
+                )
+            timings["write"] += time.perf_counter() - stage_started
+
+            progress["rows"] += len(df)
+            progress["created"] += created
+            progress["updated"] += updated
+            progress["skipped"] += skipped
+            save_checkpoint(path, item_type, {**progress, "dataset": dataset.pk})
+            if on_progress:
+                elapsed = time.perf_counter() - started
+                rows_per_second = (progress["rows"] - resumed_rows) / max(elapsed, 1e-9)
+                on_progress({**progress, "rows_per_second": round(rows_per_second)})
+
+            stage_started = time.perf_counter()
+    finally:
+        # Committed chunks are live either way, so cached indexes are stale.
+        if progress["rows"] > resumed_rows and dataset.status == "active":
+            BenchmarkVersion.bump(item_type)
+
+    clear_checkpoint(path, item_type)
+    timings = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+    _embed_stage(item_type, embed, timings, dataset)
+    return {**progress, "timings": timings}
+
+
+# --- Upload staging: the Celery task gets a path and checksum, not the file ---
+
+
+def get_staging_dir() -> str:
+    return get_import_settings()["STAGING_DIR"] or os.path.join(
+        settings.MEDIA_ROOT, "benchmark_staging"
+    )
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_upload(uploaded_file, item_type: str):
+    """
+    Streams an uploaded file to the staging directory, hashing it on the way.
+    Returns (temporary path, sha256 checksum); `claim_staged_file` gives the
+    file its final, per-job name once the ImportJob exists.
+    """
+    ext = os.path.splitext(uploaded_file.name)[1].lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise ValueError(
+            f"Unsupported file format '{ext}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}."
+        )
+    staging_dir = get_staging_dir()
+    os.makedirs(staging_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(
+        dir=staging_dir, suffix=".part", delete=False
+    ) as f:
+        for block in uploaded_file.chunks():
+            digest.update(block)
+            f.write(block)
+    return f.name, digest.hexdigest()
+
+
+def claim_staged_file(path: str, job) -> str:
+    """
+    Renames a staged upload after its job, so two jobs for the same file never
+    share (and delete) each other's copy. Returns the new path.
+    """
+    ext = os.path.splitext(job.file_name)[1].lower()
+    claimed_path = os.path.join(
+        os.path.dirname(path), f"{job.item_type}-{job.checksum}-job{job.pk}{ext}"
+    )
+    os.replace(path, claimed_path)
+    return claimed_path
+
+
+def discard_staged_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def fail_stale_import_jobs(item_type: str) -> int:
+    """
+    Marks jobs that have shown no sign of life for STALE_JOB_SECONDS (queued
+    that long ago, or no progress reported since) as failed, so a dead worker
+    or a lost task stops blocking a re-upload of the same file. Returns how
+    many were marked.
+    """
+    from ..models import ImportJob
+
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=get_import_settings()["STALE_JOB_SECONDS"])
+    return (
+        ImportJob.objects.filter(item_type=item_type)
+        .filter(
+            Q(status="pending", created_at__lt=cutoff)
+            | Q(status="running", heartbeat_at__lt=cutoff)
+            | Q(status="running", heartbeat_at__isnull=True, started_at__lt=cutoff)
+        )
+        .update(
+            status="failed",
+            error="Timed out: the job stopped reporting progress.",
+            finished_at=now,
+        )
+    )
@@ -0,0 +1,166 @@
+# ai_recommender/logic/compressed_index.py
+
+import os
+import numpy as np
+from django.conf import settings
+from .ann_index import get_index_dir
+from .embedding_index import _top_k
+
+# Defaults for the compressed matcher; override any key with
+# settings.BENCHMARK_EMBEDDING_COMPRESSION.
+COMPRESSION_DEFAULTS = {
+    "ENABLED": False,  # Use the compressed index when one exists for the version
+    "DIMS": 128,  # PCA output dimensions
+}
+
+SCAN_CHUNK_ROWS = 8192  # Rows de-quantized at a time while scoring
+
+
+def get_compression_settings() -> dict:
+    return {
+        **COMPRESSION_DEFAULTS,
+        **getattr(settings, "BENCHMARK_EMBEDDING_COMPRESSION", {}),
+    }
+
+
+class CompressedEmbeddingIndex:
+    """
+    A PCA-reduced, int8-quantized copy of an `EmbeddingIndex`.
+
+    Each row is projected to `dims` dimensions, re-normalized and stored as int8
+    codes with one float32 scale per row (768 float32 -> 128 int8 is ~24x
+    smaller). Queries are projected the same way and scored directly against
+    the codes; `search` has the same contract as `EmbeddingIndex.search`.
+    """
+
+    def __init__(self, ids, scores, components, codes, row_scales, version):
+        self.ids = ids
+        self.scores = scores
+        self.components = components
+        self.codes = codes
+        self.row_scales = row_scales
+        self.version = version
+        self.ivf = None  # The compressed scan is already cheap; no IVF on top.
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dims(self):
+        return self.components.shape[0]
+
+    @property
+    def input_dim(self):
+        return self.components.shape[1]
+
+    @classmethod
+    def fit(cls, index, dims=128):
+        """
+        Fits the projection on a full-precision index and quantizes its rows.
+        The PCA is uncentered (a truncated SVD), so cosine similarities keep
+        roughly the same scale and the matcher's thresholds still apply.
+        """
+        from sklearn.decomposition import TruncatedSVD
+
+        matrix = np.asarray(index.matrix, dtype=np.float32)
+        dims = min(dims, matrix.shape[0] - 1, matrix.shape[1] - 1)
+        svd = TruncatedSVD(n_components=dims, random_state=0).fit(matrix)
+        components = svd.components_.astype(np.float32)
+
+        codes, row_scales = _quantize(cls._project(matrix, components))
+        return cls(
+            index.ids, index.scores, components, codes, row_scales, index.version
+        )
+
+    @staticmethod
+    def _project(vectors, components):
+        reduced = vectors @ components.T
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return reduced / norms
+
+    def normalize_queries(self, query_vectors):
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        return self._project(queries, self.components)
+
+    def search(self, query_vectors, k=1, exact=False):
+        """
+        Top-k rows by cosine similarity in the compressed space.
+        Returns (positions, similarities) shaped (n_queries, k).
+        """
+        queries = self.normalize_queries(query_vectors)
+        k = min(k, len(self))
+        if k == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        similarities = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), SCAN_CHUNK_ROWS):
+            chunk = self.codes[start : start + SCAN_CHUNK_ROWS].astype(np.float32)
+            similarities[:, start : start + len(chunk)] = (
+                queries @ chunk.T
+            ) * self.row_scales[start : start + len(chunk)]
+
+        return _top_k(similarities, k)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.row_scales.nbytes + self.components.nbytes
+
+    # --- Persistence: built by `train_component_embeddings --compress` ---
+
+    @staticmethod
+    def path_for(component_type, version, dims):
+        return os.path.join(
+            get_index_dir(), f"{component_type}-v{version}-pca{dims}.npz"
+        )
+
+    def save(self, component_type, dims=None):
+        """
+        Saves under the requested `dims` (the DIMS setting `load` is called
+        with), which can be more than the fitted width: `fit` clamps it for
+        tables with fewer rows or columns.
+        """
+        os.makedirs(get_index_dir(), exist_ok=True)
+        path = self.path_for(component_type, self.version, dims or self.dims)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            ids=self.ids,
+            scores=self.scores,
+            components=self.components,
+            codes=self.codes,
+            row_scales=self.row_scales,
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, component_type, version, dims):
+        path = cls.path_for(component_type, version, dims)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(
+                data["ids"],
+                data["scores"],
+                data["components"],
+                data["codes"],
+                data["row_scales"],
+                version,
+            )
+
+
+def _quantize(vectors):
+    """Symmetric per-row int8 quantization: row ~= codes * scale."""
+    row_scales = np.abs(vectors).max(axis=1) / 127.0
+    row_scales[row_scales == 0] = 1.0
+    codes = np.round(vectors / row_scales[:, None]).astype(np.int8)
+    return codes, row_scales.astype(np.float32)
+
+
+def top1_agreement(full_index, compressed_index, queries):
+    """Fraction of queries whose best match is the same in both indexes."""
+    full_positions, _ = full_index.search(queries, k=1, exact=True)
+    compressed_positions, _ = compressed_index.search(queries, k=1)
+    return float(np.mean(full_positions[:, 0] == compressed_positions[:, 0]))
@@ -0,0 +1,28 @@
+# ai_recommender/logic/embedding_codec.py
+
+import numpy as np
+
+# Benchmark embeddings are stored as raw little-endian float32 bytes
+# (768 dims -> 3 KB per row, vs ~15 KB of JSON text).
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+
+def encode_embedding(vector) -> bytes:
+    """Packs one embedding vector into the bytes stored in the `embedding` column."""
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def decode_embedding(blob) -> np.ndarray:
+    """Zero-copy, read-only view of a stored embedding."""
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+def decode_embeddings(blobs) -> np.ndarray:
+    """
+    Decodes many stored embeddings into an (n_rows, dim) matrix with a single
+    copy: the blobs are joined once and viewed in place.
+    """
+    if not blobs:
+        return np.empty((0, 0), dtype=EMBEDDING_DTYPE)
+    matrix = np.frombuffer(b"".join(blobs), dtype=EMBEDDING_DTYPE)
+    return matrix.reshape(len(blobs), -1)
@@ -0,0 +1,264 @@
+# ai_recommender/logic/embedding_index.py
+
+import os
+import glob
+import threading
+import numpy as np
+from .embedding_codec import decode_embeddings
+from .ann_index import IVFIndex, get_ann_settings, get_index_dir
+
+
+class EmbeddingIndex:
+    """
+    An in-process, read-only snapshot of one benchmark table's embeddings.
+
+    Rows are held as a pre-normalized float32 matrix with parallel id and score
+    arrays, so a lookup is a single matrix-vector product instead of a table
+    scan per query.
+    """
+
+    def __init__(self, ids, scores, matrix, version, ivf=None):
+        self.ids = ids
+        self.scores = scores
+        self.matrix = matrix
+        self.version = version
+        # Optional approximate index, only attached for large tables.
+        self.ivf = ivf
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def input_dim(self):
+        """Dimension of the query vectors this index expects."""
+        return self.matrix.shape[1]
+
+    @classmethod
+    def build(cls, benchmark_model_class, version, with_ivf=True):
+        """Reads every stored embedding for a benchmark model once and normalizes it."""
+        rows = benchmark_model_class.objects.filter(
+            embedding__isnull=False
+        ).values_list("id", "score", "embedding")
+
+        ids, scores, blobs = [], [], []
+        for pk, score, embedding in rows.iterator(chunk_size=2000):
+            if embedding:
+                ids.append(pk)
+                scores.append(score)
+                blobs.append(embedding)
+
+        if not blobs:
+            return cls(
+                np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=np.int64),
+                np.empty((0, 0), dtype=np.float32),
+                version,
+            )
+
+        ids = np.asarray(ids, dtype=np.int64)
+        matrix = _normalize(decode_embeddings(blobs))
+        index = cls(ids, np.asarray(scores, dtype=np.int64), matrix, version)
+        if with_ivf:
+            index.attach_ivf(_component_type(benchmark_model_class))
+        return index
+
+    # --- Shared snapshot: written by `snapshot_embeddings`, mmapped by every worker ---
+
+    @staticmethod
+    def snapshot_paths(component_type, version):
+        base = os.path.join(get_index_dir(), f"{component_type}-v{version}")
+        return f"{base}.npy", f"{base}-meta.npz"
+
+    @staticmethod
+    def version_file(component_type):
+        return os.path.join(get_index_dir(), f"{component_type}.version")
+
+    def save_snapshot(self, component_type, keep=2):
+        """
+        Writes the normalized matrix as a .npy file plus an id/score sidecar,
+        then atomically points `<type>.version` at them. Older snapshots beyond
+        the last `keep` are removed; processes still mapping them are unaffected.
+        """
+        os.makedirs(get_index_dir(), exist_ok=True)
+        matrix_path, meta_path = self.snapshot_paths(component_type, self.version)
+
+        np.save(f"{matrix_path}.tmp.npy", np.ascontiguousarray(self.matrix))
+        os.replace(f"{matrix_path}.tmp.npy", matrix_path)
+        np.savez(f"{meta_path}.tmp.npz", ids=self.ids, scores=self.scores)
+        os.replace(f"{meta_path}.tmp.npz", meta_path)
+
+        version_path = self.version_file(component_type)
+        with open(f"{version_path}.tmp", "w") as f:
+            f.write(str(self.version))
+        os.replace(f"{version_path}.tmp", version_path)
+
+        pattern = os.path.join(get_index_dir(), f"{component_type}-v*.npy")
+        old_versions = sorted(
+            int(path.rsplit("-v", 1)[1][:-4])
+            for path in glob.glob(pattern)
+            if path.rsplit("-v", 1)[1][:-4].isdigit()
+        )[:-keep]
+        for old_version in old_versions:
+            for path in self.snapshot_paths(component_type, old_version):
+                if os.path.exists(path):
+                    os.remove(path)
+        return matrix_path
+
+    @classmethod
+    def load_snapshot(cls, component_type, version):
+        """
+        Memory-maps the snapshot for `version` if it is the published one, so all
+        workers on the machine share the same page-cache pages. Returns None
+        when there is no matching snapshot.
+        """
+        try:
+            with open(cls.version_file(component_type)) as f:
+                published = int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+        if published != version:
+            return None
+
+        matrix_path, meta_path = cls.snapshot_paths(component_type, version)
+        try:
+            matrix = np.load(matrix_path, mmap_mode="r")
+            with np.load(meta_path) as meta:
+                ids, scores = meta["ids"], meta["scores"]
+        except OSError:
+            return None
+
+        index = cls(ids, scores, matrix, version)
+        index.attach_ivf(component_type)
+        return index
+
+    def attach_ivf(self, component_type, build_if_missing=False):
+        """
+        Attaches an IVF index when the table is large enough for approximate
+        search to pay off. Only a prebuilt one (from `train_component_embeddings
+        --build-ann` or the import's embed stage) matching this version is used;
+        without one, search stays exact. The k-means fit is left to those offline
+        paths unless `build_if_missing` is set.
+        """
+        ann_settings = get_ann_settings()
+        if not ann_settings["ENABLED"] or len(self) < ann_settings["MIN_ROWS"]:
+            return None
+
+        self.ivf = IVFIndex.load(component_type, self.version, self.ids)
+        if self.ivf is None and build_if_missing:
+            print(f"Building {component_type.upper()} IVF index ({len(self)} rows)...")
+            self.ivf = IVFIndex.build(self.matrix, ann_settings["N_LISTS"])
+        return self.ivf
+
+    @staticmethod
+    def normalize_queries(query_vectors):
+        return _normalize(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+
+    def search(self, query_vectors, k=1, exact=False):
+        """
+        Finds the top-k rows by cosine similarity for one or more query vectors.
+
+        Returns a pair of (positions, similarities) arrays shaped (n_queries, k),
+        ordered from most to least similar. Positions index into `ids` and
+        `scores`. Large tables use the IVF index unless `exact` is set.
+        """
+        queries = self.normalize_queries(query_vectors)
+        k = min(k, len(self))
+        if k == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        if self.ivf is not None and not exact:
+            return self.ivf.search(
+                queries, self.matrix, k=k, n_probe=get_ann_settings()["N_PROBE"]
+            )
+
+        return _top_k(queries @ self.matrix.T, k)
+
+
+def _top_k(similarities, k):
+    """(positions, similarities) of the k best columns per row, best first."""
+    if k < similarities.shape[1]:
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(similarities.shape[1]), (len(similarities), 1))
+    top_similarities = np.take_along_axis(similarities, top, axis=1)
+    order = np.argsort(-top_similarities, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    return top, np.take_along_axis(top_similarities, order, axis=1)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _component_type(benchmark_model_class):
+    # CPUBenchmark -> "cpu", GPUBenchmark -> "gpu"
+    return benchmark_model_class._meta.model_name.replace("benchmark", "")
+
+
+_indexes = {}  # Per-process cache: component type -> EmbeddingIndex
+_indexes_lock = threading.Lock()
+
+
+def _load_index(benchmark_model_class, component_type, version):
+    """
+    Picks the cheapest available source for `version`: the compressed index
+    (if enabled), then the shared mmapped snapshot, then the table itself.
+    """
+    from .compressed_index import CompressedEmbeddingIndex, get_compression_settings
+
+    compression = get_compression_settings()
+    if compression["ENABLED"]:
+        index = CompressedEmbeddingIndex.load(
+            component_type, version, compression["DIMS"]
+        )
+        if index is not None:
+            print(
+                f"Loaded compressed {component_type.upper()} embedding index "
+                f"(v{version}, {index.dims} dims)."
+            )
+            return index
+        print(
+            f"WARNING: Compression is enabled but there is no compressed "
+            f"{component_type.upper()} index for v{version}; using full precision. "
+            "It is rebuilt by imports and dataset switches, or by "
+            "train_component_embeddings --compress-only --compress DIMS."
+        )
+
+    index = EmbeddingIndex.load_snapshot(component_type, version)
+    if index is not None:
+        print(f"Mapped {component_type.upper()} embedding snapshot (v{version}).")
+        return index
+
+    print(f"Building {component_type.upper()} embedding index (v{version})...")
+    return EmbeddingIndex.build(benchmark_model_class, version)
+
+
+def get_embedding_index(benchmark_model_class):
+    """
+    Returns the cached index for a benchmark model, rebuilding it only when the
+    model's `BenchmarkVersion` stamp has moved since it was loaded.
+    """
+    from ..models import BenchmarkVersion
+
+    component_type = _component_type(benchmark_model_class)
+    version = BenchmarkVersion.current(component_type)
+
+    index = _indexes.get(component_type)
+    if index is not None and index.version == version:
+        return index
+
+    with _indexes_lock:
+        index = _indexes.get(component_type)
+        if index is None or index.version != version:
+            index = _load_index(benchmark_model_class, component_type, version)
+            _indexes[component_type] = index
+    return index
+
+
+def clear_embedding_indexes():
+    """Drops every cached index in this process; they rebuild on next use."""
+    with _indexes_lock:
+        _indexes.clear()
@@ -0,0 +1,247 @@
+# ai_recommender/logic/embedding_refresh.py
+
+import hashlib
+import json
+import os
+import time
+from multiprocessing import Pool
+from django.db import connection, connections
+from .embedding_codec import encode_embedding
+from .encoder import describe_encoder, load_sentence_model
+
+REFRESH_BATCH_SIZE = 100
+
+
+def embedding_text_hash(text: str, encoder_name: str) -> str:
+    """
+    Fingerprint of what an embedding was computed from: the encoded text and
+    the encoder. A row needs re-encoding exactly when this changes.
+    """
+    return hashlib.sha256(f"{encoder_name}\n{text}".encode("utf-8")).hexdigest()
+
+
+def iter_stale_rows(
+    model_class, encoder_name, batch_size=REFRESH_BATCH_SIZE, after_pk=0, rows=None
+):
+    """
+    Yields lists of (pk, model_name, new hash) for rows whose stored hash does
+    not match their current name and encoder, starting after `after_pk`.
+    Pages by primary key, so each page is an index range scan however far in.
+    `rows` narrows the scan (defaults to the live dataset).
+    """
+    rows = model_class.objects.all() if rows is None else rows
+    last_pk = after_pk
+    while True:
+        # Ensure the database connection is alive before each page
+        connection.ensure_connection()
+        page = list(
+            rows.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "model_name", "embedding_hash")[:batch_size]
+        )
+        if not page:
+            return
+        last_pk = page[-1][0]
+
+        stale = []
+        for pk, model_name, stored_hash in page:
+            new_hash = embedding_text_hash(model_name, encoder_name)
+            if new_hash != stored_hash:
+                stale.append((pk, model_name, new_hash))
+        if stale:
+            yield stale
+
+
+# --- Resume cursor: the last primary key whose batch was committed ---
+
+
+def _cursor_path(component_type, dataset=None):
+    from .benchmark_import import get_checkpoint_dir
+
+    suffix = f"-{dataset.number}" if dataset is not None else ""
+    return os.path.join(
+        get_checkpoint_dir(), f"embeddings-{component_type}{suffix}.json"
+    )
+
+
+def load_cursor(component_type, encoder_name, dataset=None) -> int:
+    """The pk to resume after, or 0 if there is no cursor for this encoder."""
+    path = _cursor_path(component_type, dataset)
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        cursor = json.load(f)
+    return cursor["last_pk"] if cursor.get("encoder") == encoder_name else 0
+
+
+def save_cursor(component_type, encoder_name, last_pk, dataset=None):
+    path = _cursor_path(component_type, dataset)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"encoder": encoder_name, "last_pk": last_pk}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def clear_cursor(component_type, dataset=None):
+    path = _cursor_path(component_type, dataset)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+# --- Process pool: each worker loads the encoder once and only encodes ---
+
+_worker_model = None
+
+
+def _init_worker():
+    global _worker_model
+    import django
+
+    django.setup()
+    _worker_model = load_sentence_model()
+
+
+def _encode_batch(names):
+    return [
+        encode_embedding(vector)
+        for vector in _worker_model.encode(names, show_progress_bar=False)
+    ]
+
+
+def refresh_embeddings(
+    model_class,
+    sentence_model=None,
+    batch_size=REFRESH_BATCH_SIZE,
+    full=False,
+    workers=1,
+    resume=False,
+    on_batch=None,
+    dataset=None,
+):
+    """
+    Encodes only the CPU/GPU benchmark rows that are new or whose `model_name`
+    (or the configured encoder) changed since their embedding was stored, and
+    writes embedding + hash back with one bulk_update per batch.
+
+    `full=True` first clears every stored hash, so an interrupted full run
+    still resumes where it stopped. With `workers > 1` the batches are encoded
+    by a process pool (one encoder per process) while this process writes them
+    in order. After each write the last pk is saved as a cursor, which
+    `resume=True` continues from. `on_batch(progress)` is called after each write.
+    `dataset` selects a staged (not yet active) dataset instead of the live one.
+
+    Returns {"checked": rows in the table, "encoded": rows re-encoded, "seconds": ...}.
+    """
+    from ..models import BenchmarkVersion, CPUBenchmark
+
+    component_type = "cpu" if model_class == CPUBenchmark else "gpu"
+    encoder_name = describe_encoder()
+    started = time.perf_counter()
+    rows = (
+        model_class.objects.all()
+        if dataset is None
+        else model_class.all_versions.filter(dataset=dataset)
+    )
+
+    after_pk = load_cursor(component_type, encoder_name, dataset) if resume else 0
+    if full and not after_pk:
+        rows.update(embedding_hash="")
+
+    # Only pks and names, so the whole work list is small even for big tables.
+    batches = list(
+        iter_stale_rows(model_class, encoder_name, batch_size, after_pk, rows)
+    )
+    names = [[model_name for _, model_name, _ in batch] for batch in batches]
+    total = sum(len(batch) for batch in batches)
+
+    pool = None
+    if workers > 1 and len(batches) > 1:
+        # Children must not share this process's database connection.
+        connections.close_all()
+        pool = Pool(min(workers, len(batches)), initializer=_init_worker)
+        encoded_batches = pool.imap(_encode_batch, names)
+    else:
+        if sentence_model is None:
+            from .utils import get_sentence_model
+
+            sentence_model = get_sentence_model()
+        encoded_batches = (
+            [
+                encode_embedding(vector)
+                for vector in sentence_model.encode(batch, show_progress_bar=False)
+            ]
+            for batch in names
+        )
+
+    encoded = 0
+    try:
+        for batch, blobs in zip(batches, encoded_batches):
+            # all_versions: the default manager would skip staged rows.
+            model_class.all_versions.bulk_update(
+                [
+                    model_class(pk=pk, embedding=blob, embedding_hash=new_hash)
+                    for (pk, _, new_hash), blob in zip(batch, blobs)
+                ],
+                ["embedding", "embedding_hash"],
+            )
+            encoded += len(batch)
+            save_cursor(component_type, encoder_name, batch[-1][0], dataset)
+            if on_batch:
+                on_batch(
+                    {
+                        "encoded": encoded,
+                        "total": total,
+                        "seconds": round(time.perf_counter() - started, 3),
+                    }
+                )
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if encoded and (dataset is None or dataset.status == "active"):
+            # Invalidate the in-process embedding indexes of every web/Celery worker.
+            BenchmarkVersion.bump(component_type)
+
+    clear_cursor(component_type, dataset)
+    return {
+        "checked": rows.count(),
+        "encoded": encoded,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def refresh_after_import(item_type: str, dataset=None):
+    """
+    The embed stage of a benchmark import: re-encodes the changed rows and
+    writes a fresh snapshot (scores change on import even when names don't),
+    plus the IVF index for tables large enough to use one and, when
+    BENCHMARK_EMBEDDING_COMPRESSION is enabled, the compressed index.
+    A staged dataset is only encoded; its snapshot is written once it is live.
+    Returns the refresh summary, or None for types without embeddings.
+    """
+    from ..models import BenchmarkVersion, CPUBenchmark, GPUBenchmark
+    from .compressed_index import CompressedEmbeddingIndex, get_compression_settings
+    from .embedding_index import EmbeddingIndex
+
+    model_class = {"cpu": CPUBenchmark, "gpu": GPUBenchmark}.get(item_type)
+    if model_class is None:
+        return None
+
+    started = time.perf_counter()
+    summary = refresh_embeddings(model_class, dataset=dataset)
+    if dataset is not None and dataset.status != "active":
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        return summary
+    index = EmbeddingIndex.build(
+        model_class, BenchmarkVersion.current(item_type), with_ivf=False
+    )
+    if len(index):
+        index.save_snapshot(item_type)
+        if index.attach_ivf(item_type, build_if_missing=True) is not None:
+            index.ivf.save(item_type, index.version, index.ids)
+        compression = get_compression_settings()
+        if compression["ENABLED"] and len(index) > 1:
+            CompressedEmbeddingIndex.fit(index, compression["DIMS"]).save(
+                item_type, compression["DIMS"]
+            )
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
@@ -0,0 +1,233 @@
+# ai_recommender/logic/embedding_service.py
+#
+# An optional local sidecar that owns the sentence encoder and the benchmark
+# embedding indexes, so web and Celery workers on the same machine don't each
+# load a ~400 MB model. Workers talk to it over a Unix socket through
+# `get_embedding_client()`; when it isn't running they match in-process.
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import time
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Defaults for the sidecar; override any key with settings.EMBEDDING_SERVICE.
+SERVICE_DEFAULTS = {
+    "SOCKET": "",  # Unix socket path; empty disables the sidecar
+    "TIMEOUT": 10.0,  # Seconds a worker waits for a reply before falling back
+    "RETRY_AFTER": 30.0,  # Seconds to stay in-process after a failed call
+}
+
+_FRAME_HEADER = struct.Struct("!II")  # (json header length, binary payload length)
+
+
+def get_service_settings() -> dict:
+    return {**SERVICE_DEFAULTS, **getattr(settings, "EMBEDDING_SERVICE", {})}
+
+
+class EmbeddingServiceUnavailable(Exception):
+    pass
+
+
+# --- Wire format: a JSON header followed by raw numpy array bytes ---
+
+
+def _send_frame(sock, header, arrays=()):
+    arrays = [np.ascontiguousarray(a) for a in arrays]
+    header = dict(header, arrays=[[a.dtype.str, a.shape] for a in arrays])
+    header_bytes = json.dumps(header).encode()
+    payload = b"".join(a.tobytes() for a in arrays)
+    sock.sendall(
+        _FRAME_HEADER.pack(len(header_bytes), len(payload)) + header_bytes + payload
+    )
+
+
+def _recv_exactly(sock, size):
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed mid-frame.")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock):
+    """Returns (header, arrays), or (None, None) if the peer closed cleanly."""
+    first = sock.recv(_FRAME_HEADER.size)
+    if not first:
+        return None, None
+    if len(first) < _FRAME_HEADER.size:
+        first += _recv_exactly(sock, _FRAME_HEADER.size - len(first))
+    header_length, payload_length = _FRAME_HEADER.unpack(first)
+    header = json.loads(_recv_exactly(sock, header_length))
+    payload = _recv_exactly(sock, payload_length)
+
+    arrays, offset = [], 0
+    for dtype, shape in header.pop("arrays"):
+        count = int(np.prod(shape))
+        array = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+        arrays.append(array.reshape(shape))
+        offset += count * np.dtype(dtype).itemsize
+    return header, arrays
+
+
+# --- Client, used by ai_recommender/logic/utils.py ---
+
+
+class EmbeddingServiceClient:
+    def __init__(self, socket_path, timeout):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _call(self, header):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                _send_frame(sock, header)
+                reply, arrays = _recv_frame(sock)
+        except (OSError, ValueError) as e:
+            raise EmbeddingServiceUnavailable(str(e)) from e
+        if reply is None:
+            raise EmbeddingServiceUnavailable("Service closed the connection.")
+        if reply.get("error"):
+            raise EmbeddingServiceUnavailable(reply["error"])
+        return reply, arrays
+
+    def encode(self, texts):
+        """Encodes strings with the service's model; returns an (n, dim) array."""
+        _, (vectors,) = self._call({"op": "encode", "texts": list(texts)})
+        return vectors
+
+    def stats(self):
+        """The service's encoder batching counters."""
+        reply, _ = self._call({"op": "stats"})
+        return reply["stats"]
+
+    def match(self, texts, component_type):
+        """
+        Nearest benchmark for each string. Returns (ids, scores, similarities)
+        arrays, or None when the service has no embeddings for the type.
+        """
+        reply, arrays = self._call(
+            {"op": "match", "texts": list(texts), "component_type": component_type}
+        )
+        if reply.get("empty"):
+            return None
+        return tuple(arrays)
+
+
+_unavailable_until = 0.0
+
+
+def get_embedding_client():
+    """
+    Returns a client when the sidecar is configured and its socket exists,
+    otherwise None (callers then work in-process).
+    """
+    service_settings = get_service_settings()
+    socket_path = service_settings["SOCKET"]
+    if not socket_path or time.monotonic() < _unavailable_until:
+        return None
+    if not os.path.exists(socket_path):
+        return None
+    return EmbeddingServiceClient(socket_path, service_settings["TIMEOUT"])
+
+
+def mark_unavailable():
+    """Stops trying the sidecar for RETRY_AFTER seconds after a failed call."""
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + get_service_settings()["RETRY_AFTER"]
+
+
+# --- Server, run with `python manage.py run_embedding_service` ---
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        from django.db import close_old_connections
+
+        while True:
+            try:
+                header, _ = _recv_frame(self.request)
+            except (OSError, ValueError):
+                return
+            if header is None:
+                return
+            try:
+                reply, arrays = self.server.dispatch(header)
+            except Exception as e:
+                reply, arrays = {"error": f"{type(e).__name__}: {e}"}, ()
+            finally:
+                close_old_connections()
+            _send_frame(self.request, reply, arrays)
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128  # Every worker on the machine may connect at once
+
+    def __init__(self, socket_path, encode):
+        self.encode = encode
+        super().__init__(socket_path, _RequestHandler)
+
+    def dispatch(self, header):
+        from .utils import match_candidates_in_process, encoder_stats
+        from ..models import CPUBenchmark, GPUBenchmark
+
+        texts = header.get("texts") or []
+        if header.get("op") == "stats":
+            return {"stats": encoder_stats()}, []
+
+        if header.get("op") == "encode":
+            return {}, [np.asarray(self.encode(texts), dtype=np.float32)]
+
+        if header.get("op") == "match":
+            model_class = {"cpu": CPUBenchmark, "gpu": GPUBenchmark}[
+                header["component_type"]
+            ]
+            matches = match_candidates_in_process(texts, model_class, self.encode)
+            if matches is None:
+                return {"empty": True}, []
+            return {}, list(matches)
+
+        return {"error": f"Unknown op {header.get('op')!r}"}, []
+
+
+def serve(socket_path=None):
+    """Loads the model once and serves encode/match requests until interrupted."""
+    from .encoder import get_encoder_settings
+    from .utils import get_sentence_model
+
+    # Request threads must not run the model concurrently; the batcher's
+    # thread is the only one that does.
+    if not get_encoder_settings()["BATCHING"]:
+        raise ImproperlyConfigured(
+            "The embedding service needs SENTENCE_ENCODER['BATCHING'] enabled."
+        )
+
+    socket_path = socket_path or get_service_settings()["SOCKET"]
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # Left behind by a previous run
+
+    model = get_sentence_model()
+    model.encode(["warm-up"])  # Load it now rather than on the first request
+
+    server = EmbeddingServer(socket_path, model.encode)
+    # Exit through the `finally` below on SIGTERM too, so the socket is removed.
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    print(f"Embedding service listening on {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
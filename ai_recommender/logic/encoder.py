@@ -0,0 +1,67 @@
+# ai_recommender/logic/encoder.py
+
+from django.conf import settings
+
+# Defaults for the sentence encoder; override any key with settings.SENTENCE_ENCODER.
+# Benchmark embeddings and query embeddings must come from the same encoder, so
+# changing MODEL means re-running `train_component_embeddings`.
+ENCODER_DEFAULTS = {
+    "MODEL": "all-mpnet-base-v2",  # e.g. "all-MiniLM-L6-v2" for a ~5x smaller model
+    "QUANTIZE": False,  # torch dynamic int8 quantization of the Linear layers
+    "DEVICE": "cpu",
+    "BATCHING": True,  # Coalesce concurrent encode calls within a process
+    "BATCH_MAX_SIZE": 32,  # Strings per batched forward pass
+    "BATCH_MAX_WAIT_MS": 5,  # How long the first call waits for company
+}
+
+
+def get_encoder_settings(**overrides) -> dict:
+    return {
+        **ENCODER_DEFAULTS,
+        **getattr(settings, "SENTENCE_ENCODER", {}),
+        **overrides,
+    }
+
+
+def load_sentence_model(**overrides):
+    """
+    Builds the SentenceTransformer configured by SENTENCE_ENCODER. Keyword
+    overrides (MODEL, QUANTIZE, DEVICE) are used by the comparison command.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    encoder_settings = get_encoder_settings(**overrides)
+    model = SentenceTransformer(
+        encoder_settings["MODEL"], device=encoder_settings["DEVICE"]
+    )
+    if encoder_settings["QUANTIZE"]:
+        import torch
+
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return model
+
+
+def describe_encoder(**overrides) -> str:
+    encoder_settings = get_encoder_settings(**overrides)
+    suffix = " (int8)" if encoder_settings["QUANTIZE"] else ""
+    return f"{encoder_settings['MODEL']}{suffix}"
+
+
+def load_batching_sentence_model(**overrides):
+    """
+    The configured encoder behind a micro-batching queue (unless BATCHING is
+    off), for use by request handlers and tasks that encode concurrently.
+    """
+    from .batching import BatchingEncoder
+
+    encoder_settings = get_encoder_settings(**overrides)
+    model = load_sentence_model(**overrides)
+    if not encoder_settings["BATCHING"]:
+        return model
+    return BatchingEncoder(
+        model,
+        max_batch=encoder_settings["BATCH_MAX_SIZE"],
+        max_wait_ms=encoder_settings["BATCH_MAX_WAIT_MS"],
+    )
@@ -0,0 +1,145 @@
+# ai_recommender/logic/lexical_index.py
+
+import bisect
+import difflib
+import threading
+import numpy as np
+from .embedding_index import _component_type
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text.strip().lower()} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class LexicalIndex:
+    """
+    A character-trigram inverted index over one benchmark table's `model_name`.
+
+    A query's trigrams narrow the table down to a few dozen candidates, and only
+    those are scored precisely with difflib. For CPUs it also keeps clock speeds
+    in a sorted array, so "weakest CPU at or above X GHz" is a bisect.
+    """
+
+    CANDIDATE_LIMIT = 50
+
+    def __init__(self, ids, scores, names, postings, version, speeds=None):
+        self.ids = ids
+        self.scores = scores
+        self.names = names
+        self.postings = postings
+        self.version = version
+        # Sorted clock speeds, and for each position the row with the lowest
+        # score among all CPUs at least that fast.
+        self.speeds, self.weakest_at_or_above = speeds or ([], [])
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, benchmark_model_class, version):
+        has_speed = any(
+            f.name == "clock_speed_ghz" for f in benchmark_model_class._meta.fields
+        )
+        fields = ["id", "model_name", "score"] + (
+            ["clock_speed_ghz"] if has_speed else []
+        )
+
+        ids, names, scores, speed_rows = [], [], [], []
+        postings = {}
+        for position, row in enumerate(
+            benchmark_model_class.objects.values_list(*fields).iterator(chunk_size=2000)
+        ):
+            pk, model_name, score = row[:3]
+            ids.append(pk)
+            names.append(model_name.lower())
+            scores.append(score)
+            for trigram in _trigrams(model_name):
+                postings.setdefault(trigram, []).append(position)
+            if has_speed and row[3] is not None:
+                speed_rows.append((float(row[3]), position))
+
+        postings = {t: np.asarray(p, dtype=np.int32) for t, p in postings.items()}
+
+        speeds = None
+        if speed_rows:
+            speed_rows.sort()
+            weakest_at_or_above = [0] * len(speed_rows)
+            weakest = None
+            for i in range(len(speed_rows) - 1, -1, -1):
+                position = speed_rows[i][1]
+                if weakest is None or scores[position] < scores[weakest]:
+                    weakest = position
+                weakest_at_or_above[i] = weakest
+            speeds = ([s for s, _ in speed_rows], weakest_at_or_above)
+
+        return cls(
+            np.asarray(ids, dtype=np.int64),
+            np.asarray(scores, dtype=np.int64),
+            names,
+            postings,
+            version,
+            speeds,
+        )
+
+    def candidates(self, query: str):
+        """Returns the positions sharing the most trigrams with the query."""
+        hits = [self.postings[t] for t in _trigrams(query) if t in self.postings]
+        if not hits:
+            return np.empty(0, dtype=np.int32)
+        counts = np.bincount(np.concatenate(hits), minlength=len(self))
+        limit = min(self.CANDIDATE_LIMIT, np.count_nonzero(counts))
+        return np.argpartition(-counts, limit - 1)[:limit]
+
+    def best_matches(self, query: str):
+        """
+        Scores the trigram candidates with difflib and returns
+        (best similarity, positions sharing that similarity).
+        """
+        query = query.strip().lower()
+        best_similarity, best_positions = 0.0, []
+        for position in self.candidates(query):
+            similarity = difflib.SequenceMatcher(
+                None, query, self.names[position]
+            ).ratio()
+            if similarity > best_similarity:
+                best_similarity, best_positions = similarity, [position]
+            elif similarity == best_similarity:
+                best_positions.append(position)
+        return best_similarity, best_positions
+
+    def weakest_at_speed(self, speed: float):
+        """
+        Position of the lowest-scoring CPU at or above `speed` GHz, or None: the
+        least a bare "X GHz" requirement can mean.
+        """
+        i = bisect.bisect_left(self.speeds, speed)
+        if i == len(self.speeds):
+            return None
+        return self.weakest_at_or_above[i]
+
+
+_indexes = {}  # Per-process cache: component type -> LexicalIndex
+_indexes_lock = threading.Lock()
+
+
+def get_lexical_index(benchmark_model_class):
+    """
+    Returns the cached trigram index for a benchmark model, rebuilding it only
+    when the model's `BenchmarkVersion` stamp has moved since it was loaded.
+    """
+    from ..models import BenchmarkVersion
+
+    component_type = _component_type(benchmark_model_class)
+    version = BenchmarkVersion.current(component_type)
+
+    index = _indexes.get(component_type)
+    if index is not None and index.version == version:
+        return index
+
+    with _indexes_lock:
+        index = _indexes.get(component_type)
+        if index is None or index.version != version:
+            index = LexicalIndex.build(benchmark_model_class, version)
+            _indexes[component_type] = index
+    return index
@@ -0,0 +1,197 @@
+# ai_recommender/logic/model_manager.py
+
+import gc
+import os
+import resource
+import threading
+import time
+from django.conf import settings
+from .encoder import load_batching_sentence_model, describe_encoder
+
+# Defaults for encoder eviction; override any key with settings.ENCODER_EVICTION.
+EVICTION_DEFAULTS = {
+    "IDLE_SECONDS": None,  # Unload after this long without an encode; None = never
+    "MAX_RSS_MB": None,  # Unload (when idle) once process RSS exceeds this; None = never
+    "CHECK_INTERVAL": 60,  # Seconds between background checks
+}
+
+
+def get_eviction_settings() -> dict:
+    return {**EVICTION_DEFAULTS, **getattr(settings, "ENCODER_EVICTION", {})}
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is missing)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _release_memory():
+    """Returns freed model memory to the OS as far as the allocators allow."""
+    gc.collect()
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+    try:
+        import ctypes
+
+        ctypes.CDLL("libc.so.6").malloc_trim(0)  # glibc keeps freed arenas otherwise
+    except (OSError, AttributeError):
+        pass
+
+
+class EncoderManager:
+    """
+    Owns this process's sentence encoder: loads it on first use, tracks when it
+    was last used and roughly how much RSS it added, and unloads it after an
+    idle period or when the process grows past a memory threshold. It is
+    reloaded transparently on the next encode.
+    """
+
+    def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {
+            "loads": 0,
+            "unloads": 0,
+            "last_load_seconds": None,
+            "model_rss_mb": None,
+            "loaded_at": None,
+            "last_used_at": None,
+            "resident_seconds": 0.0,  # Total time loaded, across loads
+            "last_unload_reason": None,
+        }
+        self._reaper = None
+
+    def _load(self):
+        print(f"Loading sentence encoder {describe_encoder()} for matching...")
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        self._model = load_batching_sentence_model()
+        self._stats["loads"] += 1
+        self._stats["last_load_seconds"] = round(time.perf_counter() - started, 3)
+        self._stats["model_rss_mb"] = round(current_rss_mb() - rss_before, 1)
+        self._stats["loaded_at"] = time.time()
+        self._start_reaper()
+
+    def encode(self, sentences, **kwargs):
+        with self._lock:
+            if self._model is None:
+                self._load()
+            model = self._model
+            self._in_flight += 1
+        try:
+            return model.encode(sentences, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._stats["last_used_at"] = time.time()
+
+    @property
+    def is_loaded(self):
+        return self._model is not None
+
+    def unload(self, reason="manual"):
+        """Drops the model unless an encode is running. Returns True if it unloaded."""
+        with self._lock:
+            if self._model is None or self._in_flight:
+                return False
+            model, self._model = self._model, None
+            self._stats["unloads"] += 1
+            self._stats["resident_seconds"] += time.time() - self._stats["loaded_at"]
+            self._stats["loaded_at"] = None
+            self._stats["last_unload_reason"] = reason
+        if hasattr(model, "close"):
+            model.close()
+        del model
+        _release_memory()
+        print(f"Unloaded sentence encoder ({reason}).")
+        return True
+
+    def maybe_unload(self):
+        """Unloads the model if it has been idle too long or the process is too big."""
+        if self._model is None:
+            return False
+        eviction = get_eviction_settings()
+        last_used = self._stats["last_used_at"] or self._stats["loaded_at"]
+        idle = time.time() - last_used
+        if eviction["IDLE_SECONDS"] is not None and idle >= eviction["IDLE_SECONDS"]:
+            return self.unload(f"idle for {idle:.0f}s")
+        if eviction["MAX_RSS_MB"] is not None:
+            rss = current_rss_mb()
+            # Only evict when idle for a moment, so a busy worker isn't thrashed.
+            if rss >= eviction["MAX_RSS_MB"] and idle >= eviction["CHECK_INTERVAL"]:
+                return self.unload(f"RSS {rss:.0f} MB over {eviction['MAX_RSS_MB']} MB")
+        return False
+
+    def _start_reaper(self):
+        eviction = get_eviction_settings()
+        if eviction["IDLE_SECONDS"] is None and eviction["MAX_RSS_MB"] is None:
+            return
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._reaper = threading.Thread(
+            target=self._reap, name="encoder-eviction", daemon=True
+        )
+        self._reaper.start()
+
+    def _reap(self):
+        interval = get_eviction_settings()["CHECK_INTERVAL"]
+        while self._model is not None:
+            time.sleep(interval)
+            try:
+                self.maybe_unload()
+            except Exception as e:
+                print(f"WARNING: Encoder eviction check failed: {e}")
+
+    def _after_fork(self):
+        # Locks and threads don't survive fork; a preloaded model does.
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._reaper = None
+        if self._model is not None:
+            self._start_reaper()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            model = self._model
+        stats["loaded"] = model is not None
+        stats["encoder"] = describe_encoder()
+        stats["process_rss_mb"] = round(current_rss_mb(), 1)
+        if stats["loaded_at"]:
+            stats["resident_seconds"] += time.time() - stats["loaded_at"]
+        stats["resident_seconds"] = round(stats["resident_seconds"], 1)
+        if model is not None and hasattr(model, "stats"):
+            stats["batching"] = model.stats()
+        return stats
+
+
+class ManagedEncoder:
+    """
+    What `get_sentence_model()` hands out: a stable handle with the
+    SentenceTransformer `encode` signature whose model may be unloaded and
+    reloaded underneath it.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def encode(self, sentences, **kwargs):
+        return self.manager.encode(sentences, **kwargs)
+
+    def stats(self) -> dict:
+        return self.manager.stats()
+
+
+encoder_manager = EncoderManager()
+os.register_at_fork(after_in_child=encoder_manager._after_fork)
+managed_encoder = ManagedEncoder(encoder_manager)
@@ -0,0 +1,111 @@
+# ai_recommender/logic/model_tokens.py
+
+import re
+
+# Each pattern captures an unambiguous model number and knows how to print it
+# in canonical form, e.g. "Intel Core(TM) i7 9700K" -> "i7-9700k".
+CPU_TOKEN_PATTERNS = [
+    # Intel Core i3/i5/i7/i9, e.g. i7-9700K, i5 8400, i7-1165G7
+    (
+        re.compile(r"\b(i[3579])\s*-?\s*(\d{3,5}(?:[a-z]{1,2}\d?)?)\b"),
+        lambda m: f"{m.group(1)}-{m.group(2)}",
+    ),
+    # Intel Core Ultra, e.g. Core Ultra 7 155H
+    (
+        re.compile(r"\bultra\s*([579])\s*(\d{3}[a-z]{0,2})\b"),
+        lambda m: f"ultra {m.group(1)} {m.group(2)}",
+    ),
+    # AMD Ryzen, e.g. Ryzen 7 2700X, Ryzen 5 PRO 4650G
+    (
+        re.compile(r"\bryzen\s*([3579])\s*(?:pro\s*)?(\d{4}[a-z0-9]{0,3})\b"),
+        lambda m: f"ryzen {m.group(1)} {m.group(2)}",
+    ),
+    # AMD Ryzen Threadripper, e.g. Threadripper 3990X
+    (
+        re.compile(r"\bthreadripper\s*(?:pro\s*)?(\d{4}[a-z]{0,2})\b"),
+        lambda m: f"threadripper {m.group(1)}",
+    ),
+]
+
+GPU_TOKEN_PATTERNS = [
+    # NVIDIA GeForce, e.g. RTX 3070, GTX 1660 SUPER, RTX 4070 Ti SUPER
+    (
+        re.compile(r"\b(rtx|gtx|gt|mx)\s*-?\s*(\d{3,4})\b(\s*ti\b)?(\s*super\b)?"),
+        lambda m: " ".join(
+            part
+            for part in (
+                m.group(1),
+                m.group(2),
+                "ti" if m.group(3) else "",
+                "super" if m.group(4) else "",
+            )
+            if part
+        ),
+    ),
+    # AMD Radeon RX, e.g. RX 580, RX 6800 XT, RX 7900 XTX
+    (
+        re.compile(r"\brx\s*-?\s*(\d{3,4})\b(\s*(?:xtx|xt|gre)\b)?"),
+        lambda m: " ".join(
+            part for part in ("rx", m.group(1), (m.group(2) or "").strip()) if part
+        ),
+    ),
+    # AMD Radeon Vega, e.g. RX Vega 56
+    (
+        re.compile(r"\bvega\s*(\d{2})\b"),
+        lambda m: f"vega {m.group(1)}",
+    ),
+    # Intel Arc, e.g. Arc A770
+    (
+        re.compile(r"\barc\s*([ab]\d{3}m?)\b"),
+        lambda m: f"arc {m.group(1)}",
+    ),
+]
+
+# Laptop variants share a model number with much faster desktop parts.
+MOBILE_GPU_PATTERN = re.compile(r"\b(laptop|mobile|max-?q)\b")
+
+
+def extract_model_token(text: str, component_type: str) -> str | None:
+    """
+    Returns the canonical model-number token found in a component string,
+    or None when the string has no unambiguous model number.
+    e.g. "Intel Core i7-9700K @ 3.60GHz" -> "i7-9700k",
+         "NVIDIA GeForce RTX 3070 Laptop GPU" -> "rtx 3070 mobile"
+    """
+    if not text:
+        return None
+
+    clean_text = re.sub(r"\((r|tm)\)|[®™]", " ", str(text).lower())
+    patterns = CPU_TOKEN_PATTERNS if component_type == "cpu" else GPU_TOKEN_PATTERNS
+
+    for pattern, formatter in patterns:
+        match = pattern.search(clean_text)
+        if match:
+            token = formatter(match)
+            if component_type != "cpu" and MOBILE_GPU_PATTERN.search(clean_text):
+                token += " mobile"
+            return token
+    return None
+
+
+# --- Benchmark name parsing, shared by the model save() methods and bulk imports ---
+
+GPU_VENDOR_PREFIX = re.compile(
+    r"^(?:nvidia\s*)?(?:amd\s*)?(?:intel\s*)?", re.IGNORECASE
+)
+CLOCK_SPEED = re.compile(r"(\d+\.?\d*)\s*GHz", re.IGNORECASE)
+
+
+def parse_cpu_name(name: str):
+    """'Intel Core i7-9700K @ 3.60GHz' -> ('Intel Core i7-9700K', 3.6)"""
+    clean_name = name.strip()
+    if "@" not in clean_name:
+        return clean_name, None
+    model_name, speed_part = clean_name.split("@", 1)
+    speed_match = CLOCK_SPEED.search(speed_part)
+    return model_name.strip(), float(speed_match.group(1)) if speed_match else None
+
+
+def parse_gpu_name(name: str) -> str:
+    """'NVIDIA GeForce RTX 4090' -> 'GeForce RTX 4090'"""
+    return GPU_VENDOR_PREFIX.sub("", name.strip()).strip()
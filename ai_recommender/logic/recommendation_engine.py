@@ -7,10 +7,11 @@ import json
 # The old helper functions (get_heaviest_requirement, _populate_spec_defaults) are no longer needed and can be deleted.
 
 
-def generate_recommendation(user=None, session_id=None):
+def generate_recommendation(user=None, session_id=None, preference=None):
     """
     Generates a complete RecommendationSpecification by asking the AI to synthesize
     user needs into a final, structured output in a single step.
+    Uses `preference` if given, otherwise the user's/session's most recent one.
     """
     from ..models import (
         RecommendationFeedback,
@@ -19,16 +20,20 @@ def generate_recommendation(user=None, session_id=None):
         RecommendationSpecification,
     )
 
-    # 1. Get the user's most recent preference
-    pref_filter = {}
-    if user and user.is_authenticated:
-        pref_filter["user"] = user
-    elif session_id:
-        pref_filter["session_id"] = session_id
-    else:
-        return None
-
-    pref = UserPreference.objects.filter(**pref_filter).order_by("-created_at").first()
+    # 1. Get the user's most recent preference (unless we were given one)
+    pref = preference
+    if pref is None:
+        pref_filter = {}
+        if user and user.is_authenticated:
+            pref_filter["user"] = user
+        elif session_id:
+            pref_filter["session_id"] = session_id
+        else:
+            return None
+
+        pref = (
+            UserPreference.objects.filter(**pref_filter).order_by("-created_at").first()
+        )
 
     if not pref:
         print(f"No preferences found for user/session.")
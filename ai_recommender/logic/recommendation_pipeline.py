@@ -0,0 +1,140 @@
+# ai_recommender/logic/recommendation_pipeline.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from .ai_discovery import discover_and_enrich_apps_for_activity
+from .recommendation_engine import generate_recommendation
+
+# Defaults for recommendation jobs; override any key with settings.RECOMMENDATION_JOBS.
+RECOMMENDATION_JOB_DEFAULTS = {
+    "ASYNC": False,  # Queue a job (202) for every POST /recommend/, not just opted-in ones
+    "POLL_INTERVAL": 1.0,  # Seconds between status checks in the event stream
+    "STREAM_TIMEOUT": 25,  # Seconds before an event stream asks the client to reconnect
+    "PARALLEL_STAGES": True,  # Run the discovery and recommendation AI calls concurrently
+    "STALE_JOB_SECONDS": 300,  # Unfinished jobs this old are marked failed
+}
+
+NO_ACTIVITY_DETAIL = "No primary activity was provided to generate a recommendation."
+NO_RECOMMENDATION_DETAIL = "Could not generate a recommendation. The AI may have been unable to find requirements for the specified activities."
+
+
+def get_recommendation_job_settings() -> dict:
+    return {
+        **RECOMMENDATION_JOB_DEFAULTS,
+        **getattr(settings, "RECOMMENDATION_JOBS", {}),
+    }
+
+
+def fail_stale_recommendation_jobs(job_id=None) -> int:
+    """
+    Marks jobs still pending or running STALE_JOB_SECONDS after they were
+    queued or started as failed, so a dead worker or a task that never reached
+    the broker doesn't leave clients polling forever. Only `job_id` when given.
+    Returns how many were marked.
+    """
+    from ..models import RecommendationJob
+
+    now = timezone.now()
+    cutoff = now - timedelta(
+        seconds=get_recommendation_job_settings()["STALE_JOB_SECONDS"]
+    )
+    jobs = RecommendationJob.objects.filter(
+        Q(status="pending", created_at__lt=cutoff)
+        | Q(status="running", started_at__lt=cutoff)
+    )
+    if job_id is not None:
+        jobs = jobs.filter(pk=job_id)
+    return jobs.update(
+        status="failed",
+        stage="done",
+        error="Timed out: the recommendation job never finished.",
+        finished_at=now,
+    )
+
+
+def _timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, round(time.perf_counter() - started, 3)
+
+
+def _timed_in_thread(func, *args, **kwargs):
+    """`_timed` for pool threads, which each open their own DB connection."""
+    try:
+        return _timed(func, *args, **kwargs)
+    finally:
+        connection.close()
+
+
+def _discover_applications(preference, primary_activity):
+    """AI discovery for the primary activity, saved and linked to the preference."""
+    print(
+        f"-> Running AI discovery for '{primary_activity.name}' with considerations: '{preference.considerations}'"
+    )
+    newly_processed_apps = discover_and_enrich_apps_for_activity(
+        primary_activity, preference.considerations
+    )
+    if newly_processed_apps:
+        # Link the personalised list of apps directly to THIS preference.
+        preference.applications.add(*newly_processed_apps)
+    else:
+        print(
+            f"-> AI discovery failed or returned no apps for '{primary_activity.name}'."
+        )
+    return newly_processed_apps
+
+
+def run_recommendation_pipeline(preference, on_stage=None):
+    """
+    Produces the recommendation for one saved UserPreference from two AI calls
+    that don't depend on each other:
+
+    - "discovery": the applications for its primary activity, personalised with
+      the user's considerations, saved and linked to the preference,
+    - "recommendation": the final specification, synthesised from the activity
+      names and considerations alone.
+
+    With RECOMMENDATION_JOBS["PARALLEL_STAGES"] they run on a two-thread pool,
+    so the discovered apps are saved while the specification call is still in
+    flight and the total is about the slower call instead of the sum.
+    `on_stage(stage)` names the call still being waited on. Returns
+    (RecommendationSpecification or None, {"discovery", "recommendation", "total": seconds}).
+    """
+    timings = {}
+    primary_activity = preference.activities.first()
+    if primary_activity is None:
+        return None, timings
+
+    started = time.perf_counter()
+    if on_stage:
+        on_stage("discovery")
+
+    if get_recommendation_job_settings()["PARALLEL_STAGES"]:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            discovery = pool.submit(
+                _timed_in_thread, _discover_applications, preference, primary_activity
+            )
+            recommendation = pool.submit(
+                _timed_in_thread, generate_recommendation, preference=preference
+            )
+            _, timings["discovery"] = discovery.result()
+            if on_stage and not recommendation.done():
+                on_stage("recommendation")
+            final_spec, timings["recommendation"] = recommendation.result()
+    else:
+        _, timings["discovery"] = _timed(
+            _discover_applications, preference, primary_activity
+        )
+        if on_stage:
+            on_stage("recommendation")
+        final_spec, timings["recommendation"] = _timed(
+            generate_recommendation, preference=preference
+        )
+
+    timings["total"] = round(time.perf_counter() - started, 3)
+    return final_spec, timings
@@ -0,0 +1,134 @@
+# ai_recommender/logic/resolution_cache.py
+
+import re
+import threading
+from collections import namedtuple
+from cachetools import TTLCache
+from django.db import connection
+
+# How one requirement string was resolved. `benchmark_id` is None for a cached "no match".
+Resolution = namedtuple("Resolution", ["benchmark_id", "confidence", "method"])
+
+# A small per-process LRU in front of the BenchmarkResolution table. The TTL
+# bounds how long another process's admin correction can take to show up here.
+_lru = TTLCache(maxsize=4096, ttl=300)
+_lru_lock = threading.Lock()
+
+MAX_CACHEABLE_LENGTH = 255
+
+
+def normalize_component_text(text: str) -> str:
+    """Lower-cases a component string and strips trademark noise and extra spaces."""
+    text = re.sub(r"\((r|tm)\)|[®™]", " ", str(text).lower())
+    return " ".join(text.split())
+
+
+def _is_valid(method, entry_version, current_version):
+    # Admin corrections win regardless of benchmark re-imports.
+    return method == "admin" or entry_version == current_version
+
+
+def get_cached_resolutions(names, component_type: str, version: int) -> dict:
+    """
+    Looks up many raw strings at once: first in the in-memory LRU, then with a
+    single indexed query against BenchmarkResolution.
+
+    Returns {raw name: Resolution} for every name that has a valid entry.
+    """
+    from ..models import BenchmarkResolution
+
+    keys = {}
+    for name in names:
+        key = normalize_component_text(name)
+        if key and len(key) <= MAX_CACHEABLE_LENGTH:
+            keys.setdefault(key, []).append(name)
+
+    found, missing = {}, []
+    with _lru_lock:
+        for key in keys:
+            entry = _lru.get((component_type, key))
+            if entry and _is_valid(entry[1].method, entry[0], version):
+                found[key] = entry[1]
+            else:
+                missing.append(key)
+
+    if missing:
+        rows = BenchmarkResolution.objects.filter(
+            component_type=component_type, normalized_text__in=missing
+        ).values_list(
+            "normalized_text",
+            "benchmark_id",
+            "confidence",
+            "method",
+            "benchmark_version",
+        )
+        with _lru_lock:
+            for key, benchmark_id, confidence, method, entry_version in rows:
+                if _is_valid(method, entry_version, version):
+                    resolution = Resolution(benchmark_id, confidence, method)
+                    _lru[(component_type, key)] = (entry_version, resolution)
+                    found[key] = resolution
+
+    return {
+        name: found[key] for key, raw in keys.items() if key in found for name in raw
+    }
+
+
+def store_resolutions(resolutions: dict, component_type: str, version: int):
+    """
+    Upserts automatic resolutions ({raw name: Resolution}) into the cache table
+    and the LRU. Admin corrections are never overwritten.
+    """
+    from ..models import BenchmarkResolution
+
+    entries = {}
+    for name, resolution in resolutions.items():
+        key = normalize_component_text(name)
+        if key and len(key) <= MAX_CACHEABLE_LENGTH:
+            entries[key] = resolution
+    if not entries:
+        return
+
+    admin_keys = set(
+        BenchmarkResolution.objects.filter(
+            component_type=component_type,
+            normalized_text__in=list(entries),
+            method="admin",
+        ).values_list("normalized_text", flat=True)
+    )
+    entries = {k: r for k, r in entries.items() if k not in admin_keys}
+
+    upsert_options = {"update_conflicts": True}
+    if connection.features.supports_update_conflicts_with_target:
+        upsert_options["unique_fields"] = ["component_type", "normalized_text"]
+    BenchmarkResolution.objects.bulk_create(
+        [
+            BenchmarkResolution(
+                component_type=component_type,
+                normalized_text=key,
+                benchmark_id=resolution.benchmark_id,
+                confidence=resolution.confidence,
+                method=resolution.method,
+                benchmark_version=version,
+            )
+            for key, resolution in entries.items()
+        ],
+        update_fields=[
+            "benchmark_id",
+            "confidence",
+            "method",
+            "benchmark_version",
+            "modified_at",
+        ],
+        **upsert_options,
+    )
+
+    with _lru_lock:
+        for key, resolution in entries.items():
+            _lru[(component_type, key)] = (version, resolution)
+
+
+def forget_resolution(component_type: str, text: str):
+    """Drops one entry from this process's LRU (e.g. after an admin correction)."""
+    with _lru_lock:
+        _lru.pop((component_type, normalize_component_text(text)), None)
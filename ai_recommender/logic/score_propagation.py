@@ -0,0 +1,96 @@
+# ai_recommender/logic/score_propagation.py
+
+import time
+from django.db.models import Case, F, IntegerField, Value, When
+from .utils import find_best_benchmark_objects
+
+UPDATE_CHUNK_SIZE = 500
+
+
+def _propagation_targets(component_type):
+    """
+    (model, text field, score field) for every table that stores a score
+    resolved from a free-text CPU/GPU string.
+    """
+    from ..models import ApplicationSystemRequirement
+    from vendor.models import Processor, Graphic
+
+    if component_type == "cpu":
+        return [
+            (ApplicationSystemRequirement, "cpu", "cpu_score"),
+            (Processor, "data_received", "score"),
+        ]
+    return [
+        (ApplicationSystemRequirement, "gpu", "gpu_score"),
+        (Graphic, "data_received", "score"),
+    ]
+
+
+def _write_scores(model, text_field, score_field, new_scores):
+    """
+    Sets `score_field` from {text: score} with one UPDATE ... CASE per chunk of
+    strings. Returns the number of rows written.
+    """
+    written = 0
+    texts = list(new_scores)
+    for start in range(0, len(texts), UPDATE_CHUNK_SIZE):
+        chunk = texts[start : start + UPDATE_CHUNK_SIZE]
+        written += model.objects.filter(**{f"{text_field}__in": chunk}).update(
+            **{
+                score_field: Case(
+                    *[
+                        When(**{text_field: text}, then=Value(new_scores[text]))
+                        for text in chunk
+                    ],
+                    default=F(score_field),
+                    output_field=IntegerField(),
+                )
+            }
+        )
+    return written
+
+
+def propagate_scores(component_type: str) -> dict:
+    """
+    Recomputes every stored CPU or GPU score after the benchmarks changed:
+
+    1. collects the distinct requirement and vendor component strings,
+    2. resolves them all in one batched match pass,
+    3. rewrites only the scores that changed, a chunk of strings per UPDATE.
+
+    Products read their scores through their Processor/Graphic rows, so step 3
+    is also the fan-out to products; nothing is re-saved one row at a time.
+    Strings that no longer match anything keep their previous score.
+    """
+    started = time.perf_counter()
+    targets = _propagation_targets(component_type)
+
+    # 1. Distinct (text, current score) pairs per table
+    current = {}
+    for model, text_field, score_field in targets:
+        current[model] = list(
+            model.objects.exclude(**{f"{text_field}__isnull": True})
+            .exclude(**{text_field: ""})
+            .values_list(text_field, score_field)
+            .distinct()
+        )
+    texts = list(dict.fromkeys(text for pairs in current.values() for text, _ in pairs))
+
+    # 2. One batched match for all of them
+    matches = find_best_benchmark_objects(texts, component_type)
+    resolved = {text: match.score for text, match in zip(texts, matches) if match}
+
+    # 3. Set-based writes, only for strings whose score moved
+    summary = {"strings": len(texts), "resolved": len(resolved)}
+    for model, text_field, score_field in targets:
+        changed = {
+            text: resolved[text]
+            for text, score in current[model]
+            if text in resolved and score != resolved[text]
+        }
+        summary[f"{model.__name__}.{score_field}"] = _write_scores(
+            model, text_field, score_field, changed
+        )
+
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
@@ -0,0 +1,219 @@
+# ai_recommender/logic/score_resolution.py
+
+import time
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from .utils import find_best_benchmark_objects
+
+# Defaults for resolving stored benchmark scores; override any key with
+# settings.BENCHMARK_SCORE_RESOLUTION.
+SCORE_RESOLUTION_DEFAULTS = {
+    "SYNC": False,  # Resolve inside save() instead of queueing (for tests/scripts)
+    "BATCH_SIZE": 500,  # Pending rows resolved and written together
+    "DEBOUNCE_SECONDS": 5,  # Saves within this window share one queued run
+}
+
+# Models whose save() leaves score resolution to the background resolver:
+# label -> [(text field, score field, component type)]. Each model has a
+# nullable `score_resolved_at`; NULL means "not resolved since last change".
+RESOLUTION_TARGETS = {
+    "ai_recommender.ApplicationSystemRequirement": [
+        ("cpu", "cpu_score", "cpu"),
+        ("gpu", "gpu_score", "gpu"),
+    ],
+    "vendor.Processor": [("data_received", "score", "cpu")],
+    "vendor.Graphic": [("data_received", "score", "gpu")],
+}
+
+
+def get_score_resolution_settings() -> dict:
+    return {
+        **SCORE_RESOLUTION_DEFAULTS,
+        **getattr(settings, "BENCHMARK_SCORE_RESOLUTION", {}),
+    }
+
+
+def _missing_scores(instance):
+    return [
+        (text_field, score_field, component_type)
+        for text_field, score_field, component_type in RESOLUTION_TARGETS[
+            instance._meta.label
+        ]
+        if getattr(instance, text_field) and getattr(instance, score_field) is None
+    ]
+
+
+def fill_missing_scores(instances) -> int:
+    """
+    Resolves the missing scores of in-memory instances of one model with one
+    batched match per component type, and stamps them as resolved. Strings
+    that match nothing keep a NULL score. Returns the number of scores set.
+    """
+    if not instances:
+        return 0
+    filled = 0
+    for text_field, score_field, component_type in RESOLUTION_TARGETS[
+        instances[0]._meta.label
+    ]:
+        missing = [
+            obj
+            for obj in instances
+            if getattr(obj, text_field) and getattr(obj, score_field) is None
+        ]
+        texts = list(dict.fromkeys(getattr(obj, text_field) for obj in missing))
+        if not texts:
+            continue
+        scores = {
+            text: match.score
+            for text, match in zip(
+                texts, find_best_benchmark_objects(texts, component_type)
+            )
+            if match
+        }
+        for obj in missing:
+            score = scores.get(getattr(obj, text_field))
+            if score is not None:
+                setattr(obj, score_field, score)
+                filled += 1
+
+    now = timezone.now()
+    for obj in instances:
+        obj.score_resolved_at = now
+    return filled
+
+
+def prepare_score_resolution(instance) -> bool:
+    """
+    Called by save() before writing. Rows with nothing to resolve are stamped;
+    rows with a missing score are either resolved inline (SYNC mode) or left
+    pending. Returns True if the row needs queueing once it is saved.
+    """
+    if not _missing_scores(instance):
+        instance.score_resolved_at = instance.score_resolved_at or timezone.now()
+        return False
+    if get_score_resolution_settings()["SYNC"]:
+        fill_missing_scores([instance])
+        return False
+    instance.score_resolved_at = None
+    return True
+
+
+def prepare_bulk_score_resolution(instances) -> bool:
+    """
+    prepare_score_resolution for rows about to be bulk_create()d, which skips
+    save(): SYNC mode resolves them with one batched match. Returns True if
+    any of them needs queue_score_resolution once they are inserted.
+    """
+    pending = []
+    for instance in instances:
+        if _missing_scores(instance):
+            pending.append(instance)
+        else:
+            instance.score_resolved_at = instance.score_resolved_at or timezone.now()
+    if not pending:
+        return False
+    if get_score_resolution_settings()["SYNC"]:
+        fill_missing_scores(pending)
+        return False
+    for instance in pending:
+        instance.score_resolved_at = None
+    return True
+
+
+def _queued_key(label):
+    return f"score-resolution-queued:{label}"
+
+
+def queue_score_resolution(model):
+    """
+    Queues the resolver for `model` once the current transaction commits. A
+    burst of saves shares one run: it starts DEBOUNCE_SECONDS after the first
+    save, and saves made until it starts only find it already queued. The
+    marker lives in the default cache, which must be shared by the web and
+    Celery processes (see CACHES in settings).
+    """
+    from ..tasks import resolve_pending_benchmark_scores
+
+    label = model._meta.label
+    delay = get_score_resolution_settings()["DEBOUNCE_SECONDS"]
+
+    def enqueue():
+        if not delay or cache.add(_queued_key(label), True, timeout=delay):
+            resolve_pending_benchmark_scores.apply_async((label,), countdown=delay)
+
+    transaction.on_commit(enqueue)
+
+
+def resolve_pending_scores(model, batch_size=None) -> dict:
+    """
+    Resolves every pending row of `model` in batches: one batched match per
+    component type and one bulk_update per batch. Saves that happen meanwhile
+    are picked up by the next batch or the next queued run; a row saved
+    between reading its batch and writing it is left for that run.
+    """
+    batch_size = batch_size or get_score_resolution_settings()["BATCH_SIZE"]
+    targets = RESOLUTION_TARGETS[model._meta.label]
+    fields = [score_field for _, score_field, _ in targets] + ["score_resolved_at"]
+    started = time.perf_counter()
+    # Saves from here on queue a run of their own.
+    cache.delete(_queued_key(model._meta.label))
+
+    resolved, filled, last_pk = 0, 0, 0
+    while True:
+        batch = list(
+            model.objects.filter(score_resolved_at__isnull=True, pk__gt=last_pk)
+            .order_by("pk")
+            .only(
+                "pk",
+                "modified_at",
+                *[text_field for text_field, _, _ in targets],
+                *fields,
+            )[:batch_size]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        missing = {
+            (obj.pk, score_field)
+            for obj in batch
+            for _, score_field, _ in targets
+            if getattr(obj, score_field) is None
+        }
+        fill_missing_scores(batch)
+        with transaction.atomic():
+            # Lock the rows and skip any saved since the batch was read: their
+            # score was resolved for the old text.
+            modified = dict(
+                model.objects.select_for_update()
+                .filter(pk__in=[obj.pk for obj in batch])
+                .values_list("pk", "modified_at")
+            )
+            unchanged = [
+                obj for obj in batch if modified.get(obj.pk) == obj.modified_at
+            ]
+            model.objects.bulk_update(unchanged, fields)
+        resolved += len(unchanged)
+        filled += sum(
+            1
+            for obj in unchanged
+            for _, score_field, _ in targets
+            if (obj.pk, score_field) in missing
+            and getattr(obj, score_field) is not None
+        )
+
+    return {
+        "model": model._meta.label,
+        "rows": resolved,
+        "scores_filled": filled,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def resolve_all_pending_scores(batch_size=None) -> list:
+    return [
+        resolve_pending_scores(apps.get_model(label), batch_size)
+        for label in RESOLUTION_TARGETS
+    ]
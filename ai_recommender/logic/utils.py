@@ -1,281 +1,337 @@
 # ai_recommender/logic/utils.py
 
-from sentence_transformers import util
-import json
-import pandas as pd
 import re
-import difflib
-from decimal import Decimal, InvalidOperation
 from django.db.models import Q  # This import is only needed here
 import numpy as np
+from .embedding_index import get_embedding_index, _component_type
+from .lexical_index import get_lexical_index
+from .resolution_cache import Resolution, get_cached_resolutions, store_resolutions
+from .model_tokens import extract_model_token
+from .encoder import describe_encoder
+from .model_manager import encoder_manager, managed_encoder
+from .embedding_service import (
+    EmbeddingServiceUnavailable,
+    get_embedding_client,
+    mark_unavailable,
+)
+
+LEXICAL_SIMILARITY_THRESHOLD = 0.7
+# Below LEXICAL_SIMILARITY_THRESHOLD: a clock-speed floor is a rough guess that
+# is used for the current lookup but never cached as a real match.
+SPEED_FLOOR_CONFIDENCE = 0.3
+
+
+def _lexical_match(candidate: str, index, is_cpu: bool):
+    """
+    (HELPER) Finds the best benchmark row for one candidate string with the
+    trigram index. Returns (position, similarity), or None.
+    """
+    clean_str = candidate.strip().lower()
+
+    # Strategy 1: Fuzzy String Match against the `model_name`, restricted to the
+    # few dozen rows that share the most trigrams with the query.
+    best_similarity, best_positions = index.best_matches(clean_str)
+    if best_similarity >= LEXICAL_SIMILARITY_THRESHOLD:
+        # From the best string matches, return the one with the highest performance score.
+        best_position = max(best_positions, key=lambda pos: index.scores[pos])
+        return best_position, best_similarity
+
+    # Strategy 2: For CPUs, a bare clock speed ("2.4 GHz dual core") is only a
+    # floor, so take the weakest CPU that meets it.
+    if is_cpu:
+        speed_match = re.search(r"(\d\.?\d*)\s*ghz", clean_str)
+        if speed_match:
+            position = index.weakest_at_speed(float(speed_match.group(1)))
+            if position is not None:
+                return position, SPEED_FLOOR_CONFIDENCE
+    return None
 
 
-def process_benchmark_dataframe(df: pd.DataFrame, item_type: str):
+def _match_names_lexically(names, benchmark_model_class):
     """
-    Processes a benchmark DataFrame and inserts/updates benchmark records.
-    This function is fully compatible with the new models that auto-parse 'name'.
+    (HELPER) Fallback for names the embedding matcher could not place (or when
+    the table has no embeddings yet). Returns {name: Resolution} for the names
+    it could resolve.
     """
-    from ..models import CPUBenchmark, GPUBenchmark, DiskBenchmark
-
-    item_type = item_type.lower()
-    # Sanitize column headers for consistency
-    df.columns = (
-        df.columns.str.strip().str.lower().str.replace(r"[^a-z0-9]", "", regex=True)
-    )
+    from ..models import CPUBenchmark
+
+    index = get_lexical_index(benchmark_model_class)
+    if not len(index):
+        return {}
+
+    is_cpu = benchmark_model_class == CPUBenchmark
+    resolutions = {}
+    for name in names:
+        matches = [
+            match
+            for match in (
+                _lexical_match(candidate, index, is_cpu)
+                for candidate in _split_requirement_candidates(name)
+            )
+            if match
+        ]
+        if matches:
+            # Name matches beat speed floors; then the best-scoring candidate wins.
+            position, similarity = max(
+                matches,
+                key=lambda m: (
+                    m[1] >= LEXICAL_SIMILARITY_THRESHOLD,
+                    index.scores[m[0]],
+                ),
+            )
+            resolutions[name] = Resolution(
+                int(index.ids[position]), similarity, "lexical"
+            )
+    return resolutions
 
-    created_count, updated_count, skipped_count = 0, 0, 0
-    col_map = {}
-
-    if item_type == "cpu":
-        ModelClass = CPUBenchmark
-        col_map = {
-            "cpuname": "cpu",  # The 'name' field in the model
-            "cpumark": "score",
-            "rank": "rank",
-            "cpuvalue": "value_score",
-            "price": "price",
-        }
-        name_col_key, score_col_key = "cpuname", "cpumark"
-
-    elif item_type == "gpu":
-        ModelClass = GPUBenchmark
-        col_map = {
-            "videocardname": "gpu",  # The 'name' field in the model
-            "g3dmark": "score",
-            "rank": "rank",
-            "videocardvalue": "value_score",
-            "price": "price",
-        }
-        name_col_key, score_col_key = "videocardname", "g3dmark"
-
-    elif item_type == "disk":
-        ModelClass = DiskBenchmark
-        col_map = {
-            "drivename": "drive_name",
-            "diskrating": "score",
-            "size": "size_tb",
-            "rank": "rank",
-            "drivevalue": "value_score",
-            "price": "price",
-        }
-        name_col_key, score_col_key = "drivename", "diskrating"
 
-    else:
-        raise ValueError("Invalid item_type. Must be 'cpu', 'gpu', or 'disk'.")
+# --- NEW HELPER FUNCTIONS ---
+def get_sentence_model():
+    """
+    Returns this process's encoder, the one configured by SENTENCE_ENCODER (the
+    same one `train_component_embeddings` used for the stored embeddings). The
+    model is loaded on first use and may be unloaded when idle; see
+    logic/model_manager.py.
+    """
+    return managed_encoder
 
-    required_cols = {name_col_key, score_col_key}
-    if not required_cols.issubset(df.columns):
-        missing = required_cols - set(df.columns)
-        raise ValueError(
-            f"Missing required columns for type '{item_type}': {missing}. Found: {list(df.columns)}"
-        )
 
-    # Use a list to bulk_create/update later for efficiency
-    objects_to_update = []
-    objects_to_create = []
-
-    for index, row in df.iterrows():
-        component_name = row.get(name_col_key)
-        score_val = row.get(score_col_key)
-
-        if (
-            pd.isna(component_name)
-            or pd.isna(score_val)
-            or not str(component_name).strip()
-        ):
-            skipped_count += 1
-            continue
-
-        component_name = str(component_name).strip()
-        defaults = {}
-
-        for standardized_name, model_field in col_map.items():
-            value = row.get(standardized_name)
-            if pd.isna(value):
-                defaults[model_field] = None
-                continue
-
-            try:
-                if model_field in ["score", "rank"]:
-                    cleaned_val = re.sub(r"[^\d]", "", str(value))
-                    defaults[model_field] = int(cleaned_val) if cleaned_val else None
-                elif model_field in ["value_score", "size_tb"]:
-                    cleaned_val = re.sub(r"[^\d.]", "", str(value))
-                    defaults[model_field] = float(cleaned_val) if cleaned_val else None
-                elif model_field == "price":
-                    price_str = re.sub(r"[^\d.]", "", str(value))
-                    defaults[model_field] = Decimal(price_str) if price_str else None
-                elif model_field == "name" or model_field == "drive_name":
-                    defaults[model_field] = str(value).strip()
-
-            except (ValueError, TypeError, InvalidOperation) as e:
-                defaults[model_field] = None
-                print(
-                    f"Warning: Could not parse field '{model_field}' for '{component_name}'. Setting to NULL."
-                )
-
-        if defaults.get("score") is None:
-            skipped_count += 1
-            continue
-
-        # Using update_or_create is fine for smaller datasets and ensures the custom .save() is called.
-        # This is the simplest and most robust approach.
-        lookup_key_for_model = col_map[name_col_key]
-        lookup = {lookup_key_for_model: component_name}
-
-        obj, was_created = ModelClass.objects.update_or_create(
-            **lookup, defaults=defaults
-        )
+def encoder_stats() -> dict:
+    """Load/unload, memory and batching counters of this process's encoder."""
+    return encoder_manager.stats()
 
-        if was_created:
-            created_count += 1
-        else:
-            updated_count += 1
 
-    return {
-        "created": created_count,
-        "updated": updated_count,
-        "skipped": skipped_count,
-    }
+def _split_requirement_candidates(raw_name: str) -> list[str]:
+    """Splits "Intel i7-9700K or AMD Ryzen 7 2700X" into its individual candidates."""
+    if not raw_name or raw_name.lower() in ["none", "not specified", "n/a"]:
+        return []
+    candidates = re.split(r"\s+or\s+|\s*/\s*|,", raw_name, flags=re.IGNORECASE)
+    return [c.strip() for c in candidates if c.strip()]
 
 
-def _find_match_for_single_component(requirement_str: str, benchmark_model):
+def _pick_token_variant(candidate: str, rows):
     """
-    (HELPER) Finds the best single benchmark OBJECT for a single requirement string.
-    This is the core logic engine that matches one component name.
+    (HELPER) Several benchmark rows can share one model number (e.g. GTX 1060
+    3GB/6GB). Prefer the variant with the memory size named in the candidate,
+    otherwise the best-scoring one.
     """
-    if not requirement_str:
-        return None
-    clean_str = requirement_str.strip().lower()
+    memory = re.search(r"(\d+)\s*gb", candidate.lower())
+    if memory:
+        same_memory = [
+            row
+            for row in rows
+            if re.search(rf"\b{memory.group(1)}\s*gb", row[1].lower())
+        ]
+        rows = same_memory or rows
+    return max(rows, key=lambda row: row[2])
+
+
+def _match_names_by_model_token(names, benchmark_model_class, component_type: str):
+    """
+    (HELPER) Deterministic fast path. Names whose every candidate contains an
+    unambiguous model number (e.g. "i7-9700K", "RTX 3070") are resolved with
+    one indexed lookup on `model_token`, without any model inference.
+    Returns {name: Resolution} for the names it could resolve.
+    """
+    name_candidates = {}
+    for name in names:
+        candidates = _split_requirement_candidates(name)
+        tokens = [extract_model_token(c, component_type) for c in candidates]
+        if tokens and all(tokens):
+            name_candidates[name] = list(zip(candidates, tokens))
+    if not name_candidates:
+        return {}
+
+    all_tokens = {token for pairs in name_candidates.values() for _, token in pairs}
+    rows_by_token = {}
+    for pk, token, model_name, score in benchmark_model_class.objects.filter(
+        model_token__in=all_tokens
+    ).values_list("id", "model_token", "model_name", "score"):
+        rows_by_token.setdefault(token, []).append((pk, model_name, score))
+
+    resolutions = {}
+    for name, pairs in name_candidates.items():
+        if not all(token in rows_by_token for _, token in pairs):
+            continue  # An unknown model number; let the embedding matcher decide.
+        matches = [_pick_token_variant(c, rows_by_token[token]) for c, token in pairs]
+        best_pk, _, _ = max(matches, key=lambda row: row[2])
+        resolutions[name] = Resolution(best_pk, 1.0, "token")
+    return resolutions
+
+
+def match_candidates_in_process(candidates, benchmark_model_class, encode=None):
+    """
+    Encodes candidate strings and finds the nearest benchmark for each with the
+    in-process embedding index. `encode` defaults to this process's model (the
+    embedding service passes its batched encoder).
 
-    # Strategy 1: For CPUs, check for clock speed first as it's a strong indicator.
-    if benchmark_model == CPUBenchmark:
-        speed_match = re.search(r"(\d\.?\d*)\s*ghz", clean_str)
-        if speed_match:
-            speed = float(speed_match.group(1))
-            # Find the best-scoring CPU that meets or exceeds the specified speed
-            candidates = CPUBenchmark.objects.filter(clock_speed_ghz__gte=speed)
-            if candidates.exists():
-                return candidates.order_by("-score").first()
-
-    # Strategy 2: Fuzzy String Match against the `model_name` for all component types.
-    all_benchmarks = benchmark_model.objects.all()
-    if not all_benchmarks:
+    Returns (ids, scores, similarities) arrays, or None if there is nothing to
+    match against.
+    """
+    index = get_embedding_index(benchmark_model_class)
+    if not len(index):
+        print(
+            f"WARNING: No pre-computed embeddings found for {benchmark_model_class.__name__}. Matching will fail."
+        )
         return None
 
-    best_similarity, best_matches = 0.0, []
-    # Use the structured `model_name` for matching, not the raw `name`.
-    for bench in all_benchmarks:
-        similarity = difflib.SequenceMatcher(
-            None, clean_str, bench.model_name.lower()
-        ).ratio()
-        if similarity > best_similarity:
-            best_similarity, best_matches = similarity, [bench]
-        elif similarity == best_similarity:
-            best_matches.append(bench)
-
-    SIMILARITY_THRESHOLD = 0.7
-    if best_similarity < SIMILARITY_THRESHOLD:
+    if encode is None:
+        embeddings = get_sentence_model().encode(candidates, convert_to_tensor=False)
+    else:
+        embeddings = encode(candidates)
+    if np.shape(embeddings)[-1] != index.input_dim:
+        print(
+            f"WARNING: {describe_encoder()} produces {np.shape(embeddings)[-1]}-dim vectors but "
+            f"{benchmark_model_class.__name__} embeddings are {index.input_dim}-dim. "
+            "Re-run train_component_embeddings after changing SENTENCE_ENCODER."
+        )
         return None
 
-    # From the best string matches, return the one with the highest performance score.
-    return max(best_matches, key=lambda b: b.score)
+    positions, similarities = index.search(embeddings, k=1)
+    best = positions[:, 0]
+    return index.ids[best], index.scores[best], similarities[:, 0]
 
 
-# --- NEW HELPER FUNCTIONS ---
-_model = None  # Global cache for the sentence transformer model
+def _match_candidates(candidates, benchmark_model_class):
+    """
+    (HELPER) Nearest benchmark per candidate, through the local embedding
+    service when it is running, otherwise in this process.
+    """
+    client = get_embedding_client()
+    if client is not None:
+        try:
+            return client.match(candidates, _component_type(benchmark_model_class))
+        except EmbeddingServiceUnavailable as e:
+            print(f"WARNING: Embedding service unavailable ({e}); matching in-process.")
+            mark_unavailable()
+    return match_candidates_in_process(candidates, benchmark_model_class)
 
 
-def get_sentence_model():
-    """Lazily loads and caches the SentenceTransformer model to save memory."""
-    global _model
-    if _model is None:
-        from sentence_transformers import SentenceTransformer
+def _match_names_with_embeddings(names, benchmark_model_class):
+    """
+    (HELPER) Embedding-matches many raw requirement strings at once.
 
-        print("Loading Sentence-BERT model for matching...")
-        _model = SentenceTransformer("all-mpnet-base-v2")
-    return _model
+    The unique candidates of all names are encoded in ONE `encode` call and
+    scored against the benchmark matrix in one vectorized operation. Returns
+    {name: Resolution}, or None if the benchmark table has no embeddings yet.
+    """
+    candidate_lists = {name: _split_requirement_candidates(name) for name in names}
+    unique_candidates = list(
+        dict.fromkeys(c for candidates in candidate_lists.values() for c in candidates)
+    )
 
+    matches = _match_candidates(unique_candidates, benchmark_model_class)
+    if matches is None:
+        return None
+    ids, scores, similarities = matches
 
-def _find_match_with_embeddings(requirement_str: str, benchmark_model_class):
-    """
-    (HELPER) Finds the best benchmark OBJECT for a single requirement string
-    using pre-computed vector embeddings.
+    SIMILARITY_THRESHOLD = 0.5
+    candidate_matches = {}  # candidate -> (benchmark id, benchmark score, similarity)
+    for candidate, pk, score, similarity in zip(
+        unique_candidates, ids, scores, similarities
+    ):
+        if similarity >= SIMILARITY_THRESHOLD:
+            candidate_matches[candidate] = (int(pk), score, float(similarity))
+
+    # For each name, keep the matched candidate with the highest performance score
+    resolutions = {}
+    for name, candidates in candidate_lists.items():
+        matched = [candidate_matches[c] for c in candidates if c in candidate_matches]
+        if matched:
+            pk, _, similarity = max(matched, key=lambda m: m[1])
+            resolutions[name] = Resolution(pk, similarity, "embedding")
+        else:
+            resolutions[name] = Resolution(None, 0.0, "none")
+    return resolutions
+
+
+def find_best_benchmark_objects(names, component_type: str) -> list:
     """
-    if not requirement_str:
-        return None
+    Batch version of `find_best_benchmark_object`. Returns a list of benchmark
+    objects (or None) in the same order as `names`.
 
-    model = get_sentence_model()
+    Strings are first looked up in the resolution cache (admin corrections take
+    priority), then by exact model number; only the remaining ones are
+    embedding-matched, in one batch, with the trigram index as the fallback.
+    """
+    from ..models import CPUBenchmark, GPUBenchmark, BenchmarkVersion
 
-    # 1. Get all pre-computed embeddings from the database
-    benchmarks_with_embeddings = list(
-        benchmark_model_class.objects.exclude(embedding__isnull=True)
-    )
-    if not benchmarks_with_embeddings:
-        print(
-            f"WARNING: No pre-computed embeddings found for {benchmark_model_class.__name__}. Matching will fail."
-        )
-        return None
+    names = list(names)
+    component_type = "cpu" if component_type.lower() == "cpu" else "gpu"
+    ModelClass = CPUBenchmark if component_type == "cpu" else GPUBenchmark
 
-    # --- FIX: Ensure a consistent data type (float32) for all embeddings ---
-    corpus_embeddings = np.array(
-        [json.loads(b.embedding) for b in benchmarks_with_embeddings],
-        dtype=np.float32,  # Enforce float32
+    distinct_names = list(
+        dict.fromkeys(name for name in names if _split_requirement_candidates(name))
     )
+    if not distinct_names:
+        return [None] * len(names)
 
-    # 2. Create an embedding for the new requirement string
-    query_embedding = model.encode(requirement_str, convert_to_tensor=False).astype(
-        np.float32
-    )  # Enforce float32
-
-    # 3. Compute cosine similarities
-    cos_scores = util.cos_sim(query_embedding, corpus_embeddings)[0]
+    version = BenchmarkVersion.current(component_type)
 
-    # 4. Find the index of the highest score
-    best_match_index = np.argmax(cos_scores)
+    # 1. Repeat lookups are a single indexed read
+    resolutions = get_cached_resolutions(distinct_names, component_type, version)
+    # Admin pins outlive re-imports; one whose row has no same-name successor
+    # in the live dataset goes back through the matcher below.
+    benchmarks = ModelClass.objects.defer("embedding").in_bulk(
+        {r.benchmark_id for r in resolutions.values() if r.benchmark_id}
+    )
+    resolutions = {
+        name: resolution
+        for name, resolution in resolutions.items()
+        if not resolution.benchmark_id or resolution.benchmark_id in benchmarks
+    }
 
-    # 5. Check if the match is good enough
-    SIMILARITY_THRESHOLD = 0.5
-    if cos_scores[best_match_index] < SIMILARITY_THRESHOLD:
-        print(
-            f"  -> Match found, but score {cos_scores[best_match_index]:.2f} is below threshold {SIMILARITY_THRESHOLD}."
+    # 2. Unambiguous model numbers resolve with one indexed lookup
+    unresolved = [name for name in distinct_names if name not in resolutions]
+    if unresolved:
+        token_matched = _match_names_by_model_token(
+            unresolved, ModelClass, component_type
         )
-        return None
-
-    # 6. Return the corresponding benchmark object
-    return benchmarks_with_embeddings[best_match_index]
+        if token_matched:
+            store_resolutions(token_matched, component_type, version)
+            resolutions.update(token_matched)
+
+    # 3. Only what is left goes through the embedding matcher, in one batch
+    unresolved = [name for name in distinct_names if name not in resolutions]
+    if unresolved:
+        matched = _match_names_with_embeddings(unresolved, ModelClass) or {}
+        # 4. ...and what it could not place falls back to the trigram index
+        unplaced = [
+            name
+            for name in unresolved
+            if name not in matched or matched[name].benchmark_id is None
+        ]
+        if unplaced:
+            matched.update(_match_names_lexically(unplaced, ModelClass))
+        cacheable = {
+            name: resolution
+            for name, resolution in matched.items()
+            if resolution.method != "lexical"
+            or resolution.confidence >= LEXICAL_SIMILARITY_THRESHOLD
+        }
+        if cacheable:
+            store_resolutions(cacheable, component_type, version)
+        resolutions.update(matched)
+
+    missing_ids = {
+        r.benchmark_id
+        for r in resolutions.values()
+        if r.benchmark_id and r.benchmark_id not in benchmarks
+    }
+    if missing_ids:
+        benchmarks.update(ModelClass.objects.defer("embedding").in_bulk(missing_ids))
+    return [
+        benchmarks.get(resolutions[name].benchmark_id) if name in resolutions else None
+        for name in names
+    ]
 
 
-# --- THIS REPLACES YOUR OLD `find_best_benchmark_object` ---
 def find_best_benchmark_object(raw_name: str, component_type: str):
     """
     Takes a raw string from the AI (e.g., "Intel i7-9700K or AMD Ryzen 7 2700X")
     and finds the single best matching benchmark OBJECT from the database using embeddings.
     """
-    from ..models import CPUBenchmark, GPUBenchmark
-
-    if not raw_name or raw_name.lower() in ["none", "not specified", "n/a"]:
-        return None
-
-    candidates = re.split(r"\s+or\s+|\s*/\s*|,", raw_name, flags=re.IGNORECASE)
-    cleaned_candidates = [c.strip() for c in candidates if c.strip()]
-
-    if not cleaned_candidates:
-        return None
-
-    ModelClass = CPUBenchmark if component_type.lower() == "cpu" else GPUBenchmark
-
-    found_benchmarks = []
-    for candidate in cleaned_candidates:
-        match = _find_match_with_embeddings(candidate, ModelClass)
-        if match:
-            found_benchmarks.append(match)
-
-    if not found_benchmarks:
-        return None
-
-    # From all the valid matches, select the one with the highest performance score.
-    return max(found_benchmarks, key=lambda bench: bench.score)
+    return find_best_benchmark_objects([raw_name], component_type)[0]
 
 
 def find_similar_activities(activity_name):
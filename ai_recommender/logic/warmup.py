@@ -0,0 +1,112 @@
+# ai_recommender/logic/warmup.py
+
+import threading
+import time
+from django.conf import settings
+
+# Warm-up state for this process. `ready` flips to True once warm-up has run
+# (or immediately if it is disabled), and stays True.
+_state = {
+    "ready": False,
+    "source": None,
+    "started_at": None,
+    "finished_at": None,
+    "timings": {},
+    "errors": {},
+}
+_state_lock = threading.RLock()
+
+
+def is_warmup_enabled() -> bool:
+    return getattr(settings, "WORKER_WARMUP_ENABLED", True)
+
+
+def is_ready() -> bool:
+    """True once this process has finished warming up (or warm-up is off)."""
+    return _state["ready"] or not is_warmup_enabled()
+
+
+def warmup_status() -> dict:
+    with _state_lock:
+        status = {**_state, "timings": dict(_state["timings"])}
+    status["ready"] = is_ready()
+    return status
+
+
+def _timed(step_name, fn):
+    started = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        _state["errors"][step_name] = f"{type(e).__name__}: {e}"
+        print(f"  -> Warm-up step '{step_name}' failed: {e}")
+    _state["timings"][step_name] = round(time.perf_counter() - started, 3)
+
+
+def _warm_encoder():
+    from .embedding_service import get_embedding_client, EmbeddingServiceUnavailable
+    from .utils import get_sentence_model
+
+    client = get_embedding_client()
+    if client is not None:
+        # The shared service owns the model; just make sure it answers.
+        try:
+            client.encode(["warm-up"])
+            return
+        except EmbeddingServiceUnavailable as e:
+            print(f"  -> Embedding service unavailable during warm-up ({e}).")
+    get_sentence_model().encode(["Intel Core i7-9700K", "NVIDIA GeForce RTX 3070"])
+
+
+def _warm_indexes():
+    from .embedding_index import get_embedding_index
+    from .embedding_service import get_embedding_client
+    from .lexical_index import get_lexical_index
+    from ..models import CPUBenchmark, GPUBenchmark
+
+    # With the shared service running, it owns the embedding indexes and this
+    # process only builds one if the service goes away.
+    warm_embeddings = get_embedding_client() is None
+    if not warm_embeddings:
+        print("  -> Embedding service in use; skipping the embedding index warm-up.")
+    for model_class in (CPUBenchmark, GPUBenchmark):
+        if warm_embeddings:
+            get_embedding_index(model_class)
+        get_lexical_index(model_class)
+
+
+def _warm_llm_clients():
+    # The OpenAI/Gemini clients are created when the module is first imported.
+    from . import ai_scraper  # noqa: F401
+
+
+def warm_up(source: str = ""):
+    """
+    Loads the encoder, builds the benchmark indexes, runs a dummy encode and
+    initializes the LLM clients, recording how long each step took. Failures
+    are recorded but never raised: a cold worker is better than a dead one.
+    """
+    if not is_warmup_enabled() or _state["ready"]:
+        return warmup_status()
+
+    with _state_lock:
+        if _state["ready"]:
+            return warmup_status()
+        _state["source"] = source
+        _state["started_at"] = time.time()
+        print(f"Warming up ({source or 'unknown process'})...")
+
+        _timed("benchmark_indexes", _warm_indexes)
+        _timed("encoder", _warm_encoder)
+        _timed("llm_clients", _warm_llm_clients)
+
+        _state["finished_at"] = time.time()
+        _state["ready"] = True
+        total = _state["finished_at"] - _state["started_at"]
+        print(f"Warm-up complete in {total:.1f}s: {_state['timings']}")
+
+    # Don't hand a DB connection opened here to forked children (gunicorn --preload).
+    from django.db import connections
+
+    connections.close_all()
+    return warmup_status()
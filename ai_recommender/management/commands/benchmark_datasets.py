@@ -0,0 +1,100 @@
+# ai_recommender/management/commands/benchmark_datasets.py
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from ai_recommender.logic.benchmark_datasets import (
+    activate_dataset,
+    get_dataset_settings,
+    rollback_dataset,
+    validate_dataset,
+)
+from ai_recommender.logic.embedding_refresh import refresh_after_import
+from ai_recommender.models import BenchmarkDataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Lists the imported versions of a benchmark table, activates one, or "
+        "rolls back to the previously active one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type",
+            type=str,
+            choices=["cpu", "gpu", "disk"],
+            required=True,
+        )
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--activate",
+            type=int,
+            metavar="NUMBER",
+            help="Validate and activate the dataset with this number.",
+        )
+        group.add_argument(
+            "--rollback",
+            action="store_true",
+            help="Re-activate the previously active dataset.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="With --activate, skip validation.",
+        )
+
+    def handle(self, *args, **options):
+        component_type = options["type"]
+
+        if options["rollback"]:
+            dataset = rollback_dataset(component_type)
+            if dataset is None:
+                raise CommandError(
+                    f"No previous '{component_type}' dataset to roll back to."
+                )
+            self.after_switch(dataset)
+        elif options["activate"]:
+            dataset = BenchmarkDataset.objects.filter(
+                component_type=component_type, number=options["activate"]
+            ).first()
+            if dataset is None:
+                raise CommandError(
+                    f"No '{component_type}' dataset #{options['activate']}."
+                )
+            if not options["force"]:
+                errors = validate_dataset(dataset)
+                if errors:
+                    raise CommandError(
+                        "Validation failed: "
+                        + " ".join(errors)
+                        + " Use --force to activate anyway."
+                    )
+            activate_dataset(dataset)
+            self.after_switch(dataset)
+
+        self.stdout.write(
+            f"--- {component_type.upper()} datasets (keeping {get_dataset_settings()['KEEP_PREVIOUS']} previous) ---"
+        )
+        for dataset in BenchmarkDataset.objects.filter(
+            component_type=component_type
+        ).order_by("-number"):
+            activated = (
+                dataset.activated_at.strftime("%Y-%m-%d %H:%M")
+                if dataset.activated_at
+                else "-"
+            )
+            self.stdout.write(
+                f"  #{dataset.number:<4} {dataset.status:<9} {dataset.rows:>7} rows  activated {activated}"
+            )
+
+    def after_switch(self, dataset):
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"'{dataset.component_type}' dataset #{dataset.number} is now active."
+            )
+        )
+        if dataset.component_type in ("cpu", "gpu"):
+            refresh_after_import(dataset.component_type)
+            call_command(
+                "propagate_scores", type=dataset.component_type, stdout=self.stdout
+            )
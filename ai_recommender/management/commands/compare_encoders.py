@@ -0,0 +1,125 @@
+# ai_recommender/management/commands/compare_encoders.py
+
+import gc
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from ai_recommender.models import CPUBenchmark, GPUBenchmark
+from ai_recommender.logic.encoder import (
+    get_encoder_settings,
+    load_sentence_model,
+    describe_encoder,
+)
+from ai_recommender.logic.model_manager import current_rss_mb
+from .train_component_embeddings import sample_requirement_texts
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares a candidate sentence encoder with the configured one: load time, "
+        "RSS, query latency and top-1 benchmark match agreement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            type=str,
+            default="all-MiniLM-L6-v2",
+            help="Candidate model name (default: all-MiniLM-L6-v2).",
+        )
+        parser.add_argument(
+            "--quantize",
+            action="store_true",
+            help="Apply torch dynamic int8 quantization to the candidate.",
+        )
+        parser.add_argument("--type", type=str, choices=["cpu", "gpu"], default="cpu")
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=5000,
+            help="Maximum number of benchmark rows to encode with each model.",
+        )
+
+    def handle(self, *args, **options):
+        # Import the heavy libraries up front so they don't count against
+        # whichever model happens to be loaded first.
+        import torch  # noqa: F401
+        import sentence_transformers  # noqa: F401
+
+        model_class = CPUBenchmark if options["type"] == "cpu" else GPUBenchmark
+        full_name_field = options["type"]
+        rows = list(
+            model_class.objects.values_list("id", "model_name", full_name_field)[
+                : options["limit"]
+            ]
+        )
+        if not rows:
+            self.stdout.write(self.style.WARNING(f"No {model_class.__name__} rows."))
+            return
+        ids = np.array([row[0] for row in rows])
+        corpus = [row[1] for row in rows]
+
+        queries = sample_requirement_texts(model_class)
+        source = f"{len(queries)} requirement strings"
+        if not queries:
+            # No real traffic yet: match the full benchmark names to the clean ones.
+            queries = [row[2] for row in rows[:500]]
+            source = f"{len(queries)} full benchmark names"
+
+        baseline = get_encoder_settings()
+        candidate = {"MODEL": options["model"], "QUANTIZE": options["quantize"]}
+        results = {}
+        for label, overrides in (("baseline", baseline), ("candidate", candidate)):
+            results[label] = self.measure(overrides, corpus, queries, ids)
+
+        self.stdout.write(
+            f"\n--- {model_class.__name__}: {len(corpus)} benchmarks, {source} ---"
+        )
+        for label in ("baseline", "candidate"):
+            r = results[label]
+            self.stdout.write(
+                f"{label:>9}: {r['name']:<30} load {r['load_seconds']:.1f}s, "
+                f"+{r['rss_mb']:.0f} MB RSS, {r['dims']} dims, "
+                f"{r['query_ms']:.1f} ms/query"
+            )
+
+        agreement = np.mean(results["baseline"]["top1"] == results["candidate"]["top1"])
+        self.stdout.write(self.style.SUCCESS(f"Top-1 match agreement: {agreement:.3f}"))
+
+    def measure(self, overrides, corpus, queries, ids):
+        gc.collect()
+        rss_before = current_rss_mb()
+        started = time.perf_counter()
+        model = load_sentence_model(**overrides)
+        load_seconds = time.perf_counter() - started
+        rss_mb = current_rss_mb() - rss_before
+
+        corpus_vectors = _normalize(model.encode(corpus, batch_size=128))
+
+        # Requests encode a handful of short strings at a time, so time single calls.
+        latencies = []
+        for query in queries[:100]:
+            started = time.perf_counter()
+            model.encode([query])
+            latencies.append(time.perf_counter() - started)
+
+        query_vectors = _normalize(model.encode(queries, batch_size=128))
+        top1 = ids[np.argmax(query_vectors @ corpus_vectors.T, axis=1)]
+
+        result = {
+            "name": describe_encoder(**overrides),
+            "load_seconds": load_seconds,
+            "rss_mb": rss_mb,
+            "dims": corpus_vectors.shape[1],
+            "query_ms": float(np.median(latencies)) * 1000,
+            "top1": top1,
+        }
+        del model
+        return result
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
@@ -1,16 +1,18 @@
 # ai_recommender/management/commands/import_benchmarks.py
 
 import os
-import pandas as pd
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from django.db import transaction
 from django.conf import settings
-from ai_recommender.logic.utils import process_benchmark_dataframe
-from ai_recommender.models import (
-    CPUBenchmark,
-    GPUBenchmark,
-    DiskBenchmark,
-)  # ++ ADDED DiskBenchmark
+from ai_recommender.logic.benchmark_datasets import activate_dataset, validate_dataset
+from ai_recommender.logic.benchmark_import import (
+    SUPPORTED_EXTENSIONS,
+    get_import_settings,
+    import_benchmark_file,
+    load_checkpoint,
+)
+from ai_recommender.logic.embedding_refresh import refresh_after_import
+from ai_recommender.models import BenchmarkDataset
 
 
 class Command(BaseCommand):
@@ -28,28 +30,46 @@ class Command(BaseCommand):
         parser.add_argument(
             "--truncate",
             action="store_true",
-            help="Deletes all existing records for the specified type before importing.",
+            help="Replace the whole table: import into a new dataset, validate it and then switch to it atomically.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="With --truncate, activate the new dataset even if validation fails.",
         )
         parser.add_argument(
             "--file",
             type=str,
             help="Optional: a specific filename within the data directory to use.",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Rows per committed chunk (default: settings.BENCHMARK_IMPORT). CSV/XLSX files are streamed; XLS/ODS are read whole.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted streaming import from its last committed chunk.",
+        )
+        parser.add_argument(
+            "--no-embed",
+            action="store_true",
+            help="Don't re-encode changed CPU/GPU names after the import.",
+        )
+        parser.add_argument(
+            "--no-propagate",
+            action="store_true",
+            help="Don't re-score requirements and vendor components after the import.",
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
         item_type = options["type"].lower()
         truncate = options["truncate"]
         override_file = options["file"]
-        supported_extensions = (".csv", ".xlsx", ".xls", ".ods")
-
-        # ++ CLEANER: Use a dictionary to map type strings to Django models ++
-        MODEL_MAP = {
-            "cpu": CPUBenchmark,
-            "gpu": GPUBenchmark,
-            "disk": DiskBenchmark,
-        }
-        ModelClass = MODEL_MAP[item_type]
+        resume = options["resume"]
+        embed = False if options["no_embed"] else None
 
         # --- 1. Locate the file ---
         data_dir = os.path.join(settings.BASE_DIR, "ai_recommender", "data")
@@ -70,7 +90,7 @@ class Command(BaseCommand):
             # Auto-discovery logic will now work for 'disk' automatically
             for filename in os.listdir(data_dir):
                 if filename.lower().startswith(item_type) and filename.lower().endswith(
-                    supported_extensions
+                    SUPPORTED_EXTENSIONS
                 ):
                     filepath = os.path.join(data_dir, filename)
                     break
@@ -89,46 +109,76 @@ class Command(BaseCommand):
             )
         )
 
-        # --- 2. Truncate old records if requested ---
-        if truncate:
-            # This now works for any type thanks to the MODEL_MAP
-            count, _ = ModelClass.objects.all().delete()
+        checkpoint = load_checkpoint(filepath, item_type) if resume else None
+        if checkpoint:
             self.stdout.write(
-                self.style.WARNING(f"Truncated {count} existing '{item_type}' records.")
+                self.style.WARNING(
+                    f"Resuming from row {checkpoint['rows']} of an interrupted import."
+                )
+            )
+
+        # --- 2. Pick the dataset to write into ---
+        # --truncate loads a new dataset beside the live one (blue/green), so
+        # readers keep the old rows until the new ones are validated.
+        dataset = None
+        if checkpoint and checkpoint.get("dataset"):
+            dataset = BenchmarkDataset.objects.filter(pk=checkpoint["dataset"]).first()
+        if dataset is None and truncate:
+            dataset = BenchmarkDataset.create_next(item_type)
+        staged = dataset is not None and dataset.status == "building"
+        if staged:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Loading into new '{item_type}' dataset #{dataset.number}; the live one stays in use until it is activated."
+                )
             )
 
         # --- 3. Read and process the spreadsheet ---
         try:
-            ext = os.path.splitext(filepath)[1].lower()
-            if ext == ".csv":
-                df = pd.read_csv(filepath)
-            elif ext in (".xlsx", ".xls"):
-                df = pd.read_excel(
-                    filepath
-                )  # Pandas can auto-detect the engine for xls/xlsx
-            elif ext == ".ods":
-                df = pd.read_excel(filepath, engine="odf")
-            else:
-                # This case is unlikely due to the file search, but good for safety
-                raise ValueError(f"Unsupported file format: {ext}")
-
-            # --- 4. Call central processing logic (already updated to handle 'disk') ---
+            # Stream in chunks, committing and checkpointing after each one.
             self.stdout.write("Processing records...")
-            results = process_benchmark_dataframe(df, item_type)
+            results = import_benchmark_file(
+                filepath,
+                item_type,
+                chunk_size=options["chunk_size"],
+                resume=resume,
+                on_progress=self.report_progress,
+                embed=embed,
+                dataset=dataset,
+            )
+            timings = results["timings"]
 
             self.stdout.write(
                 self.style.SUCCESS(
                     f"Import complete for '{item_type}'. Created: {results['created']}, Updated: {results['updated']}, Skipped: {results['skipped']}."
                 )
             )
+            self.stdout.write(
+                "Timings: "
+                + ", ".join(
+                    f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()
+                )
+            )
 
             if results["skipped"] > 0:
                 self.stdout.write(
                     self.style.WARNING(
-                        "Some rows were skipped due to missing names or scores. Please check the warnings above."
+                        "Some rows were skipped due to missing names or scores, or duplicated an earlier name."
                     )
                 )
 
+            # --- 4. Validate and switch over a staged dataset ---
+            if staged and not self.activate(dataset, options["force"], embed):
+                return
+
+            # --- 5. Re-score everything that was matched against the old rows ---
+            if (
+                item_type in ("cpu", "gpu")
+                and get_import_settings()["PROPAGATE_SCORES"]
+                and not options["no_propagate"]
+            ):
+                call_command("propagate_scores", type=item_type, stdout=self.stdout)
+
         except FileNotFoundError:
             self.stdout.write(
                 self.style.ERROR(f"File could not be found at path: {filepath}")
@@ -138,3 +188,35 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.ERROR(f"An unexpected error occurred during processing: {e}")
             )
+
+    def activate(self, dataset, force, embed):
+        """Validates a staged dataset and makes it live. Returns False if it failed."""
+        errors = validate_dataset(dataset)
+        for error in errors:
+            self.stdout.write(self.style.ERROR(f"Validation: {error}"))
+        if errors and not force:
+            dataset.status = "failed"
+            dataset.save(update_fields=["status"])
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Dataset #{dataset.number} was not activated; the live data is unchanged. Use --force to activate it anyway."
+                )
+            )
+            return False
+
+        activate_dataset(dataset)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Activated '{dataset.component_type}' dataset #{dataset.number} ({dataset.rows} rows)."
+            )
+        )
+        # The embeddings were refreshed while staged; write the live snapshot now.
+        if embed is not False and get_import_settings()["EMBED_AFTER_IMPORT"]:
+            refresh_after_import(dataset.component_type)
+        return True
+
+    def report_progress(self, progress):
+        self.stdout.write(
+            f"  {progress['rows']} rows read ({progress['rows_per_second']} rows/s): "
+            f"created {progress['created']}, updated {progress['updated']}, skipped {progress['skipped']}"
+        )
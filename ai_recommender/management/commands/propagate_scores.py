@@ -0,0 +1,35 @@
+# ai_recommender/management/commands/propagate_scores.py
+
+from django.core.management.base import BaseCommand
+from ai_recommender.logic.score_propagation import propagate_scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the CPU/GPU scores stored on application requirements and "
+        "vendor components from the current benchmarks, in one batched pass."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type",
+            type=str,
+            choices=["cpu", "gpu"],
+            help="Only propagate one benchmark type (default: both).",
+        )
+
+    def handle(self, *args, **options):
+        for component_type in ("cpu", "gpu"):
+            if options["type"] and options["type"] != component_type:
+                continue
+
+            self.stdout.write(f"--- Propagating {component_type.upper()} scores ---")
+            summary = propagate_scores(component_type)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Resolved {summary.pop('resolved')} of {summary.pop('strings')} "
+                    f"distinct strings in {summary.pop('seconds'):.1f}s"
+                )
+            )
+            for target, written in summary.items():
+                self.stdout.write(f"  {target}: {written} rows updated")
@@ -0,0 +1,30 @@
+# ai_recommender/management/commands/run_embedding_service.py
+
+from django.core.management.base import BaseCommand, CommandError
+from ai_recommender.logic.embedding_service import get_service_settings, serve
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the local embedding sidecar: one process that owns the sentence "
+        "encoder and benchmark indexes and serves every worker on this machine "
+        "over a Unix socket (settings.EMBEDDING_SERVICE['SOCKET'])."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            type=str,
+            help="Unix socket path (default: EMBEDDING_SERVICE['SOCKET']).",
+        )
+
+    def handle(self, *args, **options):
+        socket_path = options["socket"] or get_service_settings()["SOCKET"]
+        if not socket_path:
+            raise CommandError(
+                "No socket path: pass --socket or set EMBEDDING_SERVICE_SOCKET."
+            )
+        try:
+            serve(socket_path)
+        except KeyboardInterrupt:
+            self.stdout.write("\nEmbedding service stopped.")
@@ -0,0 +1,43 @@
+# ai_recommender/management/commands/snapshot_embeddings.py
+
+from django.core.management.base import BaseCommand
+from ai_recommender.models import CPUBenchmark, GPUBenchmark, BenchmarkVersion
+from ai_recommender.logic.embedding_index import EmbeddingIndex
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes a versioned, memory-mappable snapshot of the normalized CPU/GPU "
+        "benchmark embeddings, shared by every web and Celery worker process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--type",
+            type=str,
+            choices=["cpu", "gpu"],
+            help="Only snapshot one benchmark type (default: both).",
+        )
+
+    def handle(self, *args, **options):
+        for model_class, component_type in (
+            (CPUBenchmark, "cpu"),
+            (GPUBenchmark, "gpu"),
+        ):
+            if options["type"] and options["type"] != component_type:
+                continue
+
+            version = BenchmarkVersion.current(component_type)
+            index = EmbeddingIndex.build(model_class, version, with_ivf=False)
+            if len(index) == 0:
+                self.stdout.write(
+                    self.style.WARNING(f"No embeddings for {model_class.__name__}.")
+                )
+                continue
+
+            path = index.save_snapshot(component_type)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Wrote {component_type.upper()} snapshot v{version} ({len(index)} rows) to {path}"
+                )
+            )
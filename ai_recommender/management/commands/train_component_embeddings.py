@@ -1,113 +1,309 @@
 # ai_recommender/management/commands/train_component_embeddings.py
 
-import json
+import os
 import time
-from django.core.management.base import BaseCommand
-from django.db import transaction, connection
-from sentence_transformers import SentenceTransformer
-from ai_recommender.models import CPUBenchmark, GPUBenchmark
+import numpy as np
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from ai_recommender.models import (
+    CPUBenchmark,
+    GPUBenchmark,
+    BenchmarkVersion,
+    ApplicationSystemRequirement,
+)
+from ai_recommender.logic.embedding_index import EmbeddingIndex
+from ai_recommender.logic.embedding_refresh import (
+    REFRESH_BATCH_SIZE,
+    refresh_embeddings,
+)
+from ai_recommender.logic.encoder import load_sentence_model, describe_encoder
+from ai_recommender.logic.ann_index import IVFIndex, get_ann_settings, recall_report
+from ai_recommender.logic.compressed_index import (
+    CompressedEmbeddingIndex,
+    top1_agreement,
+)
+from vendor.models import Processor, Graphic
 
 
-def process_in_batches(model_class, sentence_model, batch_size=100):
+def build_ann_index(model_class):
     """
-    Helper function to process a model's objects in batches to prevent
-    database timeouts and memory issues.
+    Builds the IVF index for the current embeddings and saves it to
+    EMBEDDING_INDEX_DIR, where web/Celery workers pick it up instead of
+    clustering the table themselves. Returns (EmbeddingIndex, saved path).
     """
-    # Get the name of the text field ('cpu' or 'gpu')
-    text_field_name = "cpu" if model_class == CPUBenchmark else "gpu"
+    component_type = "cpu" if model_class == CPUBenchmark else "gpu"
+    version = BenchmarkVersion.current(component_type)
+    index = EmbeddingIndex.build(model_class, version)
+    if len(index) == 0:
+        return index, None
 
-    # Get total count for progress tracking
-    queryset = model_class.objects.all()
-    total_count = queryset.count()
+    if index.ivf is None:
+        index.ivf = IVFIndex.build(index.matrix, get_ann_settings()["N_LISTS"])
+    return index, index.ivf.save(component_type, version, index.ids)
 
-    if total_count == 0:
-        return 0
 
-    updated_count = 0
-    # Process the queryset in batches
-    for i in range(0, total_count, batch_size):
-        # Ensure the database connection is alive before each batch
-        connection.ensure_connection()
-
-        batch_qs = list(queryset[i : i + batch_size])
-
-        # Get the names to be encoded
-        names_to_encode = [getattr(b, "model_name") for b in batch_qs]
-
-        print(
-            f"\nProcessing batch {i//batch_size + 1} for {model_class.__name__} (items {i+1}-{min(i+batch_size, total_count)}/{total_count})..."
-        )
-
-        # Encode the batch of names
-        embeddings = sentence_model.encode(names_to_encode, show_progress_bar=True)
-
-        # Assign the new embeddings to the objects
-        for benchmark, embedding in zip(batch_qs, embeddings):
-            benchmark.embedding = json.dumps(embedding.tolist())
-
-        # Bulk update the current batch
-        model_class.objects.bulk_update(batch_qs, ["embedding"])
-        updated_count += len(batch_qs)
-
-        # A small sleep can also help prevent overwhelming the system
-        time.sleep(0.5)
+def sample_requirement_texts(model_class, limit=500):
+    """
+    Real component strings to measure recall with: what applications list as
+    requirements and what vendors upload, rather than benchmark names themselves.
+    """
+    if model_class == CPUBenchmark:
+        requirement_field, component_model = "cpu", Processor
+    else:
+        requirement_field, component_model = "gpu", Graphic
 
-    return updated_count
+    texts = set(
+        ApplicationSystemRequirement.objects.exclude(**{requirement_field: ""})
+        .values_list(requirement_field, flat=True)
+        .distinct()[:limit]
+    )
+    texts.update(
+        component_model.objects.exclude(data_received="")
+        .values_list("data_received", flat=True)
+        .distinct()[:limit]
+    )
+    return [t for t in texts if t][:limit]
 
 
 class Command(BaseCommand):
     help = "Generates and stores vector embeddings for CPU and GPU benchmarks."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Re-encode every row, not just new rows and rows whose name changed.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Encode in N processes, each loading the encoder once (default: 1).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REFRESH_BATCH_SIZE,
+            help="Rows per encode call and per bulk_update.",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted run from its last committed batch.",
+        )
+        parser.add_argument(
+            "--build-ann",
+            action="store_true",
+            help="After training, build and save the IVF approximate-search index.",
+        )
+        parser.add_argument(
+            "--ann-only",
+            action="store_true",
+            help="Skip encoding and only (re)build the IVF index from stored embeddings.",
+        )
+        parser.add_argument(
+            "--ann-report",
+            action="store_true",
+            help="Print recall@1/recall@k of the IVF index against exact search.",
+        )
+        parser.add_argument("--ann-k", type=int, default=10)
+        parser.add_argument(
+            "--compress",
+            type=int,
+            metavar="DIMS",
+            help="After training, build a PCA + int8 compressed index with DIMS dimensions.",
+        )
+        parser.add_argument(
+            "--compress-only",
+            action="store_true",
+            help="Skip encoding and only build the compressed index (use with --compress).",
+        )
+
     # We don't need a single transaction for the whole command,
     # as we are processing in independent batches.
     def handle(self, *args, **options):
+        if options["compress_only"] and not options["compress"]:
+            raise CommandError("--compress-only needs --compress DIMS.")
+        if options["ann_only"] or options["compress_only"]:
+            if options["ann_only"]:
+                self.handle_ann(sentence_model=None, **options)
+            if options["compress"]:
+                self.handle_compression(sentence_model=None, dims=options["compress"])
+            return
+
         self.stdout.write(
             self.style.SUCCESS("--- Starting Component Embedding Training ---")
         )
 
-        # 1. Load the sentence transformer model once
-        self.stdout.write("Loading Sentence-BERT model (this may take a moment)...")
-        try:
-            sentence_model = SentenceTransformer("all-mpnet-base-v2")
-            self.stdout.write(self.style.SUCCESS("Model loaded successfully."))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Failed to load model. Error: {e}"))
-            return
+        # 1. Load the sentence transformer model once (each pool process loads its own)
+        workers = max(1, min(options["workers"], os.cpu_count() or 1))
+        sentence_model = None
+        if workers > 1:
+            self.stdout.write(
+                f"Encoding with {describe_encoder()} in {workers} processes..."
+            )
+        else:
+            self.stdout.write(
+                f"Loading sentence encoder {describe_encoder()} (this may take a moment)..."
+            )
+            try:
+                sentence_model = load_sentence_model()
+                self.stdout.write(self.style.SUCCESS("Model loaded successfully."))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"Failed to load model. Error: {e}"))
+                return
+        refresh_options = {
+            "full": options["full"],
+            "workers": workers,
+            "batch_size": options["batch_size"],
+            "resume": options["resume"],
+            "on_batch": self.report_batch,
+        }
 
-        # 2. Process CPUs using the batching helper
+        retrained = []
+
+        # 2. Encode new and renamed CPUs
         self.stdout.write("\n--- Processing CPU Benchmarks ---")
         try:
-            cpu_updated = process_in_batches(CPUBenchmark, sentence_model)
-            if cpu_updated > 0:
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Successfully updated embeddings for {cpu_updated} CPUs."
-                    )
-                )
-            else:
-                self.stdout.write(self.style.WARNING("No CPUs found to process."))
+            result = refresh_embeddings(CPUBenchmark, sentence_model, **refresh_options)
+            self.report_refresh(result, "CPUs")
+            if result["encoded"]:
+                retrained.append("cpu")
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f"An error occurred during CPU processing: {e}")
             )
 
-        # 3. Process GPUs using the batching helper
+        # 3. Encode new and renamed GPUs
         self.stdout.write("\n--- Processing GPU Benchmarks ---")
         try:
-            gpu_updated = process_in_batches(GPUBenchmark, sentence_model)
-            if gpu_updated > 0:
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f"Successfully updated embeddings for {gpu_updated} GPUs."
-                    )
-                )
-            else:
-                self.stdout.write(self.style.WARNING("No GPUs found to process."))
+            result = refresh_embeddings(GPUBenchmark, sentence_model, **refresh_options)
+            self.report_refresh(result, "GPUs")
+            if result["encoded"]:
+                retrained.append("gpu")
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f"An error occurred during GPU processing: {e}")
             )
 
+        # 4. Publish the new embeddings as a shared, memory-mapped snapshot
+        self.stdout.write("\n--- Writing Embedding Snapshots ---")
+        call_command("snapshot_embeddings", stdout=self.stdout)
+
+        # 5. New embeddings can change matches: re-score requirements and components
+        for component_type in retrained:
+            call_command("propagate_scores", type=component_type, stdout=self.stdout)
+
         self.stdout.write(
             self.style.SUCCESS("\n--- Component Embedding Training Complete! ---")
         )
+
+        if options["build_ann"] or options["ann_report"]:
+            self.handle_ann(sentence_model=sentence_model, **options)
+        if options["compress"]:
+            self.handle_compression(sentence_model, dims=options["compress"])
+
+    def report_batch(self, progress):
+        rate = progress["encoded"] / max(progress["seconds"], 1e-9)
+        self.stdout.write(
+            f"  {progress['encoded']}/{progress['total']} encoded ({rate:.0f} rows/s)"
+        )
+
+    def report_refresh(self, result, label):
+        if result["checked"] == 0:
+            self.stdout.write(self.style.WARNING(f"No {label} found to process."))
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Encoded {result['encoded']} of {result['checked']} {label} "
+                f"in {result['seconds']:.1f}s; the rest were unchanged."
+            )
+        )
+
+    def handle_ann(self, sentence_model, **options):
+        """Builds the IVF indexes and, if asked, reports their recall."""
+        for model_class in (CPUBenchmark, GPUBenchmark):
+            label = model_class.__name__
+            self.stdout.write(f"\n--- Building IVF index for {label} ---")
+            index, path = build_ann_index(model_class)
+            if path is None:
+                self.stdout.write(self.style.WARNING(f"No embeddings for {label}."))
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Saved {len(index.ivf.centroids)} partitions over {len(index)} rows to {path}"
+                )
+            )
+
+            if options["ann_report"]:
+                self.report_recall(index, model_class, sentence_model, options["ann_k"])
+
+    def handle_compression(self, sentence_model, dims):
+        """
+        Builds the compressed index for each benchmark type and reports how often
+        its top-1 match agrees with the full-precision path.
+        """
+        for model_class, component_type in (
+            (CPUBenchmark, "cpu"),
+            (GPUBenchmark, "gpu"),
+        ):
+            label = model_class.__name__
+            self.stdout.write(f"\n--- Compressing embeddings for {label} ---")
+            version = BenchmarkVersion.current(component_type)
+            full_index = EmbeddingIndex.build(model_class, version, with_ivf=False)
+            if len(full_index) < 2:
+                self.stdout.write(
+                    self.style.WARNING(f"Not enough embeddings for {label}.")
+                )
+                continue
+
+            compressed = CompressedEmbeddingIndex.fit(full_index, dims)
+            path = compressed.save(component_type, dims)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Saved {compressed.dims}-dim int8 index to {path} "
+                    f"({full_index.matrix.nbytes / 1024:.0f} KB -> {compressed.nbytes / 1024:.0f} KB)"
+                )
+            )
+
+            queries, source = self.report_queries(
+                full_index, model_class, sentence_model
+            )
+            started = time.perf_counter()
+            full_index.search(queries, exact=True)
+            full_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            compressed.search(queries)
+            compressed_seconds = time.perf_counter() - started
+            self.stdout.write(
+                f"Top-1 agreement with full precision ({source}): "
+                f"{top1_agreement(full_index, compressed, queries):.3f}; "
+                f"scan {full_seconds * 1000:.1f} ms -> {compressed_seconds * 1000:.1f} ms"
+            )
+
+    def report_queries(self, index, model_class, sentence_model):
+        """Query vectors for the quality reports, and a description of them."""
+        texts = sample_requirement_texts(model_class)
+        if texts:
+            if sentence_model is None:
+                sentence_model = load_sentence_model()
+            queries = sentence_model.encode(texts, show_progress_bar=False)
+            source = f"{len(texts)} requirement strings"
+        else:
+            # No real traffic yet: perturb a sample of the benchmark vectors.
+            rng = np.random.default_rng(0)
+            sample = rng.choice(len(index), size=min(500, len(index)), replace=False)
+            queries = index.matrix[sample] + rng.normal(
+                scale=0.02, size=(len(sample), index.matrix.shape[1])
+            )
+            source = f"{len(sample)} perturbed benchmark vectors"
+        return queries, source
+
+    def report_recall(self, index, model_class, sentence_model, k):
+        queries, source = self.report_queries(index, model_class, sentence_model)
+        report = recall_report(index, queries, k=k)
+        self.stdout.write(
+            f"Recall vs exact search ({source}, n_probe={report['n_probe']}): "
+            f"recall@1={report['recall_at_1']:.3f}, "
+            f"recall@{report['k']}={report['recall_at_k']:.3f}"
+        )
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_recommender', '0004_recommendationspecification_ai_summary_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BenchmarkVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component_type', models.CharField(choices=[('cpu', 'CPU'), ('gpu', 'GPU'), ('disk', 'Disk')], max_length=10, unique=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
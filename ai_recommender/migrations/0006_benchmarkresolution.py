@@ -0,0 +1,105 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:07
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# A frozen copy of logic.resolution_cache.normalize_component_text, so this
+# migration keeps producing the same keys whatever happens to the app code.
+def normalize_component_text(text):
+    text = re.sub(r"\((r|tm)\)|[®™]", " ", str(text).lower())
+    return " ".join(text.split())
+
+
+def seed_admin_corrections(apps, schema_editor):
+    """Existing CPU corrections become pinned entries in the resolution cache."""
+    AdminCorrectionLog = apps.get_model("ai_recommender", "AdminCorrectionLog")
+    BenchmarkResolution = apps.get_model("ai_recommender", "BenchmarkResolution")
+
+    corrections = AdminCorrectionLog.objects.filter(
+        component_type="cpu", corrected_match__isnull=False
+    ).order_by("created_at")
+    for correction in corrections:
+        normalized_text = normalize_component_text(correction.original_text or "")
+        if not normalized_text or len(normalized_text) > 255:
+            continue
+        BenchmarkResolution.objects.update_or_create(
+            component_type="cpu",
+            normalized_text=normalized_text,
+            defaults={
+                "benchmark_id": correction.corrected_match_id,
+                "confidence": 1.0,
+                "method": "admin",
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0005_benchmarkversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="admincorrectionlog",
+            name="corrected_gpu_match",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="corrected_gpu_matches",
+                to="ai_recommender.gpubenchmark",
+            ),
+        ),
+        migrations.CreateModel(
+            name="BenchmarkResolution",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "component_type",
+                    models.CharField(
+                        choices=[("cpu", "CPU"), ("gpu", "GPU")], max_length=10
+                    ),
+                ),
+                ("normalized_text", models.CharField(max_length=255)),
+                (
+                    "benchmark_id",
+                    models.BigIntegerField(
+                        blank=True,
+                        help_text="Primary key of the matched CPUBenchmark/GPUBenchmark, or null for no match.",
+                        null=True,
+                    ),
+                ),
+                ("confidence", models.FloatField(default=0.0)),
+                (
+                    "method",
+                    models.CharField(
+                        choices=[
+                            ("admin", "Admin correction"),
+                            ("embedding", "Embedding match"),
+                            ("none", "No match"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("benchmark_version", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("modified_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "unique_together": {("component_type", "normalized_text")},
+            },
+        ),
+        migrations.RunPython(seed_admin_corrections, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,149 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:08
+
+import re
+
+from django.db import migrations, models
+
+# A frozen copy of logic.model_tokens.extract_model_token as of this
+# migration, so the backfill doesn't change along with the app code.
+CPU_TOKEN_PATTERNS = [
+    # Intel Core i3/i5/i7/i9, e.g. i7-9700K, i5 8400, i7-1165G7
+    (
+        re.compile(r"\b(i[3579])\s*-?\s*(\d{3,5}(?:[a-z]{1,2}\d?)?)\b"),
+        lambda m: f"{m.group(1)}-{m.group(2)}",
+    ),
+    # Intel Core Ultra, e.g. Core Ultra 7 155H
+    (
+        re.compile(r"\bultra\s*([579])\s*(\d{3}[a-z]{0,2})\b"),
+        lambda m: f"ultra {m.group(1)} {m.group(2)}",
+    ),
+    # AMD Ryzen, e.g. Ryzen 7 2700X, Ryzen 5 PRO 4650G
+    (
+        re.compile(r"\bryzen\s*([3579])\s*(?:pro\s*)?(\d{4}[a-z0-9]{0,3})\b"),
+        lambda m: f"ryzen {m.group(1)} {m.group(2)}",
+    ),
+    # AMD Ryzen Threadripper, e.g. Threadripper 3990X
+    (
+        re.compile(r"\bthreadripper\s*(?:pro\s*)?(\d{4}[a-z]{0,2})\b"),
+        lambda m: f"threadripper {m.group(1)}",
+    ),
+]
+
+GPU_TOKEN_PATTERNS = [
+    # NVIDIA GeForce, e.g. RTX 3070, GTX 1660 SUPER, RTX 4070 Ti SUPER
+    (
+        re.compile(r"\b(rtx|gtx|gt|mx)\s*-?\s*(\d{3,4})\b(\s*ti\b)?(\s*super\b)?"),
+        lambda m: " ".join(
+            part
+            for part in (
+                m.group(1),
+                m.group(2),
+                "ti" if m.group(3) else "",
+                "super" if m.group(4) else "",
+            )
+            if part
+        ),
+    ),
+    # AMD Radeon RX, e.g. RX 580, RX 6800 XT, RX 7900 XTX
+    (
+        re.compile(r"\brx\s*-?\s*(\d{3,4})\b(\s*(?:xtx|xt|gre)\b)?"),
+        lambda m: " ".join(
+            part for part in ("rx", m.group(1), (m.group(2) or "").strip()) if part
+        ),
+    ),
+    # AMD Radeon Vega, e.g. RX Vega 56
+    (
+        re.compile(r"\bvega\s*(\d{2})\b"),
+        lambda m: f"vega {m.group(1)}",
+    ),
+    # Intel Arc, e.g. Arc A770
+    (
+        re.compile(r"\barc\s*([ab]\d{3}m?)\b"),
+        lambda m: f"arc {m.group(1)}",
+    ),
+]
+
+# Laptop variants share a model number with much faster desktop parts.
+MOBILE_GPU_PATTERN = re.compile(r"\b(laptop|mobile|max-?q)\b")
+
+
+def extract_model_token(text, component_type):
+    if not text:
+        return None
+
+    clean_text = re.sub(r"\((r|tm)\)|[®™]", " ", str(text).lower())
+    patterns = CPU_TOKEN_PATTERNS if component_type == "cpu" else GPU_TOKEN_PATTERNS
+
+    for pattern, formatter in patterns:
+        match = pattern.search(clean_text)
+        if match:
+            token = formatter(match)
+            if component_type != "cpu" and MOBILE_GPU_PATTERN.search(clean_text):
+                token += " mobile"
+            return token
+    return None
+
+
+def backfill_model_tokens(apps, schema_editor):
+    CPUBenchmark = apps.get_model("ai_recommender", "CPUBenchmark")
+    GPUBenchmark = apps.get_model("ai_recommender", "GPUBenchmark")
+
+    for ModelClass, component_type, source_field in (
+        (CPUBenchmark, "cpu", "model_name"),
+        (GPUBenchmark, "gpu", "gpu"),
+    ):
+        to_update = []
+        for benchmark in ModelClass.objects.only("id", source_field).iterator():
+            token = extract_model_token(
+                getattr(benchmark, source_field), component_type
+            )
+            if token:
+                benchmark.model_token = token
+                to_update.append(benchmark)
+        ModelClass.objects.bulk_update(to_update, ["model_token"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0006_benchmarkresolution"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cpubenchmark",
+            name="model_token",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                help_text="Canonical model number used for exact matching, e.g. 'i7-9700k'.",
+                max_length=50,
+            ),
+        ),
+        migrations.AddField(
+            model_name="gpubenchmark",
+            name="model_token",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                help_text="Canonical model number used for exact matching, e.g. 'rtx 4090'.",
+                max_length=50,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="benchmarkresolution",
+            name="method",
+            field=models.CharField(
+                choices=[
+                    ("admin", "Admin correction"),
+                    ("token", "Model-number match"),
+                    ("embedding", "Embedding match"),
+                    ("none", "No match"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(backfill_model_tokens, migrations.RunPython.noop),
+    ]
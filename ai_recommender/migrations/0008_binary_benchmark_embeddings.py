@@ -0,0 +1,105 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:10
+
+import json
+
+import numpy as np
+from django.db import migrations, models
+
+# A frozen copy of logic.embedding_codec: raw little-endian float32 bytes.
+EMBEDDING_DTYPE = np.dtype("<f4")
+
+
+def encode_embedding(vector):
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def decode_embedding(blob):
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+def json_to_binary(apps, schema_editor):
+    for model_name in ("CPUBenchmark", "GPUBenchmark"):
+        ModelClass = apps.get_model("ai_recommender", model_name)
+        rows = (
+            ModelClass.objects.exclude(embedding__isnull=True)
+            .exclude(embedding="")
+            .only("id", "embedding")
+        )
+        to_update = []
+        for benchmark in rows.iterator(chunk_size=500):
+            benchmark.embedding_vector = encode_embedding(
+                json.loads(benchmark.embedding)
+            )
+            to_update.append(benchmark)
+        ModelClass.objects.bulk_update(to_update, ["embedding_vector"], batch_size=500)
+
+
+def binary_to_json(apps, schema_editor):
+    for model_name in ("CPUBenchmark", "GPUBenchmark"):
+        ModelClass = apps.get_model("ai_recommender", model_name)
+        rows = ModelClass.objects.exclude(embedding_vector__isnull=True).only(
+            "id", "embedding_vector"
+        )
+        to_update = []
+        for benchmark in rows.iterator(chunk_size=500):
+            vector = decode_embedding(benchmark.embedding_vector)
+            benchmark.embedding = json.dumps(vector.tolist())
+            to_update.append(benchmark)
+        ModelClass.objects.bulk_update(to_update, ["embedding"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0007_benchmark_model_token"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cpubenchmark",
+            name="embedding_vector",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="gpubenchmark",
+            name="embedding_vector",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(json_to_binary, binary_to_json),
+        migrations.RemoveField(
+            model_name="cpubenchmark",
+            name="embedding",
+        ),
+        migrations.RemoveField(
+            model_name="gpubenchmark",
+            name="embedding",
+        ),
+        migrations.RenameField(
+            model_name="cpubenchmark",
+            old_name="embedding_vector",
+            new_name="embedding",
+        ),
+        migrations.RenameField(
+            model_name="gpubenchmark",
+            old_name="embedding_vector",
+            new_name="embedding",
+        ),
+        migrations.AlterField(
+            model_name="cpubenchmark",
+            name="embedding",
+            field=models.BinaryField(
+                blank=True,
+                help_text="768-dim float32 vector embedding, raw bytes.",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gpubenchmark",
+            name="embedding",
+            field=models.BinaryField(
+                blank=True,
+                help_text="768-dim float32 vector embedding, raw bytes.",
+                null=True,
+            ),
+        ),
+    ]
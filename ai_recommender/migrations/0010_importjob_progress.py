@@ -0,0 +1,59 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0009_importjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="created",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="error",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="rows",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Data rows read so far."
+            ),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="rows_per_second",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="skipped",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="timings",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Seconds spent per stage: parse, clean, write, embed.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="updated",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
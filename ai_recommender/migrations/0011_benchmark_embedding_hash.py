@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0010_importjob_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cpubenchmark",
+            name="embedding_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Hash of the encoder and model_name the embedding was computed from.",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="gpubenchmark",
+            name="embedding_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Hash of the encoder and model_name the embedding was computed from.",
+                max_length=64,
+            ),
+        ),
+    ]
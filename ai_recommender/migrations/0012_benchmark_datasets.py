@@ -0,0 +1,193 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def assign_initial_datasets(apps, schema_editor):
+    """Existing benchmark rows become dataset #1 of their type, already active."""
+    BenchmarkDataset = apps.get_model("ai_recommender", "BenchmarkDataset")
+    for model_name, component_type in (
+        ("CPUBenchmark", "cpu"),
+        ("GPUBenchmark", "gpu"),
+        ("DiskBenchmark", "disk"),
+    ):
+        ModelClass = apps.get_model("ai_recommender", model_name)
+        dataset = BenchmarkDataset.objects.create(
+            component_type=component_type,
+            number=1,
+            status="active",
+            rows=ModelClass.objects.count(),
+            activated_at=django.utils.timezone.now(),
+        )
+        ModelClass.objects.update(dataset=dataset)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0011_benchmark_embedding_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BenchmarkDataset",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "component_type",
+                    models.CharField(
+                        choices=[("cpu", "CPU"), ("gpu", "GPU"), ("disk", "Disk")],
+                        max_length=10,
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("building", "Building"),
+                            ("active", "Active"),
+                            ("previous", "Previous"),
+                            ("failed", "Failed validation"),
+                        ],
+                        db_index=True,
+                        default="building",
+                        max_length=20,
+                    ),
+                ),
+                ("rows", models.PositiveIntegerField(default=0)),
+                (
+                    "stats",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Row count, score distribution and validation errors.",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("activated_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "unique_together": {("component_type", "number")},
+            },
+        ),
+        migrations.AddField(
+            model_name="cpubenchmark",
+            name="dataset",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The imported version this row belongs to (defaults to the active one).",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="ai_recommender.benchmarkdataset",
+            ),
+        ),
+        migrations.AddField(
+            model_name="diskbenchmark",
+            name="dataset",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The imported version this row belongs to (defaults to the active one).",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="ai_recommender.benchmarkdataset",
+            ),
+        ),
+        migrations.AddField(
+            model_name="gpubenchmark",
+            name="dataset",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The imported version this row belongs to (defaults to the active one).",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="ai_recommender.benchmarkdataset",
+            ),
+        ),
+        migrations.RunPython(assign_initial_datasets, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="cpubenchmark",
+            name="dataset",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The imported version this row belongs to (defaults to the active one).",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="ai_recommender.benchmarkdataset",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="diskbenchmark",
+            name="dataset",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The imported version this row belongs to (defaults to the active one).",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="ai_recommender.benchmarkdataset",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gpubenchmark",
+            name="dataset",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The imported version this row belongs to (defaults to the active one).",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="ai_recommender.benchmarkdataset",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="cpubenchmark",
+            name="cpu",
+            field=models.CharField(
+                help_text="The full, original name from the benchmark source.",
+                max_length=255,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="diskbenchmark",
+            name="drive_name",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="gpubenchmark",
+            name="gpu",
+            field=models.CharField(
+                help_text="The full, original name from the benchmark source, e.g., 'NVIDIA GeForce RTX 4090'",
+                max_length=255,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="cpubenchmark",
+            constraint=models.UniqueConstraint(
+                fields=("dataset", "cpu"), name="unique_cpu_per_dataset"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="diskbenchmark",
+            constraint=models.UniqueConstraint(
+                fields=("dataset", "drive_name"), name="unique_drive_per_dataset"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="gpubenchmark",
+            constraint=models.UniqueConstraint(
+                fields=("dataset", "gpu"), name="unique_gpu_per_dataset"
+            ),
+        ),
+    ]
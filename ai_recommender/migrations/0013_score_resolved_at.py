@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0012_benchmark_datasets"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="applicationsystemrequirement",
+            name="score_resolved_at",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                help_text="When the scores were last resolved; empty while resolution is pending.",
+                null=True,
+            ),
+        ),
+    ]
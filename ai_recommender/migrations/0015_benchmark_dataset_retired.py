@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0014_recommendation_jobs"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="benchmarkdataset",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("building", "Building"),
+                    ("active", "Active"),
+                    ("previous", "Previous"),
+                    ("failed", "Failed validation"),
+                    ("retired", "Retired (only referenced rows kept)"),
+                ],
+                db_index=True,
+                default="building",
+                max_length=20,
+            ),
+        ),
+    ]
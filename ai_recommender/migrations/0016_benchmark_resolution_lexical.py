@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0015_benchmark_dataset_retired"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="benchmarkresolution",
+            name="method",
+            field=models.CharField(
+                choices=[
+                    ("admin", "Admin correction"),
+                    ("token", "Model-number match"),
+                    ("embedding", "Embedding match"),
+                    ("lexical", "Trigram match"),
+                    ("none", "No match"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ai_recommender", "0016_benchmark_resolution_lexical"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the running job last reported progress.",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,14 +1,41 @@
 from rest_framework.response import Response
 from rest_framework import status
-import base64
+from rest_framework.decorators import action
+from django.shortcuts import get_object_or_404
+from django.db import transaction
 from .tasks import process_benchmark_file
+from .models import BenchmarkVersion, ImportJob
+from .serializers import ImportJobSerializer
+from .logic.benchmark_import import (
+    claim_staged_file,
+    discard_staged_file,
+    fail_stale_import_jobs,
+    stage_upload,
+)
 
 
 class AsynchronousBenchmarkUploadMixin:
     """
     A Mixin to handle file uploads and delegate processing to Celery.
+    The upload is staged on disk and the task only receives its path and
+    checksum; a file identical to one already imported (or still importing)
+    is skipped. Jobs silent for longer than STALE_JOB_SECONDS don't count.
     """
 
+    @action(detail=False, methods=["get"], url_path=r"jobs/(?P<job_id>\d+)")
+    def job_status(self, request, job_id=None):
+        """Progress, counts, stage timings and throughput of one upload."""
+        job = get_object_or_404(ImportJob, pk=job_id, item_type=self.benchmark_type)
+        return Response(ImportJobSerializer(job).data)
+
+    @action(detail=False, methods=["get"], url_path="jobs")
+    def jobs(self, request):
+        """The most recent uploads of this benchmark type."""
+        jobs = ImportJob.objects.filter(item_type=self.benchmark_type).order_by(
+            "-created_at"
+        )[:20]
+        return Response(ImportJobSerializer(jobs, many=True).data)
+
     def _handle_upload(self, request, item_type):
         file = request.FILES.get("file")
         if not file:
@@ -17,13 +44,67 @@ class AsynchronousBenchmarkUploadMixin:
             )
 
         try:
-            file_content_base64 = base64.b64encode(file.read()).decode("utf-8")
-            process_benchmark_file.delay(file_content_base64, file.name, item_type)
-            return Response(
-                {"message": "File received. Processing has started in the background."},
-                status=status.HTTP_202_ACCEPTED,
-            )
+            staged_path, checksum = stage_upload(file, item_type)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+        fail_stale_import_jobs(item_type)
+        duplicate = (
+            ImportJob.objects.filter(item_type=item_type, checksum=checksum)
+            .exclude(status="failed")
+            .order_by("-created_at")
+            .first()
+        )
+        if duplicate:
+            # A pending/running job has its own copy of the file.
+            discard_staged_file(staged_path)
+            return Response(
+                {
+                    "message": "An identical file has already been uploaded. Skipping.",
+                    "job_id": duplicate.id,
+                    "status": duplicate.status,
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        job = ImportJob.objects.create(
+            item_type=item_type, file_name=file.name, checksum=checksum
+        )
+        staged_path = claim_staged_file(staged_path, job)
+        transaction.on_commit(
+            lambda: process_benchmark_file.delay(
+                staged_path, checksum, item_type, job.id
+            )
+        )
+        return Response(
+            {
+                "message": "File received. Processing has started in the background.",
+                "job_id": job.id,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class BenchmarkVersionMixin:
+    """
+    A Mixin for benchmark ViewSets that bumps the benchmark version stamp
+    after any single-row write, so cached embedding indexes are rebuilt.
+    """
+
+    benchmark_type = None
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        BenchmarkVersion.bump(self.benchmark_type)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        BenchmarkVersion.bump(self.benchmark_type)
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        BenchmarkVersion.bump(self.benchmark_type)
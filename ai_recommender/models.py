@@ -1,8 +1,12 @@
 import re
 from login_and_register.models import *
-from django.db.models import Q
+from django.db.models import Q, F
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from .logic.web_extractor import get_structured_component
+from .logic.model_tokens import extract_model_token, parse_cpu_name, parse_gpu_name
 from django.db.models import Avg
 import difflib
 import uuid
@@ -89,10 +93,47 @@ class Application(models.Model):
         return self.name
 
 
-class CPUBenchmark(models.Model):
+class ActiveDatasetManager(models.Manager):
+    """Benchmark rows of the active dataset only; what every reader sees."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(dataset__status="active")
+
+
+class VersionedBenchmark(models.Model):
+    """
+    Base for the benchmark tables. Every row belongs to a BenchmarkDataset;
+    `objects` only returns rows of the active one, `all_versions` returns all.
+    """
+
+    component_type = None
+
+    dataset = models.ForeignKey(
+        "BenchmarkDataset",
+        on_delete=models.CASCADE,
+        related_name="+",
+        blank=True,
+        help_text="The imported version this row belongs to (defaults to the active one).",
+    )
+
+    objects = ActiveDatasetManager()
+    all_versions = models.Manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # Single-row writes (admin, API) go to the live table.
+        if self.dataset_id is None:
+            self.dataset = BenchmarkDataset.active(self.component_type)
+        super().save(*args, **kwargs)
+
+
+class CPUBenchmark(VersionedBenchmark):
+    component_type = "cpu"
+
     cpu = models.CharField(
         max_length=255,
-        unique=True,
         help_text="The full, original name from the benchmark source.",
     )
 
@@ -109,40 +150,50 @@ class CPUBenchmark(models.Model):
         blank=True,
         help_text="The clock speed in GHz, if available.",
     )
+    model_token = models.CharField(
+        max_length=50,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="Canonical model number used for exact matching, e.g. 'i7-9700k'.",
+    )
     score = models.IntegerField()
     rank = models.IntegerField(null=True, blank=True)
     value_score = models.FloatField(null=True, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
-    embedding = models.TextField(
-        blank=True, null=True, help_text="JSON-serialized 768-dim vector embedding."
+    embedding = models.BinaryField(
+        blank=True, null=True, help_text="768-dim float32 vector embedding, raw bytes."
+    )
+    embedding_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Hash of the encoder and model_name the embedding was computed from.",
     )
 
     def save(self, *args, **kwargs):
         # --- UNCOMMENT AND FIX ---
         if not self.model_name:
-            # CORRECT: Use self.cpu, not self.name
-            clean_name = self.cpu.strip()
-            if "@" in clean_name:
-                parts = clean_name.split("@", 1)
-                self.model_name = parts[0].strip()
-                speed_match = re.search(r"(\d+\.?\d*)\s*GHz", parts[1], re.IGNORECASE)
-                if speed_match:
-                    self.clock_speed_ghz = float(speed_match.group(1))
-                else:
-                    self.clock_speed_ghz = None
-            else:
-                self.model_name = clean_name
-                self.clock_speed_ghz = None
+            self.model_name, self.clock_speed_ghz = parse_cpu_name(self.cpu)
+        self.model_token = extract_model_token(self.model_name, "cpu") or ""
         super().save(*args, **kwargs)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dataset", "cpu"], name="unique_cpu_per_dataset"
+            )
+        ]
+
     def __str__(self):
         return self.cpu
 
 
-class GPUBenchmark(models.Model):
+class GPUBenchmark(VersionedBenchmark):
+    component_type = "gpu"
+
     gpu = models.CharField(
         max_length=255,
-        unique=True,
         help_text="The full, original name from the benchmark source, e.g., 'NVIDIA GeForce RTX 4090'",
     )
     model_name = models.CharField(
@@ -150,44 +201,286 @@ class GPUBenchmark(models.Model):
         db_index=True,
         help_text="The clean model name, e.g., 'GeForce RTX 4090'",
     )
+    model_token = models.CharField(
+        max_length=50,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="Canonical model number used for exact matching, e.g. 'rtx 4090'.",
+    )
     score = models.IntegerField()
     rank = models.IntegerField(null=True, blank=True)
     value_score = models.FloatField(null=True, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
-    embedding = models.TextField(
-        blank=True, null=True, help_text="JSON-serialized 768-dim vector embedding."
+    embedding = models.BinaryField(
+        blank=True, null=True, help_text="768-dim float32 vector embedding, raw bytes."
+    )
+    embedding_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Hash of the encoder and model_name the embedding was computed from.",
     )
 
     def save(self, *args, **kwargs):
         # --- UNCOMMENT AND FIX ---
         if not self.model_name:
-            # CORRECT: Use self.gpu, not self.name
-            clean_name = self.gpu.strip()
-            prefixes_to_remove = ["NVIDIA", "AMD", "Intel"]
-            parsed_model_name = clean_name
-            for prefix in prefixes_to_remove:
-                if parsed_model_name.lower().startswith(prefix.lower()):
-                    parsed_model_name = parsed_model_name[len(prefix) :].strip()
-            self.model_name = parsed_model_name
+            self.model_name = parse_gpu_name(self.gpu)
+        self.model_token = extract_model_token(self.gpu, "gpu") or ""
         super().save(*args, **kwargs)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dataset", "gpu"], name="unique_gpu_per_dataset"
+            )
+        ]
+
     def __str__(self):
         # Using self.gpu is better here as it's the full, original name
         return f"{self.gpu} (Score: {self.score})"
 
 
-class DiskBenchmark(models.Model):
-    drive_name = models.CharField(max_length=255, unique=True)
+class BenchmarkVersion(models.Model):
+    """
+    A version stamp per benchmark type. It is bumped whenever benchmark rows or
+    their embeddings change, so per-process indexes know when to reload.
+    """
+
+    component_type = models.CharField(
+        max_length=10,
+        unique=True,
+        choices=[("cpu", "CPU"), ("gpu", "GPU"), ("disk", "Disk")],
+    )
+    version = models.PositiveIntegerField(default=0)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def current(cls, component_type):
+        """Returns the current version number for a component type (0 if never bumped)."""
+        version = (
+            cls.objects.filter(component_type=component_type)
+            .values_list("version", flat=True)
+            .first()
+        )
+        return version or 0
+
+    @classmethod
+    def bump(cls, component_type):
+        """Atomically increments the version for a component type."""
+        stamp, _ = cls.objects.get_or_create(component_type=component_type)
+        cls.objects.filter(pk=stamp.pk).update(
+            version=F("version") + 1, modified_at=timezone.now()
+        )
+
+    def __str__(self):
+        return f"{self.component_type} benchmarks v{self.version}"
+
+
+class BenchmarkDataset(models.Model):
+    """
+    One imported version of a benchmark table. Exactly one dataset per type is
+    active, and the benchmark managers only return its rows. A full re-import
+    is loaded into a new dataset beside it, validated, and then activated in
+    one transaction, so readers never see a half-loaded table. The previously
+    active dataset is kept for rollback.
+    """
+
+    STATUS_CHOICES = [
+        ("building", "Building"),
+        ("active", "Active"),
+        ("previous", "Previous"),
+        ("failed", "Failed validation"),
+        ("retired", "Retired (only referenced rows kept)"),
+    ]
+
+    component_type = models.CharField(
+        max_length=10, choices=[("cpu", "CPU"), ("gpu", "GPU"), ("disk", "Disk")]
+    )
+    number = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="building", db_index=True
+    )
+    rows = models.PositiveIntegerField(default=0)
+    stats = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Row count, score distribution and validation errors.",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    activated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("component_type", "number")
+
+    @classmethod
+    def active(cls, component_type):
+        """The live dataset for a component type, created on first use."""
+        dataset = cls.objects.filter(
+            component_type=component_type, status="active"
+        ).first()
+        if dataset is None:
+            dataset, _ = cls.objects.get_or_create(
+                component_type=component_type,
+                number=1,
+                defaults={"status": "active", "activated_at": timezone.now()},
+            )
+        return dataset
+
+    @classmethod
+    def create_next(cls, component_type):
+        """A new, empty dataset to load a full re-import into."""
+        latest = (
+            cls.objects.filter(component_type=component_type)
+            .order_by("-number")
+            .values_list("number", flat=True)
+            .first()
+        )
+        return cls.objects.create(
+            component_type=component_type, number=(latest or 0) + 1
+        )
+
+    def __str__(self):
+        return f"{self.component_type} dataset #{self.number} ({self.status})"
+
+
+class BenchmarkResolution(models.Model):
+    """
+    Caches how a normalized requirement string (e.g. "intel core i5-8400") was
+    resolved to a CPU/GPU benchmark, so repeat lookups skip model inference.
+    Automatic entries are only valid for the benchmark version they were made
+    against; admin corrections always take priority.
+    """
+
+    METHOD_CHOICES = [
+        ("admin", "Admin correction"),
+        ("token", "Model-number match"),
+        ("embedding", "Embedding match"),
+        ("lexical", "Trigram match"),
+        ("none", "No match"),
+    ]
+
+    component_type = models.CharField(
+        max_length=10, choices=[("cpu", "CPU"), ("gpu", "GPU")]
+    )
+    normalized_text = models.CharField(max_length=255)
+    benchmark_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Primary key of the matched CPUBenchmark/GPUBenchmark, or null for no match.",
+    )
+    confidence = models.FloatField(default=0.0)
+    method = models.CharField(max_length=20, choices=METHOD_CHOICES)
+    benchmark_version = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    modified_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("component_type", "normalized_text")
+
+    def __str__(self):
+        return f"[{self.component_type}] '{self.normalized_text}' -> {self.benchmark_id} ({self.method})"
+
+
+class DiskBenchmark(VersionedBenchmark):
+    component_type = "disk"
+
+    drive_name = models.CharField(max_length=255)
     size_tb = models.FloatField(null=True, blank=True)
     score = models.IntegerField()
     rank = models.IntegerField(null=True, blank=True)
     value_score = models.FloatField(null=True, blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dataset", "drive_name"], name="unique_drive_per_dataset"
+            )
+        ]
+
     def __str__(self):
         return f"{self.drive_name} (Score: {self.score})"
 
 
+class ImportJob(models.Model):
+    """
+    One uploaded benchmark file, staged on disk and processed by Celery. The
+    checksum lets identical re-uploads be recognised and skipped. Progress is
+    written after every committed chunk, so a running job can be polled.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    item_type = models.CharField(
+        max_length=10, choices=[("cpu", "CPU"), ("gpu", "GPU"), ("disk", "Disk")]
+    )
+    file_name = models.CharField(max_length=255)
+    checksum = models.CharField(
+        max_length=64, db_index=True, help_text="SHA-256 of the uploaded file."
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    rows = models.PositiveIntegerField(default=0, help_text="Data rows read so far.")
+    created = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    timings = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Seconds spent per stage: parse, clean, write, embed.",
+    )
+    rows_per_second = models.FloatField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="When the running job last reported progress."
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def start(self):
+        self.status = "running"
+        self.started_at = self.heartbeat_at = timezone.now()
+        self.save(update_fields=["status", "started_at", "heartbeat_at"])
+
+    def record_progress(self, progress: dict):
+        """Stores the running counts reported after each imported chunk."""
+        for field in ("rows", "created", "updated", "skipped", "rows_per_second"):
+            setattr(self, field, progress[field])
+        self.heartbeat_at = timezone.now()
+        self.save(
+            update_fields=[
+                "rows",
+                "created",
+                "updated",
+                "skipped",
+                "rows_per_second",
+                "heartbeat_at",
+            ]
+        )
+
+    def finish(self, results=None, error=""):
+        """Marks the job succeeded with its final results, or failed with an error."""
+        if results:
+            for field in ("rows", "created", "updated", "skipped", "timings"):
+                setattr(self, field, results[field])
+        self.status = "failed" if error else "succeeded"
+        self.error = error
+        self.finished_at = timezone.now()
+        if self.started_at:
+            elapsed = (self.finished_at - self.started_at).total_seconds()
+            self.rows_per_second = round(self.rows / max(elapsed, 1e-6), 1)
+        self.save()
+
+    def __str__(self):
+        return f"[{self.item_type}] {self.file_name} ({self.status})"
+
+
 # +++ OVERHAULED ApplicationSystemRequirement MODEL +++
 class ApplicationSystemRequirement(models.Model):
     application = models.ForeignKey(
@@ -210,62 +503,27 @@ class ApplicationSystemRequirement(models.Model):
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     modified_at = models.DateTimeField(auto_now=True)
-
-    ### REFACTORED AND SIMPLIFIED METHOD ###
-    def _get_benchmark_score(self, requirement_name, benchmark_model, component_type):
-        from .logic.utils import find_best_benchmark_object
-
-        """
-        Finds the best benchmark score by calling the canonical lookup function.
-        This is now a simple wrapper.
-        """
-        print(f"--- Analyzing {component_type} requirement: '{requirement_name}' ---")
-
-        # The new function handles splitting and finding the best match all in one go!
-        best_match_object = find_best_benchmark_object(requirement_name, component_type)
-
-        if best_match_object:
-            score = best_match_object.score
-            print(
-                f"--> Match found: '{best_match_object.name}'. Selected score: {score}"
-            )
-            return score
-        else:
-            print(f"CRITICAL: Could not determine a score for '{requirement_name}'.")
-            return None
+    score_resolved_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="When the scores were last resolved; empty while resolution is pending.",
+    )
 
     def save(self, *args, **kwargs):
         """
-        Orchestrates finding scores for CPU and GPU using the new,
-        smarter embedding-based matching function.
+        CPU/GPU scores are resolved in the background (see
+        logic/score_resolution.py), so saving never waits on the encoder.
         """
-        from .logic.utils import find_best_benchmark_object
-
-        print(f"--- Analyzing cpu requirement: '{self.cpu}' ---")
-        if self.cpu and self.cpu_score is None:
-            # Use the new, imported function
-            best_cpu_match = find_best_benchmark_object(self.cpu, "cpu")
-            if best_cpu_match:
-                self.cpu_score = best_cpu_match.score
-                print(
-                    f"  -> Match found for CPU '{self.cpu}': '{best_cpu_match.cpu}' with score {best_cpu_match.score}"
-                )
-            else:
-                print(f"  -> CRITICAL: No CPU match found for '{self.cpu}'.")
-
-        print(f"--- Analyzing gpu requirement: '{self.gpu}' ---")
-        if self.gpu and self.gpu_score is None:
-            # Use the new, imported function
-            best_gpu_match = find_best_benchmark_object(self.gpu, "gpu")
-            if best_gpu_match:
-                self.gpu_score = best_gpu_match.score
-                print(
-                    f"  -> Match found for GPU '{self.gpu}': '{best_gpu_match.gpu}' with score {best_gpu_match.score}"
-                )
-            else:
-                print(f"  -> CRITICAL: No GPU match found for '{self.gpu}'.")
+        from .logic.score_resolution import (
+            prepare_score_resolution,
+            queue_score_resolution,
+        )
 
+        pending = prepare_score_resolution(self)
         super().save(*args, **kwargs)
+        if pending:
+            queue_score_resolution(type(self))
 
     def __str__(self):
         return f"{self.application.name} ({self.type})"
@@ -341,6 +599,81 @@ class RecommendationSpecification(models.Model):
         return f"Recommendation for {user_or_session} at {self.created_at.strftime('%Y-%m-%d %H:%M')}"
 
 
+class RecommendationJob(models.Model):
+    """
+    One POST /recommend/ request, run by Celery so the web worker can answer
+    immediately. Clients poll it or follow its event stream; the stage shows
+    which AI step is running.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+    STAGE_CHOICES = [
+        ("queued", "Queued"),
+        ("discovery", "Discovering applications"),
+        ("recommendation", "Generating recommendation"),
+        ("done", "Done"),
+    ]
+
+    # Random ids: anonymous clients fetch their job by id alone.
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    preference = models.ForeignKey(
+        UserPreference, on_delete=models.CASCADE, related_name="recommendation_jobs"
+    )
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, null=True, blank=True
+    )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="pending", db_index=True
+    )
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default="queued")
+    specification = models.ForeignKey(
+        RecommendationSpecification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    error = models.TextField(blank=True, default="")
+    timings = models.JSONField(
+        default=dict, blank=True, help_text="Seconds spent per pipeline stage."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def is_finished(self):
+        return self.status in ("succeeded", "failed")
+
+    def start(self):
+        self.status = "running"
+        self.started_at = timezone.now()
+        self.save(update_fields=["status", "started_at"])
+
+    def set_stage(self, stage):
+        self.stage = stage
+        self.save(update_fields=["stage"])
+
+    def finish(self, specification=None, error="", timings=None):
+        """Marks the job succeeded with its specification, or failed with an error."""
+        self.specification = specification
+        self.status = "failed" if error else "succeeded"
+        self.stage = "done"
+        self.error = error
+        if timings is not None:
+            self.timings = timings
+        self.finished_at = timezone.now()
+        self.save()
+
+    def __str__(self):
+        return f"Recommendation job {self.id} ({self.status})"
+
+
 class SystemRequirementExtraction(models.Model):
     application = models.ForeignKey(Application, on_delete=models.CASCADE)
     source_url = models.URLField()
@@ -499,6 +832,13 @@ class AdminCorrectionLog(models.Model):
         blank=True,
         related_name="corrected_cpu_matches",
     )
+    corrected_gpu_match = models.ForeignKey(
+        GPUBenchmark,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="corrected_gpu_matches",
+    )
 
     reason = models.TextField(blank=True)
     corrected_by = models.ForeignKey(
@@ -506,6 +846,79 @@ class AdminCorrectionLog(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.apply_to_resolution_cache()
+
+    def apply_to_resolution_cache(self):
+        """Pins `original_text` to the corrected benchmark in the resolution cache."""
+        from .logic.resolution_cache import (
+            normalize_component_text,
+            forget_resolution,
+        )
+
+        corrected_id = {
+            "cpu": self.corrected_match_id,
+            "gpu": self.corrected_gpu_match_id,
+        }.get(self.component_type)
+        normalized_text = normalize_component_text(self.original_text or "")
+        if not corrected_id or not normalized_text or len(normalized_text) > 255:
+            return
+
+        BenchmarkResolution.objects.update_or_create(
+            component_type=self.component_type,
+            normalized_text=normalized_text,
+            defaults={
+                "benchmark_id": corrected_id,
+                "confidence": 1.0,
+                "method": "admin",
+                "benchmark_version": BenchmarkVersion.current(self.component_type),
+            },
+        )
+        forget_resolution(self.component_type, self.original_text)
+
+    def remove_from_resolution_cache(self):
+        """
+        Called once the correction is deleted: drops its pin, or hands it to the
+        most recent remaining correction of the same text.
+        """
+        from .logic.resolution_cache import (
+            normalize_component_text,
+            forget_resolution,
+        )
+
+        normalized_text = normalize_component_text(self.original_text or "")
+        if not normalized_text:
+            return
+        corrected_field = {"cpu": "corrected_match", "gpu": "corrected_gpu_match"}.get(
+            self.component_type
+        )
+        remaining = AdminCorrectionLog.objects.filter(
+            component_type=self.component_type
+        ).order_by("-created_at")
+        if corrected_field:
+            remaining = remaining.filter(**{f"{corrected_field}__isnull": False})
+        for correction in remaining:
+            if (
+                normalize_component_text(correction.original_text or "")
+                == normalized_text
+            ):
+                correction.apply_to_resolution_cache()
+                return
+
+        BenchmarkResolution.objects.filter(
+            component_type=self.component_type,
+            normalized_text=normalized_text,
+            method="admin",
+        ).delete()
+        forget_resolution(self.component_type, self.original_text)
+
+
+@receiver(post_delete, sender=AdminCorrectionLog)
+def remove_admin_correction_pin(sender, instance, **kwargs):
+    # A signal rather than delete(), so queryset and admin bulk deletes count too.
+    instance.remove_from_resolution_cache()
+
 
 # --- THIS IS THE NEW MODEL FOR LEVEL 2 FEEDBACK ---
 # It's a simplified version of what I proposed before, to fit your structure.
@@ -2,6 +2,7 @@ from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth.models import Group
 from django.core.mail import send_mail
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 from io import BytesIO
 from .tasks import enrich_user_preference_task
 from .models import *
@@ -15,19 +16,39 @@ import uuid
 class CPUBenchmarkSerializer(serializers.ModelSerializer):
     class Meta:
         model = CPUBenchmark
-        fields = "__all__"
+        exclude = ["embedding"]
+        read_only_fields = ["dataset"]
+        # Names are unique per dataset; new rows always go to the live one.
+        extra_kwargs = {
+            "cpu": {"validators": [UniqueValidator(CPUBenchmark.objects.all())]}
+        }
 
 
 class GPUBenchmarkSerializer(serializers.ModelSerializer):
     class Meta:
         model = GPUBenchmark
-        fields = "__all__"
+        exclude = ["embedding"]
+        read_only_fields = ["dataset"]
+        extra_kwargs = {
+            "gpu": {"validators": [UniqueValidator(GPUBenchmark.objects.all())]}
+        }
 
 
 class DiskBenchmarkSerializer(serializers.ModelSerializer):
     class Meta:
         model = DiskBenchmark
         fields = "__all__"
+        read_only_fields = ["dataset"]
+        extra_kwargs = {
+            "drive_name": {"validators": [UniqueValidator(DiskBenchmark.objects.all())]}
+        }
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = "__all__"
+        read_only_fields = [f.name for f in ImportJob._meta.fields]
 
 
 class ActivitySerializer(serializers.ModelSerializer):
@@ -195,6 +216,34 @@ class RecommendationSpecificationSerializer(serializers.ModelSerializer):
         }
 
 
+class RecommendationJobSerializer(serializers.ModelSerializer):
+    """
+    Status of a queued recommendation. `result` has the same shape as the
+    synchronous POST /recommend/ response once the job has succeeded.
+    """
+
+    session_id = serializers.CharField(source="preference.session_id", read_only=True)
+    result = RecommendationSpecificationSerializer(
+        source="specification", read_only=True
+    )
+
+    class Meta:
+        model = RecommendationJob
+        fields = [
+            "id",
+            "status",
+            "stage",
+            "session_id",
+            "result",
+            "error",
+            "timings",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
 class SuggestionSerializer(serializers.Serializer):
     """
     A simple serializer to format the data for the frontend's autocomplete.
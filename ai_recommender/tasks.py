@@ -2,29 +2,131 @@ from celery import shared_task
 from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
+import os
 import time
-import base64
-from io import BytesIO
-import pandas as pd
-from .models import Activity, UserPreference
+from .models import Activity, ImportJob, RecommendationJob, UserPreference
 from .logic.ai_discovery import discover_and_enrich_apps_for_activity
 
 
 @shared_task
-def process_benchmark_file(file_content_base64, file_name, item_type):
-    """A Celery task to process a base64-encoded benchmark spreadsheet file."""
-    from .logic.utils import process_benchmark_dataframe  # Local import
+def process_benchmark_file(staged_path, checksum, item_type, job_id=None):
+    """
+    A Celery task to import a benchmark file staged by the upload endpoint.
+    Progress, timings and any error are recorded on the ImportJob; the staged
+    file is deleted afterwards, whatever the outcome.
+    """
+    from .logic.benchmark_import import (
+        clear_checkpoint,
+        discard_staged_file,
+        file_checksum,
+        get_import_settings,
+        import_benchmark_file,
+    )
+
+    jobs = ImportJob.objects.filter(
+        item_type=item_type, checksum=checksum, status="pending"
+    )
+    # job_id is None for messages queued before jobs were passed by id.
+    if job_id is not None:
+        jobs = jobs.filter(pk=job_id)
+    job = jobs.order_by("created_at").first()
+    if job is None:
+        discard_staged_file(staged_path)
+        return f"No pending import job for '{os.path.basename(staged_path)}'."
+
+    job.start()
+    try:
+        if file_checksum(staged_path) != checksum:
+            raise ValueError("Staged file does not match its checksum.")
+        results = import_benchmark_file(
+            staged_path, item_type, on_progress=job.record_progress
+        )
+    except Exception as e:
+        clear_checkpoint(staged_path, item_type)
+        job.finish(error=str(e))
+        raise
+    finally:
+        discard_staged_file(staged_path)
+
+    job.finish(results)
+    if item_type in ("cpu", "gpu") and get_import_settings()["PROPAGATE_SCORES"]:
+        propagate_benchmark_scores.delay(item_type)
+    return f"Import job {job.id} for '{job.file_name}': Created {job.created}, Updated {job.updated}, Skipped {job.skipped} ({job.rows_per_second} rows/s)."
+
+
+@shared_task
+def propagate_benchmark_scores(component_type):
+    """
+    Re-resolves every stored CPU or GPU score (requirements and vendor
+    components) after the benchmarks changed. See logic/score_propagation.py.
+    """
+    from .logic.score_propagation import propagate_scores
+
+    return propagate_scores(component_type)
+
+
+@shared_task
+def resolve_pending_benchmark_scores(model_label=None):
+    """
+    Resolves the CPU/GPU scores of requirement and vendor component rows saved
+    since the last run, in batches (see logic/score_resolution.py). Queued by
+    their save() after commit, and swept periodically by Celery beat.
+    """
+    from django.apps import apps
+    from .logic.score_resolution import (
+        resolve_all_pending_scores,
+        resolve_pending_scores,
+    )
+
+    if model_label is None:
+        return resolve_all_pending_scores()
+    return resolve_pending_scores(apps.get_model(model_label))
 
+
+@shared_task
+def run_recommendation_job(job_id):
+    """
+    Runs the AI discovery + recommendation pipeline for a RecommendationJob
+    queued by POST /recommend/, recording each stage and the outcome on the job.
+    """
+    from .logic.recommendation_pipeline import (
+        NO_RECOMMENDATION_DETAIL,
+        run_recommendation_pipeline,
+    )
+
+    job = (
+        RecommendationJob.objects.select_related("preference")
+        .filter(pk=job_id, status="pending")
+        .first()
+    )
+    if job is None:
+        return f"No pending recommendation job {job_id}."
+
+    job.start()
     try:
-        # ... (Your file processing logic is excellent and does not need changes)
-        file_content = base64.b64decode(file_content_base64)
-        df = pd.read_excel(
-            BytesIO(file_content)
-        )  # pd.read_excel is often robust enough for xlsx, xls, ods
-        results = process_benchmark_dataframe(df, item_type)
-        return f"Processed '{file_name}': Created {results['created']}, Updated {results['updated']}."
+        final_spec, timings = run_recommendation_pipeline(
+            job.preference, on_stage=job.set_stage
+        )
     except Exception as e:
-        return f"An error occurred during processing: {str(e)}"
+        job.finish(error=str(e))
+        raise
+
+    if final_spec is None:
+        job.finish(error=NO_RECOMMENDATION_DETAIL, timings=timings)
+    else:
+        job.finish(final_spec, timings=timings)
+    return (
+        f"Recommendation job {job.id}: {job.status} in {timings.get('total', 0):.1f}s."
+    )
+
+
+@shared_task
+def fail_stale_recommendation_jobs_task():
+    """Marks recommendation jobs whose worker died or never got the task as failed."""
+    from .logic.recommendation_pipeline import fail_stale_recommendation_jobs
+
+    count = fail_stale_recommendation_jobs()
+    return f"Marked {count} stale recommendation job(s) as failed."
 
 
 # +++ REFACTORED to use the new "one-shot" enrichment logic +++
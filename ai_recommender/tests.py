@@ -1,3 +1,648 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+import numpy as np
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from vendor.models import Processor
+from .logic.benchmark_import import (
+    _non_empty_rows,
+    clean_benchmark_dataframe,
+    import_benchmark_file,
+    load_checkpoint,
+    parse_cpu_names,
+    read_benchmark_chunks,
+)
+from .logic import batching, lexical_index, resolution_cache, score_resolution, warmup
+from .logic.compressed_index import CompressedEmbeddingIndex
+from .logic.embedding_index import EmbeddingIndex, clear_embedding_indexes
+from .logic.embedding_refresh import refresh_after_import
+from .logic.score_resolution import (
+    prepare_bulk_score_resolution,
+    queue_score_resolution,
+    resolve_pending_scores,
+)
+from .logic.benchmark_datasets import activate_dataset, rollback_dataset
+from .logic.benchmark_import import fail_stale_import_jobs
+from .tasks import run_recommendation_job
+from .logic.recommendation_pipeline import run_recommendation_pipeline
+from .logic.utils import find_best_benchmark_objects
+from .models import (
+    Activity,
+    AdminCorrectionLog,
+    BenchmarkDataset,
+    BenchmarkResolution,
+    CPUBenchmark,
+    BenchmarkVersion,
+    ImportJob,
+    RecommendationJob,
+    RecommendationSpecification,
+    UserPreference,
+)
 
-# Create your tests here.
+
+class CleanBenchmarkDataFrameTests(SimpleTestCase):
+    def test_cpu_names_are_split_into_model_and_clock_speed(self):
+        parsed = parse_cpu_names(
+            pd.Series(["Intel Core i5-8400 @ 2.80GHz", "AMD Ryzen 5 3600"])
+        )
+        self.assertEqual(
+            list(parsed["model_name"]), ["Intel Core i5-8400", "AMD Ryzen 5 3600"]
+        )
+        self.assertEqual(parsed["clock_speed_ghz"].iloc[0], 2.8)
+        self.assertTrue(pd.isna(parsed["clock_speed_ghz"].iloc[1]))
+
+    def test_cpu_sheet_with_every_row_skipped(self):
+        df = pd.DataFrame({"CPU Name": ["Intel Core i5 @ 3.00GHz"], "CPU Mark": ["NA"]})
+        rows, skipped = clean_benchmark_dataframe(df, "cpu")
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(skipped, 1)
+
+    def test_blank_cpu_sheet(self):
+        df = pd.DataFrame({"CPU Name": [None, None], "CPU Mark": [None, None]})
+        rows, skipped = clean_benchmark_dataframe(df, "cpu")
+        self.assertEqual(len(rows), 0)
+        self.assertEqual(skipped, 2)
+
+
+class ReadBenchmarkChunksTests(SimpleTestCase):
+    def test_empty_rows_are_dropped(self):
+        rows = [("a", 1), (None, None), ("", "  "), ("b", 2)]
+        self.assertEqual(list(_non_empty_rows(rows)), [("a", 1), ("b", 2)])
+
+    def test_csv_resume_skips_parsed_rows_not_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cpus.csv")
+            with open(path, "w") as f:
+                f.write('CPU Name,CPU Mark\n"A\nline two",1\n\nB,2\nC,3\nD,4\n')
+            chunks = list(read_benchmark_chunks(path, chunk_size=2, start_row=3))
+        self.assertEqual([list(df["CPU Name"]) for df in chunks], [["D"]])
+
+    def test_long_run_of_empty_rows_ends_the_sheet(self):
+        rows = [("a", 1)] + [(None, None)] * 3 + [("b", 2)]
+        self.assertEqual(list(_non_empty_rows(rows, empty_row_limit=3)), [("a", 1)])
+
+
+class CompressedEmbeddingIndexTests(SimpleTestCase):
+    def test_clamped_index_loads_under_the_requested_dims(self):
+        matrix = np.random.default_rng(0).normal(size=(10, 16)).astype(np.float32)
+        index = EmbeddingIndex(np.arange(10), np.arange(10), matrix, version=3)
+        compressed = CompressedEmbeddingIndex.fit(index, dims=128)
+        self.assertEqual(compressed.dims, 9)
+
+        with tempfile.TemporaryDirectory() as index_dir:
+            with override_settings(EMBEDDING_INDEX_DIR=index_dir):
+                compressed.save("cpu", 128)
+                loaded = CompressedEmbeddingIndex.load("cpu", 3, 128)
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.dims, 9)
+
+
+class BenchmarkTestCase(TestCase):
+    """Clears the per-process benchmark caches, which outlive each test's rollback."""
+
+    def setUp(self):
+        clear_embedding_indexes()
+        lexical_index._indexes.clear()
+        resolution_cache._lru.clear()
+        # Drop the empty datasets the migrations create, so each test starts bare.
+        BenchmarkDataset.objects.all().delete()
+
+    def make_dataset(self, component_type="cpu", status="active"):
+        return BenchmarkDataset.objects.create(
+            component_type=component_type,
+            number=BenchmarkDataset.objects.count() + 1,
+            status=status,
+            activated_at=timezone.now() if status == "active" else None,
+        )
+
+    def add_cpu(self, dataset, cpu, score):
+        return CPUBenchmark.all_versions.create(dataset=dataset, cpu=cpu, score=score)
+
+
+class BenchmarkMatchingTests(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        dataset = self.make_dataset()
+        self.celeron = self.add_cpu(dataset, "Intel Celeron G3900 @ 2.80GHz", 1500)
+        self.i7 = self.add_cpu(dataset, "Intel Core i7-9700K @ 3.60GHz", 14000)
+        self.xeon = self.add_cpu(dataset, "Intel Xeon Gold 6348 @ 2.60GHz", 45000)
+
+    def test_model_number_resolves_by_token(self):
+        [match] = find_best_benchmark_objects(["Core i7 9700K"], "cpu")
+        self.assertEqual(match, self.i7)
+        self.assertEqual(
+            BenchmarkResolution.objects.get(normalized_text="core i7 9700k").method,
+            "token",
+        )
+
+    def test_name_without_model_number_falls_back_to_trigrams(self):
+        [match] = find_best_benchmark_objects(["Intel Xeon Gold 6348"], "cpu")
+        self.assertEqual(match, self.xeon)
+        self.assertEqual(
+            BenchmarkResolution.objects.get(
+                normalized_text="intel xeon gold 6348"
+            ).method,
+            "lexical",
+        )
+
+    def test_speed_only_requirement_takes_the_weakest_cpu_and_is_not_cached(self):
+        [match] = find_best_benchmark_objects(["2.4 GHz dual core"], "cpu")
+        self.assertEqual(match, self.celeron)
+        self.assertFalse(
+            BenchmarkResolution.objects.filter(
+                normalized_text="2.4 ghz dual core"
+            ).exists()
+        )
+
+    def test_repeat_lookup_uses_the_resolution_cache(self):
+        find_best_benchmark_objects(["Core i7 9700K"], "cpu")
+        with self.assertNumQueries(2):  # Version stamp and rows; the LRU has the rest
+            [match] = find_best_benchmark_objects(["Core i7 9700K"], "cpu")
+        self.assertEqual(match.pk, self.i7.pk)
+
+
+class AdminCorrectionTests(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        dataset = self.make_dataset()
+        self.i7 = self.add_cpu(dataset, "Intel Core i7-9700K @ 3.60GHz", 14000)
+        self.i5 = self.add_cpu(dataset, "Intel Core i5-8400 @ 2.80GHz", 9000)
+
+    def test_correction_overrides_the_matcher_until_deleted(self):
+        correction = AdminCorrectionLog.objects.create(
+            component_type="cpu", original_text="Core i7 9700K", corrected_match=self.i5
+        )
+        self.assertEqual(
+            find_best_benchmark_objects(["core i7  9700k"], "cpu"), [self.i5]
+        )
+
+        correction.delete()
+        self.assertFalse(BenchmarkResolution.objects.filter(method="admin").exists())
+        self.assertEqual(
+            find_best_benchmark_objects(["Core i7 9700K"], "cpu"), [self.i7]
+        )
+
+
+class BenchmarkDatasetTests(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = self.make_dataset()
+        self.old_i7 = self.add_cpu(self.old, "Intel Core i7-9700K @ 3.60GHz", 14000)
+        self.old_only = self.add_cpu(self.old, "Intel Pentium 4 @ 3.00GHz", 300)
+        self.new = self.make_dataset(status="building")
+        self.new_i7 = self.add_cpu(self.new, "Intel Core i7-9700K @ 3.60GHz", 14500)
+
+    def test_objects_only_returns_the_active_dataset(self):
+        self.assertEqual(CPUBenchmark.objects.count(), 2)
+        self.assertEqual(CPUBenchmark.all_versions.count(), 3)
+        activate_dataset(self.new)
+        self.assertEqual(list(CPUBenchmark.objects.all()), [self.new_i7])
+
+    def test_activation_follows_references_by_name(self):
+        correction = AdminCorrectionLog.objects.create(
+            component_type="cpu",
+            original_text="i7 9700K gaming",
+            original_match=self.old_only,
+            corrected_match=self.old_i7,
+        )
+        activate_dataset(self.new)
+        correction.refresh_from_db()
+        self.assertEqual(correction.corrected_match, self.new_i7)
+        # No same-name row in the new dataset: it keeps the old one
+        self.assertEqual(correction.original_match, self.old_only)
+        self.assertEqual(
+            BenchmarkResolution.objects.get(method="admin").benchmark_id,
+            self.new_i7.pk,
+        )
+
+        self.assertEqual(rollback_dataset("cpu"), self.old)
+        correction.refresh_from_db()
+        self.assertEqual(correction.corrected_match, self.old_i7)
+
+    @override_settings(BENCHMARK_DATASETS={"KEEP_PREVIOUS": 0})
+    def test_prune_keeps_referenced_rows_only(self):
+        AdminCorrectionLog.objects.create(
+            component_type="cpu",
+            original_text="Pentium 4 HT",
+            original_match=self.old_only,
+        )
+        activate_dataset(self.new)
+        self.old.refresh_from_db()
+        self.assertEqual(self.old.status, "retired")
+        self.assertEqual(
+            list(CPUBenchmark.all_versions.filter(dataset=self.old)), [self.old_only]
+        )
+
+    @override_settings(BENCHMARK_DATASETS={"KEEP_PREVIOUS": 0})
+    def test_prune_deletes_unreferenced_datasets(self):
+        activate_dataset(self.new)
+        self.assertFalse(BenchmarkDataset.objects.filter(pk=self.old.pk).exists())
+
+    def test_orphaned_admin_pin_falls_back_to_the_matcher(self):
+        AdminCorrectionLog.objects.create(
+            component_type="cpu",
+            original_text="Core i7 9700K",
+            corrected_match=self.old_only,
+        )
+        activate_dataset(self.new)
+        self.assertEqual(
+            find_best_benchmark_objects(["Core i7 9700K"], "cpu"), [self.new_i7]
+        )
+
+
+class BenchmarkUploadTests(TestCase):
+    def setUp(self):
+        staging = tempfile.TemporaryDirectory()
+        self.addCleanup(staging.cleanup)
+        self.staging_dir = staging.name
+        self.settings_override = override_settings(
+            BENCHMARK_IMPORT={"STAGING_DIR": self.staging_dir}
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                username="admin", password="x", phone_number="1"
+            )
+        )
+
+    def upload(self):
+        return self.client.post(
+            reverse("diskbenchmark-upload"),
+            {"file": SimpleUploadedFile("disks.csv", b"Drive Name,Disk Rating\nX,1\n")},
+            format="multipart",
+        )
+
+    def test_identical_upload_is_skipped_while_the_first_is_pending(self):
+        first = self.upload()
+        self.assertEqual(first.status_code, 202)
+        second = self.upload()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data["job_id"], first.data["job_id"])
+        self.assertEqual(
+            os.listdir(self.staging_dir),
+            [f"disk-{ImportJob.objects.get().checksum}-job{first.data['job_id']}.csv"],
+        )
+
+    def test_stale_job_no_longer_blocks_a_reupload(self):
+        first = self.upload()
+        ImportJob.objects.update(created_at=timezone.now() - timedelta(hours=2))
+        second = self.upload()
+        self.assertEqual(second.status_code, 202)
+        self.assertEqual(
+            ImportJob.objects.get(pk=first.data["job_id"]).status, "failed"
+        )
+        # Each job imports its own copy of the file
+        self.assertEqual(len(os.listdir(self.staging_dir)), 2)
+
+
+class StaleImportJobTests(TestCase):
+    def test_running_jobs_are_judged_by_their_last_progress(self):
+        long_ago = timezone.now() - timedelta(hours=2)
+        busy = ImportJob.objects.create(
+            item_type="cpu",
+            file_name="a.csv",
+            checksum="a",
+            status="running",
+            started_at=long_ago,
+            heartbeat_at=timezone.now(),
+        )
+        silent = ImportJob.objects.create(
+            item_type="cpu",
+            file_name="b.csv",
+            checksum="b",
+            status="running",
+            started_at=long_ago,
+            heartbeat_at=long_ago,
+        )
+        self.assertEqual(fail_stale_import_jobs("cpu"), 1)
+        busy.refresh_from_db()
+        silent.refresh_from_db()
+        self.assertEqual((busy.status, silent.status), ("running", "failed"))
+
+
+class FakeEncoder:
+    def encode(self, texts, **kwargs):
+        return np.random.default_rng(len(texts)).normal(size=(len(texts), 16))
+
+
+class EmbedStageTests(BenchmarkTestCase):
+    def test_embed_stage_rebuilds_the_compressed_index(self):
+        dataset = self.make_dataset()
+        for i in range(6):
+            self.add_cpu(dataset, f"Intel Core i5-{8400 + i} @ 2.80GHz", 9000 + i)
+
+        with tempfile.TemporaryDirectory() as index_dir, override_settings(
+            EMBEDDING_INDEX_DIR=index_dir,
+            BENCHMARK_ANN={"ENABLED": False},
+            BENCHMARK_EMBEDDING_COMPRESSION={"ENABLED": True, "DIMS": 4},
+        ), mock.patch(
+            "ai_recommender.logic.utils.get_sentence_model", return_value=FakeEncoder()
+        ):
+            refresh_after_import("cpu")
+            compressed = CompressedEmbeddingIndex.load(
+                "cpu", BenchmarkVersion.current("cpu"), 4
+            )
+        self.assertIsNotNone(compressed)
+        self.assertEqual(len(compressed), 6)
+
+
+class ScoreResolutionTests(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.i7 = self.add_cpu(self.make_dataset(), "Intel Core i7-9700K", 14000)
+        self.i9 = self.add_cpu(
+            BenchmarkDataset.objects.get(), "Intel Core i9-9900K", 18000
+        )
+        delay = mock.patch(
+            "ai_recommender.tasks.resolve_pending_benchmark_scores.apply_async"
+        )
+        self.apply_async = delay.start()
+        self.addCleanup(delay.stop)
+
+    def test_saves_are_resolved_by_the_background_run(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            processor = Processor.objects.create(data_received="Core i7 9700K")
+        self.assertIsNone(processor.score)
+        self.assertEqual(self.apply_async.call_count, 1)
+
+        resolve_pending_scores(Processor)
+        processor.refresh_from_db()
+        self.assertEqual(processor.score, 14000)
+        self.assertIsNotNone(processor.score_resolved_at)
+
+    def test_a_burst_of_saves_queues_one_run(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for name in ("Core i7 9700K", "Core i9 9900K", "Core i7 9700"):
+                Processor.objects.create(data_received=name)
+        self.assertEqual(self.apply_async.call_count, 1)
+
+        resolve_pending_scores(Processor)  # A started run clears the marker
+        with self.captureOnCommitCallbacks(execute=True):
+            Processor.objects.create(data_received="Core i9 9900KF")
+        self.assertEqual(self.apply_async.call_count, 2)
+
+    def test_bulk_inserted_rows_are_queued(self):
+        processors = [Processor(data_received="Core i9 9900K")]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(prepare_bulk_score_resolution(processors))
+            Processor.objects.bulk_create(processors)
+            queue_score_resolution(Processor)
+        self.assertEqual(self.apply_async.call_count, 1)
+        resolve_pending_scores(Processor)
+        self.assertEqual(Processor.objects.get().score, 18000)
+
+    def test_row_edited_during_a_batch_is_left_for_the_next_run(self):
+        processor = Processor.objects.create(data_received="Core i7 9700K")
+        fill = score_resolution.fill_missing_scores
+
+        def edit_while_matching(batch):
+            filled = fill(batch)
+            Processor.objects.filter(pk=processor.pk).update(
+                data_received="Core i9 9900K",
+                modified_at=timezone.now() + timedelta(seconds=1),
+            )
+            return filled
+
+        with mock.patch.object(
+            score_resolution, "fill_missing_scores", edit_while_matching
+        ):
+            self.assertEqual(resolve_pending_scores(Processor)["rows"], 0)
+        processor.refresh_from_db()
+        self.assertIsNone(processor.score)
+
+        resolve_pending_scores(Processor)
+        processor.refresh_from_db()
+        self.assertEqual(processor.score, 18000)
+
+
+class RecommendationJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.spec = RecommendationSpecification.objects.create(type="recommended")
+        pipeline = mock.patch(
+            "ai_recommender.views.run_recommendation_pipeline",
+            return_value=(self.spec, {"total": 1.5}),
+        )
+        self.pipeline = pipeline.start()
+        self.addCleanup(pipeline.stop)
+        delay = mock.patch("ai_recommender.views.run_recommendation_job.delay")
+        self.delay = delay.start()
+        self.addCleanup(delay.stop)
+
+    def recommend(self, path="", **headers):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("generate-recommendation") + path,
+                {"primary_activity": "Video Editing"},
+                format="json",
+                headers=headers,
+            )
+
+    def make_job(self, **fields):
+        response = self.recommend("?async=1")
+        job = RecommendationJob.objects.get(pk=response.data["id"])
+        RecommendationJob.objects.filter(pk=job.pk).update(**fields)
+        job.refresh_from_db()
+        return job
+
+    def events(self, job):
+        response = self.client.get(reverse("recommendation-job-events", args=[job.id]))
+        return b"".join(response.streaming_content).decode()
+
+    def test_recommendation_is_returned_inline_by_default(self):
+        response = self.recommend()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["timings"], {"total": 1.5})
+        self.assertFalse(RecommendationJob.objects.exists())
+        self.delay.assert_not_called()
+
+    def test_clients_opt_in_to_a_job(self):
+        for path, headers in (("?async=1", {}), ("", {"Prefer": "respond-async"})):
+            response = self.recommend(path, **headers)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response["Preference-Applied"], "respond-async")
+            self.assertEqual(response.data["status"], "pending")
+            self.delay.assert_called_with(str(response.data["id"]))
+        self.pipeline.assert_not_called()
+
+    def test_job_fails_when_it_cannot_be_queued(self):
+        self.delay.side_effect = ConnectionError("broker down")
+        response = self.recommend("?async=1")
+        job = RecommendationJob.objects.get(pk=response.data["id"])
+        self.assertEqual(job.status, "failed")
+        self.assertIn("broker down", job.error)
+
+    def test_worker_records_the_result_and_timings(self):
+        job = self.make_job()
+        with mock.patch(
+            "ai_recommender.logic.recommendation_pipeline.run_recommendation_pipeline",
+            return_value=(self.spec, {"total": 2.0}),
+        ):
+            run_recommendation_job(str(job.id))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.specification, self.spec)
+        self.assertEqual(job.timings, {"total": 2.0})
+
+    def test_stale_jobs_are_failed_when_polled(self):
+        old = timezone.now() - timedelta(hours=1)
+        pending = self.make_job(created_at=old)
+        running = self.make_job(status="running", started_at=old)
+        fresh = self.make_job(status="running", started_at=timezone.now())
+        for job in (pending, running):
+            response = self.client.get(reverse("recommendation-job", args=[job.id]))
+            self.assertEqual(response.data["status"], "failed")
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, "running")
+
+    def test_event_stream_ends_with_the_finished_job(self):
+        job = self.make_job()
+        job.finish(self.spec, timings={"total": 1.0})
+        body = self.events(job)
+        self.assertIn("event: done", body)
+        self.assertNotIn("event: status", body)
+
+    @override_settings(RECOMMENDATION_JOBS={"STREAM_TIMEOUT": 0})
+    def test_event_stream_reports_progress_until_it_times_out(self):
+        job = self.make_job(status="running", stage="discovery")
+        body = self.events(job)
+        self.assertIn('"stage": "discovery"', body)
+        self.assertNotIn("event: done", body)
+
+
+class RecommendationPipelineTests(TestCase):
+    def setUp(self):
+        self.preference = UserPreference.objects.create()
+        self.preference.activities.add(Activity.objects.create(name="Gaming"))
+        self.spec = RecommendationSpecification(type="recommended")
+        for name, result in (
+            ("_discover_applications", []),
+            ("generate_recommendation", self.spec),
+        ):
+            patcher = mock.patch(
+                f"ai_recommender.logic.recommendation_pipeline.{name}",
+                return_value=result,
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_pipeline(self):
+        stages = []
+        spec, timings = run_recommendation_pipeline(
+            self.preference, on_stage=stages.append
+        )
+        self.assertIs(spec, self.spec)
+        self.assertEqual(set(timings), {"discovery", "recommendation", "total"})
+        return stages
+
+    def test_parallel_stages_are_timed(self):
+        self.assertEqual(self.run_pipeline()[0], "discovery")
+
+    @override_settings(RECOMMENDATION_JOBS={"PARALLEL_STAGES": False})
+    def test_sequential_stages_are_timed(self):
+        self.assertEqual(self.run_pipeline(), ["discovery", "recommendation"])
+
+    def test_preference_without_activities_is_skipped(self):
+        self.preference.activities.clear()
+        self.assertEqual(run_recommendation_pipeline(self.preference), (None, {}))
+
+
+class ImportCheckpointTests(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dataset = self.make_dataset()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "cpus.csv")
+        with open(self.path, "w") as f:
+            f.write("CPU Name,CPU Mark\n")
+            f.writelines(f"Core i{n} 9700K,{n}000\n" for n in range(1, 6))
+        settings_override = override_settings(
+            BENCHMARK_IMPORT={"CHECKPOINT_DIR": os.path.join(tmp.name, "checkpoints")}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_interrupted_import_resumes_after_the_last_committed_chunk(self):
+        def interrupt(progress):
+            if progress["rows"] == 4:
+                raise RuntimeError("worker killed")
+
+        with self.assertRaises(RuntimeError):
+            import_benchmark_file(
+                self.path, "cpu", chunk_size=2, on_progress=interrupt, embed=False
+            )
+        self.assertEqual(load_checkpoint(self.path, "cpu")["rows"], 4)
+        self.assertEqual(CPUBenchmark.objects.count(), 4)
+
+        seen = []
+        summary = import_benchmark_file(
+            self.path,
+            "cpu",
+            chunk_size=2,
+            resume=True,
+            on_progress=seen.append,
+            embed=False,
+        )
+        self.assertEqual([p["rows"] for p in seen], [5])
+        self.assertEqual((summary["rows"], summary["created"]), (5, 5))
+        self.assertEqual(CPUBenchmark.objects.count(), 5)
+        self.assertIsNone(load_checkpoint(self.path, "cpu"))
+
+
+class WarmupTests(SimpleTestCase):
+    def warm_indexes(self, client):
+        with mock.patch(
+            "ai_recommender.logic.embedding_service.get_embedding_client",
+            return_value=client,
+        ), mock.patch(
+            "ai_recommender.logic.embedding_index.get_embedding_index"
+        ) as embedding, mock.patch(
+            "ai_recommender.logic.lexical_index.get_lexical_index"
+        ) as lexical:
+            warmup._warm_indexes()
+        self.assertEqual(lexical.call_count, 2)
+        return embedding.call_count
+
+    def test_indexes_are_built_in_process_without_the_service(self):
+        self.assertEqual(self.warm_indexes(None), 2)
+
+    def test_embedding_indexes_are_left_to_the_service(self):
+        self.assertEqual(self.warm_indexes(object()), 0)
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def test_concurrent_calls_share_a_batch(self):
+        batcher = batching.MicroBatcher(
+            lambda items: [i * 2 for i in items], max_wait_ms=50
+        )
+        self.addCleanup(batcher.close)
+        futures = [batcher.submit([1, 2]), batcher.submit([3])]
+        self.assertEqual([f.result(5) for f in futures], [[2, 4], [6]])
+        self.assertEqual(batcher.stats()["batches"], 1)
+
+    def test_fork_hook_restarts_only_live_batchers(self):
+        live = batching.MicroBatcher(lambda items: items)
+        self.addCleanup(live.close)
+        closed = batching.MicroBatcher(lambda items: items)
+        closed.close()
+        self.assertIn(live, batching._live_batchers)
+        self.assertNotIn(closed, batching._live_batchers)
+
+        thread, old_queue = live._thread, live._queue
+        batching._restart_batchers_after_fork()
+        # Outside a real fork the old thread is still alive; stop it.
+        old_queue.put(None)
+        self.assertIsNot(live._thread, thread)
+        self.assertEqual(live([1, 2], timeout=5), [1, 2])
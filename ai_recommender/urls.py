@@ -25,6 +25,16 @@ urlpatterns = [
         UserHistoryView.as_view(),
         name="user-recommendation-history",
     ),
+    path(
+        "recommend/jobs/<uuid:job_id>/",
+        RecommendationJobView.as_view(),
+        name="recommendation-job",
+    ),
+    path(
+        "recommend/jobs/<uuid:job_id>/events/",
+        recommendation_job_events,
+        name="recommendation-job-events",
+    ),
     path(
         "recommend/latest/",
         LatestRecommendationView.as_view(),
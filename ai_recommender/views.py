@@ -1,5 +1,10 @@
 # ai_recommender/views.py
+import json
+import time
+from django.db import connection, transaction
 from django.db.models import Case, When, F, FloatField, Value
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
 from django.db.models.functions import Coalesce
 from decimal import Decimal, InvalidOperation
 from rest_framework import status, viewsets, generics
@@ -10,9 +15,17 @@ from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from .models import *
 from .serializers import *
-from .logic.recommendation_engine import generate_recommendation
-from .logic.ai_discovery import discover_and_enrich_apps_for_activity
-from .mixins import AsynchronousBenchmarkUploadMixin
+from .logic.recommendation_pipeline import (
+    NO_ACTIVITY_DETAIL,
+    NO_RECOMMENDATION_DETAIL,
+    fail_stale_recommendation_jobs,
+    get_recommendation_job_settings,
+    run_recommendation_pipeline,
+)
+from .tasks import run_recommendation_job
+from .mixins import AsynchronousBenchmarkUploadMixin, BenchmarkVersionMixin
+from .logic.warmup import warmup_status
+from .logic.utils import encoder_stats
 from vendor.models import Product
 from vendor.serializers import ProductRecommendationSerializer
 from .logic.matching_engine import find_matching_products
@@ -23,9 +36,12 @@ from .logic.matching_engine import find_matching_products
 # ===================================================================
 
 
-class CPUBenchmarkViewSet(AsynchronousBenchmarkUploadMixin, viewsets.ModelViewSet):
-    queryset = CPUBenchmark.objects.all().order_by("-score")
+class CPUBenchmarkViewSet(
+    BenchmarkVersionMixin, AsynchronousBenchmarkUploadMixin, viewsets.ModelViewSet
+):
+    queryset = CPUBenchmark.objects.defer("embedding").order_by("-score")
     serializer_class = CPUBenchmarkSerializer
+    benchmark_type = "cpu"
     permission_classes = [IsAuthenticated]  # Or IsAdminUser for more security
 
     @action(detail=False, methods=["post"], url_path="upload")
@@ -33,9 +49,12 @@ class CPUBenchmarkViewSet(AsynchronousBenchmarkUploadMixin, viewsets.ModelViewSe
         return self._handle_upload(request, item_type="cpu")
 
 
-class GPUBenchmarkViewSet(AsynchronousBenchmarkUploadMixin, viewsets.ModelViewSet):
-    queryset = GPUBenchmark.objects.all().order_by("-score")
+class GPUBenchmarkViewSet(
+    BenchmarkVersionMixin, AsynchronousBenchmarkUploadMixin, viewsets.ModelViewSet
+):
+    queryset = GPUBenchmark.objects.defer("embedding").order_by("-score")
     serializer_class = GPUBenchmarkSerializer
+    benchmark_type = "gpu"
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=["post"], url_path="upload")
@@ -43,9 +62,12 @@ class GPUBenchmarkViewSet(AsynchronousBenchmarkUploadMixin, viewsets.ModelViewSe
         return self._handle_upload(request, item_type="gpu")
 
 
-class DiskBenchmarkViewSet(AsynchronousBenchmarkUploadMixin, viewsets.ModelViewSet):
+class DiskBenchmarkViewSet(
+    BenchmarkVersionMixin, AsynchronousBenchmarkUploadMixin, viewsets.ModelViewSet
+):
     queryset = DiskBenchmark.objects.all().order_by("-score")
     serializer_class = DiskBenchmarkSerializer
+    benchmark_type = "disk"
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=["post"], url_path="upload")
@@ -81,13 +103,37 @@ class ApplicationSystemRequirementViewSet(viewsets.ModelViewSet):
 # ===================================================================
 
 
+def _wants_recommendation_job(request):
+    """Job mode is opt-in per request unless RECOMMENDATION_JOBS["ASYNC"] is on."""
+    if get_recommendation_job_settings()["ASYNC"]:
+        return True
+    if request.query_params.get("async", "").lower() in ("1", "true"):
+        return True
+    prefer = request.headers.get("Prefer", "")
+    return "respond-async" in [p.strip().lower() for p in prefer.split(",")]
+
+
+def _queue_recommendation_job(job):
+    try:
+        run_recommendation_job.delay(str(job.id))
+    except Exception as e:
+        # Don't leave the client polling a job no worker will ever see.
+        print(f"Could not queue recommendation job {job.id}: {e}")
+        job.finish(error=f"Could not queue the recommendation job: {e}")
+
+
 class RecommendView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request, *args, **kwargs):
         """
-        This single endpoint now orchestrates the entire recommendation process.
-        It ALWAYS runs the AI discovery to ensure every recommendation is personalized.
+        Saves the user's preference and runs the AI discovery and recommendation
+        inside the request, returning the recommendation itself.
+
+        With `Prefer: respond-async`, `?async=1` or RECOMMENDATION_JOBS["ASYNC"],
+        it queues a RecommendationJob for Celery instead (see
+        run_recommendation_job) and returns 202 with the job and the URLs to
+        poll it or stream its progress.
         """
         # Step 1: Validate input and create the UserPreference object.
         serializer = UserPreferenceSerializer(
@@ -99,60 +145,109 @@ class RecommendView(APIView):
         # The .save() method creates the preference and links the selected activity/ies.
         preference = serializer.save()
 
-        # --- Step 2: Perform PERSONALIZED AI Enrichment ---
-        # We now ALWAYS run the AI discovery for every new preference.
-        # This ensures the user's 'considerations' are always used.
-
-        # Get the primary activity to guide the AI and the user's specific considerations.
-        primary_activity = preference.activities.first()
-        user_considerations = preference.considerations
-
-        if not primary_activity:
+        if not preference.activities.exists():
             return Response(
-                {
-                    "detail": "No primary activity was provided to generate a recommendation."
-                },
+                {"detail": NO_ACTIVITY_DETAIL},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        print(f"--- Starting Synchronous Enrichment for Preference {preference.id} ---")
-        print(
-            f"-> Running AI discovery for '{primary_activity.name}' with considerations: '{user_considerations}'"
-        )
+        if not _wants_recommendation_job(request):
+            final_spec, timings = run_recommendation_pipeline(preference)
+            if not final_spec:
+                return Response(
+                    {"detail": NO_RECOMMENDATION_DETAIL, "timings": timings},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            result_serializer = RecommendationSpecificationSerializer(final_spec)
+            return Response(
+                {**result_serializer.data, "timings": timings},
+                status=status.HTTP_200_OK,
+            )
 
-        # This function discovers and saves applications to the database if they don't exist.
-        newly_processed_apps = discover_and_enrich_apps_for_activity(
-            primary_activity, user_considerations
+        # Step 2: Queue the job; the worker picks it up once it is committed.
+        job = RecommendationJob.objects.create(
+            preference=preference,
+            user=request.user if request.user.is_authenticated else None,
+        )
+        transaction.on_commit(lambda: _queue_recommendation_job(job))
+
+        status_url = reverse("recommendation-job", args=[job.id])
+        data = {
+            **RecommendationJobSerializer(job).data,
+            "status_url": request.build_absolute_uri(status_url),
+            "events_url": request.build_absolute_uri(
+                reverse("recommendation-job-events", args=[job.id])
+            ),
+        }
+        return Response(
+            data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": status_url, "Preference-Applied": "respond-async"},
         )
 
-        if newly_processed_apps:
-            # We link the personalized list of apps directly to THIS user's preference.
-            preference.applications.add(*newly_processed_apps)
-        else:
-            print(
-                f"-> AI discovery failed or returned no apps for '{primary_activity.name}'."
-            )
-
-        print(f"--- Enrichment complete for Preference {preference.id} ---")
 
-        # --- Step 3: Generate the final recommendation ---
-        # This function will now find the UserPreference with its newly linked, personalized apps.
-        user = request.user if request.user.is_authenticated else None
-        session_id = preference.session_id if not user else None
+class RecommendationJobView(APIView):
+    """Status of a queued recommendation, with the result once it has succeeded."""
 
-        final_spec = generate_recommendation(user=user, session_id=session_id)
+    permission_classes = [AllowAny]
 
-        if not final_spec:
+    def get(self, request, job_id, *args, **kwargs):
+        fail_stale_recommendation_jobs(job_id)
+        job = (
+            RecommendationJob.objects.select_related("preference", "specification")
+            .filter(pk=job_id)
+            .first()
+        )
+        if job is None:
             return Response(
-                {
-                    "detail": "Could not generate a recommendation. The AI may have been unable to find requirements for the specified activities."
-                },
+                {"detail": "Recommendation job not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        return Response(RecommendationJobSerializer(job).data)
 
-        # --- Step 4: Serialize and return the result ---
-        result_serializer = RecommendationSpecificationSerializer(final_spec)
-        return Response(result_serializer.data, status=status.HTTP_200_OK)
+
+def recommendation_job_events(request, job_id):
+    """
+    Server-sent events for a recommendation job: a "status" event whenever its
+    status or stage changes and a final "done" event with the full job. The
+    stream only lives for RECOMMENDATION_JOBS["STREAM_TIMEOUT"] seconds;
+    EventSource clients reconnect automatically and get the current state.
+    A plain Django view, since DRF would refuse the text/event-stream Accept header.
+
+    The DB connection is closed before each sleep, so a waiting stream holds a
+    gunicorn thread (see gunicorn.conf.py) but not a database connection.
+    """
+    fail_stale_recommendation_jobs(job_id)
+    if not RecommendationJob.objects.filter(pk=job_id).exists():
+        raise Http404("Recommendation job not found.")
+    config = get_recommendation_job_settings()
+
+    def events():
+        yield "retry: 2000\n\n"
+        deadline = time.monotonic() + config["STREAM_TIMEOUT"]
+        last_state = None
+        while True:
+            job = RecommendationJob.objects.select_related(
+                "preference", "specification"
+            ).get(pk=job_id)
+            if job.is_finished:
+                data = json.dumps(RecommendationJobSerializer(job).data, default=str)
+                yield f"event: done\ndata: {data}\n\n"
+                return
+            if (job.status, job.stage) != last_state:
+                last_state = (job.status, job.stage)
+                data = json.dumps({"status": job.status, "stage": job.stage})
+                yield f"event: status\ndata: {data}\n\n"
+            if time.monotonic() >= deadline:
+                return
+            if not connection.in_atomic_block:
+                connection.close()
+            time.sleep(config["POLL_INTERVAL"])
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Don't let a proxy buffer the stream
+    return response
 
 
 class ProductRecommendationView(APIView):
@@ -298,3 +393,25 @@ class UserHistoryView(generics.ListAPIView):
         return RecommendationSpecification.objects.filter(
             user=self.request.user
         ).order_by("-created_at")
+
+
+class HealthView(APIView):
+    """
+    Readiness probe for the load balancer (render.yaml healthCheckPath).
+    Returns 503 until this worker has finished warming up.
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        warmup = warmup_status()
+        if not warmup["ready"]:
+            return Response(
+                {"status": "warming_up", "warmup": warmup},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response(
+            {"status": "ok", "warmup": warmup, "encoder": encoder_stats()},
+            status=status.HTTP_200_OK,
+        )
@@ -2,6 +2,7 @@
 
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 # This line is crucial for Celery to know about your Django project settings.
@@ -20,3 +21,11 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Load task modules from all registered Django apps.
 # Celery will automatically look for a 'tasks.py' file in each app.
 app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def warm_up_worker_process(**kwargs):
+    """Loads the encoder and benchmark indexes before the child takes any task."""
+    from ai_recommender.logic.warmup import warm_up
+
+    warm_up(f"celery worker {os.getpid()}")
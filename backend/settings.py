@@ -212,9 +212,23 @@ CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 
+# The default cache is shared by the web and Celery processes through Redis
+# (a separate database from the broker), e.g. for the score resolver's
+# "run already queued" marker.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_CACHE_URL", "redis://localhost:6379/1"),
+    }
+}
+
 # This sets the timezone for Celery to match your Django project's timezone.
 CELERY_TIMEZONE = TIME_ZONE  # TIME_ZONE should already be defined in your settings
 
+# Worker children load the sentence encoder in `worker_process_init` (see
+# backend/celery.py); give them longer than the default 4s to report in.
+CELERY_WORKER_PROC_ALIVE_TIMEOUT = 120
+
 from celery.schedules import crontab
 
 CELERY_BEAT_SCHEDULE = {
@@ -233,4 +247,117 @@ CELERY_BEAT_SCHEDULE = {
         # Runs every Sunday at midnight
         "schedule": crontab(day_of_week="sunday", hour=0, minute=0),
     },
+    # Saves and bulk inserts queue their own score resolution; this catches
+    # rows whose queueing failed.
+    "resolve-pending-benchmark-scores": {
+        "task": "ai_recommender.tasks.resolve_pending_benchmark_scores",
+        "schedule": crontab(minute="*/10"),
+    },
+    # Fails recommendation jobs whose worker died or whose task never reached
+    # the broker; polling a job checks it too.
+    "fail-stale-recommendation-jobs": {
+        "task": "ai_recommender.tasks.fail_stale_recommendation_jobs_task",
+        "schedule": crontab(minute="*/5"),
+    },
+}
+
+# ==============================================================================
+# BENCHMARK MATCHING SETTINGS
+# ==============================================================================
+
+# `import_benchmarks` streams CSV/XLSX files in chunks of CHUNK_SIZE rows, one
+# transaction each, and checkpoints progress so `--resume` can pick it up.
+# Uploads are staged in STAGING_DIR for the Celery worker, so the web and
+# worker processes must share that directory.
+BENCHMARK_IMPORT = {
+    "CHUNK_SIZE": 5000,
+    "CHECKPOINT_DIR": os.path.join(BASE_DIR, "var", "import_checkpoints"),
+    "STAGING_DIR": os.getenv(
+        "BENCHMARK_STAGING_DIR", os.path.join(MEDIA_ROOT, "benchmark_staging")
+    ),
+}
+
+# Full re-imports (--truncate) load into a new dataset, which only goes live if
+# it has at least MIN_ROW_RATIO of the live rows and its median score moved by
+# at most MAX_MEDIAN_SHIFT. KEEP_PREVIOUS old datasets are kept for rollback.
+BENCHMARK_DATASETS = {
+    "MIN_ROW_RATIO": 0.9,
+    "MAX_MEDIAN_SHIFT": 0.25,
+    "KEEP_PREVIOUS": 1,
+}
+
+# Requirement and vendor component saves leave their CPU/GPU scores to a Celery
+# resolver queued after commit. Set BENCHMARK_SCORES_SYNC=True (tests, scripts)
+# to resolve them inside save() instead.
+BENCHMARK_SCORE_RESOLUTION = {
+    "SYNC": os.getenv("BENCHMARK_SCORES_SYNC", "False") == "True",
+    "BATCH_SIZE": 500,
+    "DEBOUNCE_SECONDS": 5,
+}
+
+# POST /recommend/ answers inline (10-60s) with the recommendation, as it always
+# has. Clients that send `Prefer: respond-async` or `?async=1` get a
+# RecommendationJob (202) that Celery runs instead, and poll
+# /recommend/jobs/<id>/ or follow /recommend/jobs/<id>/events/ (SSE).
+# RECOMMEND_ASYNC=True queues a job for every request. The discovery and
+# recommendation AI calls run concurrently unless PARALLEL_STAGES is off.
+RECOMMENDATION_JOBS = {
+    "ASYNC": os.getenv("RECOMMEND_ASYNC", "False") == "True",
+    "POLL_INTERVAL": 1.0,
+    "STREAM_TIMEOUT": 25,
+    "PARALLEL_STAGES": True,
+    "STALE_JOB_SECONDS": 300,
+}
+
+# Approximate nearest-neighbour search over benchmark embeddings. Tables smaller
+# than MIN_ROWS always use exact search; raise N_PROBE to trade speed for recall.
+BENCHMARK_ANN = {
+    "ENABLED": True,
+    "MIN_ROWS": 5000,
+    "N_LISTS": None,
+    "N_PROBE": 8,
+}
+
+# Where `train_component_embeddings --build-ann` writes prebuilt indexes.
+EMBEDDING_INDEX_DIR = os.path.join(BASE_DIR, "var", "embedding_index")
+
+# Score queries against a PCA-reduced, int8-quantized copy of the embeddings
+# (built by `train_component_embeddings --compress DIMS`) when one exists.
+BENCHMARK_EMBEDDING_COMPRESSION = {
+    "ENABLED": False,
+    "DIMS": 128,
+}
+
+# The sentence encoder used for benchmark embeddings AND query encoding; they
+# must match, so re-run `train_component_embeddings` after changing it.
+# Compare candidates with `python manage.py compare_encoders`.
+SENTENCE_ENCODER = {
+    "MODEL": os.getenv("SENTENCE_ENCODER_MODEL", "all-mpnet-base-v2"),
+    "QUANTIZE": os.getenv("SENTENCE_ENCODER_QUANTIZE", "False") == "True",
+    "DEVICE": "cpu",
+    # Concurrent encode calls in one process are merged into a single batch
+    "BATCHING": True,
+    "BATCH_MAX_SIZE": 32,
+    "BATCH_MAX_WAIT_MS": 5,
+}
+
+# Optional local embedding sidecar (`python manage.py run_embedding_service`).
+# When the socket exists, workers send encode/match calls to it instead of
+# loading their own copy of the model; otherwise they match in-process.
+EMBEDDING_SERVICE = {
+    "SOCKET": os.getenv("EMBEDDING_SERVICE_SOCKET", ""),
+    "TIMEOUT": 10.0,
+}
+
+# Load the encoder and benchmark indexes when a gunicorn/Celery worker starts
+# (gunicorn.conf.py, backend/celery.py), instead of inside the first request.
+WORKER_WARMUP_ENABLED = os.getenv("WORKER_WARMUP_ENABLED", "True") == "True"
+
+# Unload the sentence encoder from a worker after it has been idle for a while
+# (most endpoints never use it), or when the process grows past MAX_RSS_MB.
+# It reloads on the next match. Unset a value to disable that trigger.
+ENCODER_EVICTION = {
+    "IDLE_SECONDS": int(os.getenv("ENCODER_IDLE_SECONDS", "1800")) or None,
+    "MAX_RSS_MB": int(os.getenv("ENCODER_MAX_RSS_MB", "0")) or None,
+    "CHECK_INTERVAL": 60,
 }
@@ -3,9 +3,11 @@ from django.urls import path, include
 from django.conf import settings
 from django.contrib import admin
 from django.db import router
+from ai_recommender.views import HealthView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("health/", HealthView.as_view(), name="health"),
     path("api/", include("login_and_register.urls")),
     path("api/", include("ai_recommender.urls")),
     path("api/", include("vendor.urls")),
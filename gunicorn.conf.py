@@ -0,0 +1,42 @@
+# gunicorn.conf.py
+#
+# Picked up automatically by `gunicorn backend.wsgi:application` (render.yaml
+# passes it explicitly with -c). Keep worker and thread counts here rather than
+# as command-line flags, which would silently override them.
+
+import os
+
+# With GUNICORN_PRELOAD=True the app (and the warmed-up encoder and benchmark
+# indexes) is loaded once in the master and shared copy-on-write by the workers.
+preload_app = os.getenv("GUNICORN_PRELOAD", "False") == "True"
+
+# Recommendation event streams (/api/recommend/jobs/<id>/events/) stay open for
+# up to RECOMMENDATION_JOBS["STREAM_TIMEOUT"] seconds, mostly sleeping. With
+# threads > 1 gunicorn uses the gthread worker, so an open stream holds one
+# thread instead of a whole sync worker. The stream releases its DB connection
+# between polls, so it only holds the thread.
+#
+# Capacity is workers x threads requests at once (2 x 4 = 8 by default), open
+# streams included; raise GUNICORN_THREADS before adding workers, since each
+# worker carries its own copy of the encoder unless preloaded.
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+
+def _warm_up(source):
+    from ai_recommender.logic.warmup import warm_up
+
+    warm_up(source)
+
+
+def when_ready(server):
+    # Preload: the master has already imported the app; warm it before forking.
+    if server.cfg.preload_app:
+        _warm_up("gunicorn master (preload)")
+
+
+def post_worker_init(worker):
+    # Without preload each worker loads the app itself; warm it before the
+    # worker starts accepting requests.
+    if not worker.cfg.preload_app:
+        _warm_up(f"gunicorn worker {worker.pid}")